@@ -1,9 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import literal
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from app.core.database import get_db
-from app.models.models import Job, User
+from app.models.models import Job, JobMatchScore, User
 from app.services.nlp_service import NLPJobAnalyzer
+from app.services.similarity_index import similarity_index, job_text
+from app.services.dedup_service import duplicate_detector
+from app.services.match_engine import match_engine, parse_skill_list
+from app.services.match_scores import match_score_updater, store_match_score
+from app.services.skill_index import index_job_skills, remove_job_skills, search_jobs_by_skills
+from app.services.search_index import job_search
 from datetime import datetime
 
 router = APIRouter()
@@ -47,6 +54,19 @@ class JobResponse(BaseModel):
         from_attributes = True
 
 
+class JobListResponse(JobResponse):
+    rank: Optional[float] = None
+    snippet: Optional[str] = None
+
+
+class SimilarJobResponse(JobResponse):
+    similarity: float
+
+
+class SkillSearchResponse(JobResponse):
+    matched_skills: int
+
+
 @router.post("/", response_model=JobResponse)
 def create_job(job: JobCreate, db: Session = Depends(get_db)):
     """Create a new job posting"""
@@ -75,24 +95,47 @@ def create_job(job: JobCreate, db: Session = Depends(get_db)):
         experience_required=analysis['experience_years']
     )
 
+    index_job_skills(db_job, analysis['required_skills'])
     db.add(db_job)
+    duplicate_detector.register(db, db_job, duplicate_detector.signature(job.description))
     db.commit()
     db.refresh(db_job)
 
+    similarity_index.add_jobs([(db_job.id, job_text(db_job.title, db_job.description))])
+    match_engine.invalidate()
+    match_score_updater.schedule_jobs([db_job.id])
+
     return db_job
 
 
-@router.get("/", response_model=List[JobResponse])
+@router.get("/", response_model=List[JobListResponse])
 def get_jobs(
     skip: int = 0,
     limit: int = 20,
+    q: Optional[str] = Query(None, description="Keyword search over title, company and description"),
     source: Optional[str] = None,
     company: Optional[str] = None,
     min_match_score: Optional[float] = None,
+    user_id: Optional[int] = None,
     db: Session = Depends(get_db)
 ):
-    """Get list of jobs with optional filters"""
-    query = db.query(Job).filter(Job.is_active == True)
+    """
+    Get list of jobs with optional filters
+
+    With q, only jobs matching every keyword are returned, most relevant
+    first, each with a relevance rank and a highlighted snippet.
+    With user_id, match_score is that user's stored score and
+    min_match_score filters on it; without, min_match_score filters on
+    the job's own match_score column as before.
+    """
+    query = db.query(Job, JobMatchScore.score if user_id is not None else literal(None))
+    if user_id is not None:
+        query = query.outerjoin(
+            JobMatchScore,
+            (JobMatchScore.job_id == Job.id) & (JobMatchScore.user_id == user_id)
+        )
+
+    query = query.filter(Job.is_active == True)
 
     if source:
         query = query.filter(Job.source == source)
@@ -100,11 +143,95 @@ def get_jobs(
     if company:
         query = query.filter(Job.company.ilike(f"%{company}%"))
 
-    if min_match_score:
-        query = query.filter(Job.match_score >= min_match_score)
+    if min_match_score is not None:
+        score_column = JobMatchScore.score if user_id is not None else Job.match_score
+        query = query.filter(score_column >= min_match_score)
+
+    if q:
+        query, rank, snippet = job_search.search(query, q)
+        query = query.add_columns(rank, snippet).order_by(rank.desc(), Job.id.desc())
+    else:
+        query = query.add_columns(literal(None), literal(None)).order_by(Job.scraped_at.desc())
+
+    rows = query.offset(skip).limit(limit).all()
+
+    results = []
+    for job, score, rank, snippet in rows:
+        result = JobResponse.model_validate(job).model_dump()
+        if user_id is not None:
+            result["match_score"] = score
+        if q:
+            result["rank"] = round(float(rank), 4)
+            result["snippet"] = snippet
+        results.append(result)
+    return results
+
+
+@router.get("/matches", response_model=List[JobResponse])
+def get_top_matches(
+    user_id: int,
+    min_match_score: Optional[float] = None,
+    skip: int = 0,
+    limit: int = Query(20, ge=1, le=200),
+    db: Session = Depends(get_db)
+):
+    """Get a user's best-matching jobs from the stored per-user scores"""
+    # Range scan on the (user_id, score) index
+    query = db.query(Job, JobMatchScore.score).join(
+        JobMatchScore, JobMatchScore.job_id == Job.id
+    ).filter(
+        JobMatchScore.user_id == user_id,
+        Job.is_active == True
+    )
+
+    if min_match_score is not None:
+        query = query.filter(JobMatchScore.score >= min_match_score)
+
+    rows = query.order_by(JobMatchScore.score.desc(), Job.id.desc()).offset(skip).limit(limit).all()
+
+    return [
+        {**JobResponse.model_validate(job).model_dump(), "match_score": score}
+        for job, score in rows
+    ]
+
+
+@router.get("/ranked", response_model=List[JobResponse])
+def get_ranked_jobs(
+    user_id: int,
+    skip: int = 0,
+    limit: int = Query(20, ge=1, le=200),
+    min_match_score: Optional[float] = None,
+    db: Session = Depends(get_db)
+):
+    """Rank all active jobs by match score for a user's profile"""
+    user = db.query(User).filter(User.id == user_id).first()
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    if not user.profiles:
+        raise HTTPException(status_code=400, detail="User profile not found")
+
+    profile = user.profiles
+    ranked = match_engine.rank(
+        db,
+        parse_skill_list(profile.skills),
+        profile.experience_years or 0,
+        limit=limit,
+        skip=skip,
+        min_score=min_match_score
+    )
+    if not ranked:
+        return []
+
+    jobs_by_id = {
+        job.id: job for job in db.query(Job).filter(Job.id.in_([job_id for job_id, _ in ranked])).all()
+    }
 
-    jobs = query.order_by(Job.scraped_at.desc()).offset(skip).limit(limit).all()
-    return jobs
+    # match_score in the response is this user's score, not the shared column
+    return [
+        {**JobResponse.model_validate(jobs_by_id[job_id]).model_dump(), "match_score": score}
+        for job_id, score in ranked if job_id in jobs_by_id
+    ]
 
 
 @router.get("/{job_id}", response_model=JobResponse)
@@ -116,6 +243,39 @@ def get_job(job_id: int, db: Session = Depends(get_db)):
     return job
 
 
+@router.get("/{job_id}/similar", response_model=List[SimilarJobResponse])
+def get_similar_jobs(
+    job_id: int,
+    k: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    """Get the k active jobs most similar to a job"""
+    job = db.query(Job).filter(Job.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    # Pick up jobs saved by scrape workers in other processes
+    similarity_index.ensure_fresh(db, job_id if job.is_active else None)
+    neighbours = similarity_index.similar(job_id, k)
+    if not neighbours:
+        return []
+
+    jobs_by_id = {
+        j.id: j for j in db.query(Job).filter(
+            Job.id.in_([neighbour_id for neighbour_id, _ in neighbours]),
+            Job.is_active == True
+        ).all()
+    }
+
+    results = []
+    for neighbour_id, score in neighbours:
+        neighbour = jobs_by_id.get(neighbour_id)
+        if neighbour:
+            results.append({**JobResponse.model_validate(neighbour).model_dump(), "similarity": score})
+
+    return results
+
+
 @router.delete("/{job_id}")
 def delete_job(job_id: int, db: Session = Depends(get_db)):
     """Delete a job (soft delete by marking inactive)"""
@@ -124,8 +284,12 @@ def delete_job(job_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Job not found")
 
     job.is_active = False
+    remove_job_skills(db, job_id)
     db.commit()
 
+    similarity_index.remove_job(job_id)
+    match_engine.invalidate()
+
     return {"message": "Job deleted successfully"}
 
 
@@ -149,18 +313,27 @@ def calculate_match_score(
         raise HTTPException(status_code=400, detail="User profile not found")
 
     profile = user.profiles
-    user_skills = eval(profile.skills) if profile.skills else []
+    user_skills = parse_skill_list(profile.skills)
     user_experience = profile.experience_years or 0
 
+    # Reuse the analysis stored at ingest instead of rescanning the description
+    analysis = None
+    if job.required_skills is not None:
+        analysis = {
+            'required_skills': parse_skill_list(job.required_skills),
+            'experience_years': job.experience_required or 0
+        }
+
     # Calculate match score
     match_score = nlp_analyzer.calculate_match_score(
         job.description,
         user_skills,
-        user_experience
+        user_experience,
+        analysis=analysis
     )
 
-    # Update job with match score
-    job.match_score = match_score
+    # Store the score for this user only
+    store_match_score(db, user_id, job_id, match_score)
     db.commit()
 
     return {
@@ -170,23 +343,20 @@ def calculate_match_score(
     }
 
 
-@router.get("/search/skills")
+@router.get("/search/skills", response_model=List[SkillSearchResponse])
 def search_by_skills(
     skills: str = Query(..., description="Comma-separated list of skills"),
+    match: str = Query("any", pattern="^(any|all)$", description="Require any or all of the skills"),
+    skip: int = 0,
+    limit: int = Query(20, ge=1, le=200),
     db: Session = Depends(get_db)
 ):
-    """Search jobs by required skills"""
+    """Search jobs by required skills, most matched skills first"""
     skill_list = [s.strip().lower() for s in skills.split(",")]
 
-    jobs = db.query(Job).filter(Job.is_active == True).all()
-
-    matching_jobs = []
-    for job in jobs:
-        job_skills = eval(job.required_skills) if job.required_skills else []
-        job_skills_lower = [s.lower() for s in job_skills]
-
-        # Check if any of the user's skills match
-        if any(skill in job_skills_lower for skill in skill_list):
-            matching_jobs.append(job)
+    results = search_jobs_by_skills(db, skill_list, match_all=(match == "all"), skip=skip, limit=limit)
 
-    return matching_jobs[:20]  # Return top 20 matches
+    return [
+        {**JobResponse.model_validate(job).model_dump(), "matched_skills": matched}
+        for job, matched in results
+    ]
@@ -1,20 +1,41 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Callable, Dict, List, Optional, Set, Tuple
 from pydantic import BaseModel
 
-from app.core.database import get_db
+from app.core.database import SessionLocal, get_db
 from app.scrapers.multi_source_scraper import MultiSourceScraper
-from app.models.models import Job
-from app.services.nlp_service import NLPJobAnalyzer
+from app.scrapers.async_engine import scrape_engine
+from app.scrapers.html_parsing import parse_stats
+from app.models.models import Job, JobDuplicate, ScrapeTask, ScrapeWatermark
+from app.services.nlp_service import NLPJobAnalyzer, analysis_cache
+from app.services.similarity_index import similarity_index, job_text
+from app.services.dedup_service import NearDuplicateStream, duplicate_detector
+from app.services.match_engine import match_engine
+from app.services.match_scores import match_score_updater
+from app.services.job_store import insert_duplicates, upsert_jobs
+from app.services.seen_urls import seen_urls
+from app.services.pipeline import PipelineStage, StreamingPipeline
+from app.services.single_flight import IN_FLIGHT, RAN, RECENT, scrape_flights
+from app.services.scrape_worker import ScrapeWorker
+from app.core.config import settings
 from datetime import datetime
+from collections import Counter
+import json
 import logging
+import threading
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 nlp_analyzer = NLPJobAnalyzer()
-multi_scraper = MultiSourceScraper()
+multi_scraper = MultiSourceScraper(
+    delay=settings.SCRAPING_DELAY,
+    deadline=settings.SCRAPE_DEADLINE,
+    enrich_concurrency=settings.ENRICH_MAX_CONCURRENCY
+)
 
 
 # Pydantic schemas
@@ -23,91 +44,493 @@ class ScrapeRequest(BaseModel):
     location: str = ""
     num_pages: int = 1
     sources: List[str] = ["indeed", "linkedin"]  # Multiple sources
+    enrich_details: bool = False  # fetch detail pages of new jobs for full descriptions
+    incremental: bool = False  # stop paginating a source once a page has nothing new
 
 
 class ScrapeResponse(BaseModel):
     message: str
     jobs_found: int
     jobs_saved: int
+    jobs_updated: int = 0  # stored postings refreshed by the scrape
+    sources: Dict[str, Dict] = {}  # per-source jobs_found, seconds and error
+    elapsed: Optional[float] = None
+    jobs_enriched: int = 0
+    stages: Dict[str, Dict] = {}  # per-stage batches, items and throughput
+    coalesced: Optional[str] = None  # 'in_flight' or 'recent' when answered by an identical scrape
+    task_id: Optional[int] = None  # queued scrape, see GET /tasks/{task_id}
+    errors: int = 0  # failed pipeline batches and jobs that could not be saved
+    failed_items: int = 0  # items dropped by those failures
+
+
+def find_known_urls(db: Session, urls: List[str], batch_size: int = 500) -> Set[str]:
+    """Return the URLs already stored as jobs or as linked duplicates"""
+    urls = list(set(urls))
+    known = set()
+    for start in range(0, len(urls), batch_size):
+        chunk = urls[start:start + batch_size]
+        known.update(url for (url,) in db.query(Job.job_url).filter(Job.job_url.in_(chunk)).all())
+        known.update(url for (url,) in db.query(JobDuplicate.job_url).filter(JobDuplicate.job_url.in_(chunk)).all())
+    return known
+
+
+def record_watermarks(db: Session, query: str, location: str, source_stats: Dict[str, Dict]):
+    """
+    Update the per (source, query, location) watermarks after an incremental scrape
+
+    Watermarks are informational (GET /watermarks): the next crawl is
+    bounded by the stored job URLs themselves, which is exact, while a
+    page count or date from the last run cannot bound it, as new
+    postings push the ones already seen onto later pages.
+    """
+    query = query.strip().lower()
+    location = location.strip().lower()
+    now = datetime.utcnow()
+
+    for source, stats in source_stats.items():
+        if stats.get('error') or 'pages_fetched' not in stats:
+            continue
+        watermark = db.query(ScrapeWatermark).filter(
+            ScrapeWatermark.source == source,
+            ScrapeWatermark.query == query,
+            ScrapeWatermark.location == location
+        ).first()
+        if watermark is None:
+            watermark = ScrapeWatermark(source=source, query=query, location=location, runs=0)
+            db.add(watermark)
+
+        watermark.runs += 1
+        watermark.last_run_at = now
+        watermark.pages_fetched = stats['pages_fetched']
+        watermark.jobs_found = stats['jobs_found']
+        watermark.jobs_new = stats['new_jobs']
+        if stats['new_jobs']:
+            watermark.last_new_at = now
+
+    db.commit()
+
+
+def analyzed_job_row(job_data: Dict, analysis: Dict, scraped_at: datetime) -> Dict:
+    """
+    Column values of the Job row for a new, analyzed posting
+
+    Args:
+        job_data: Scraped job dictionary
+        analysis: NLP analysis of the job
+        scraped_at: Scrape time stored on the row
+
+    Returns:
+        Column values for job_store.upsert_jobs (the same keys for every job)
+    """
+    salary_range = nlp_analyzer.extract_salary_range(job_data['salary']) if job_data.get('salary') else {}
+    return {
+        'title': job_data['title'],
+        'company': job_data['company'],
+        'location': job_data['location'],
+        'description': job_data['description'],
+        'requirements': job_data.get('requirements'),
+        'salary_min': salary_range.get('min'),
+        'salary_max': salary_range.get('max'),
+        'job_url': job_data['job_url'],
+        'source': job_data['source'],
+        'posted_date': job_data.get('posted_date') or scraped_at,
+        'scraped_at': scraped_at,
+        'required_skills': str(analysis['required_skills']),
+        'experience_required': analysis['experience_years'],
+        'is_active': True
+    }
+
+
+def commit_saved_jobs(db: Session, saved_jobs: List[Tuple[int, Dict]], urls: List[str]) -> int:
+    """
+    Commit written jobs and update the job indexes
 
+    Args:
+        db: Database session holding the written rows
+        saved_jobs: (job id, column values) of the jobs inserted or updated
+        urls: URLs handled by this commit (saved or linked as duplicates)
+
+    Returns:
+        Number of jobs written
+    """
+    indexed = [(job_id, job_text(row['title'], row['description'])) for job_id, row in saved_jobs]
+
+    db.commit()
+
+    # Stored jobs and linked duplicates alike count as seen from now on
+    seen_urls.add_many(urls)
 
-def scrape_and_save_jobs(
-    query: str,
-    location: str,
-    num_pages: int,
-    sources: List[str],
-    db: Session
-):
-    """Background task to scrape and save jobs from multiple sources"""
     try:
-        # Use multi-source scraper
-        jobs = multi_scraper.search_jobs(query, location, num_pages, sources)
+        similarity_index.add_jobs(indexed)
+        similarity_index.maybe_save()
+    except Exception as e:
+        logger.error(f"Error updating similarity index: {e}")
 
-        saved_count = 0
+    if saved_jobs:
+        match_engine.invalidate()
+        match_score_updater.schedule_jobs([job_id for job_id, _ in indexed])
 
-        for job_data in jobs:
-            try:
-                # Check if job already exists
-                existing_job = db.query(Job).filter(Job.job_url == job_data['job_url']).first()
-                if existing_job:
-                    continue
-
-                # Analyze job with NLP
-                analysis = nlp_analyzer.analyze_job(
-                    job_data.get('description', ''),
-                    job_data.get('requirements', '')
-                )
-
-                # Create job entry
-                db_job = Job(
-                    title=job_data['title'],
-                    company=job_data['company'],
-                    location=job_data['location'],
-                    description=job_data['description'],
-                    job_url=job_data['job_url'],
-                    source=job_data['source'],
-                    posted_date=job_data.get('posted_date', datetime.utcnow()),
-                    scraped_at=datetime.utcnow(),
-                    required_skills=str(analysis['required_skills']),
-                    experience_required=analysis['experience_years'],
-                    is_active=True
-                )
-
-                # Extract salary if available
-                if job_data.get('salary'):
-                    salary_range = nlp_analyzer.extract_salary_range(job_data['salary'])
-                    db_job.salary_min = salary_range.get('min')
-                    db_job.salary_max = salary_range.get('max')
-
-                db.add(db_job)
-                saved_count += 1
+    return len(saved_jobs)
 
+
+class ScrapeIngest:
+    """
+    Stream one multi-source scrape into the database
+
+    Pages flow through stages connected by bounded queues, each stage on
+    its own threads:
+    dedup (drop title/company repeats and known URLs, regroup into batches),
+    enrich (optional detail page fetches), near_dup (MinHash against stored
+    jobs and the rest of the stream), analyze (NLP) and persist (a single
+    writer committing each batch). Every committed batch survives a crash
+    later in the scrape, and memory is bounded by the queue sizes rather
+    than by the size of the scrape.
+    """
+
+    def __init__(self, query: str, location: str = "", num_pages: int = 1, sources: List[str] = None,
+                 enrich_details: bool = False, incremental: bool = False,
+                 on_progress: Callable[[Dict], None] = None):
+        self.query = query
+        self.location = location
+        self.num_pages = num_pages
+        self.sources = sources
+        self.enrich_details = enrich_details
+        self.incremental = incremental
+        self.on_progress = on_progress
+
+        self.source_stats: Dict[str, Dict] = {}
+        self.found_by_source = Counter()
+        self.jobs_found = 0
+        self.jobs_saved = 0
+        self.jobs_updated = 0
+        self.jobs_enriched = 0
+        self.rows_failed = 0  # jobs dropped by persist before the write
+
+        self._lock = threading.Lock()
+        self._seen_keys = set()
+        self._seen_urls = set()
+        self._pending: List[Dict] = []
+        self._near_duplicates = NearDuplicateStream(duplicate_detector)
+        self._stored_duplicates: List[JobDuplicate] = []
+        self._stream_duplicates: List = []
+
+        # One session per single-worker stage that touches the database
+        self._dedup_db = SessionLocal()
+        self._near_dup_db = SessionLocal()
+        self._persist_db = SessionLocal()
+
+    def run(self) -> Dict:
+        """
+        Scrape, analyze and save, blocking until the stream is drained
+
+        Returns:
+            Jobs found, saved (inserted), updated and enriched, failed
+            batches (errors) and dropped items (failed_items), per-source
+            stats, per-stage throughput and elapsed seconds
+        """
+        stages = [PipelineStage('dedup', self._dedup, finish=self._flush)]
+        if self.enrich_details:
+            stages.append(PipelineStage('enrich', self._enrich, workers=settings.PIPELINE_ENRICH_WORKERS))
+        stages += [
+            PipelineStage('near_dup', self._near_dup),
+            PipelineStage('analyze', self._analyze, workers=settings.PIPELINE_ANALYZE_WORKERS),
+            PipelineStage('persist', self._persist, finish=self._link_duplicates)
+        ]
+
+        try:
+            result = StreamingPipeline(stages, queue_size=settings.PIPELINE_QUEUE_SIZE, name='scrape').run(self._pages())
+            if self.incremental:
+                record_watermarks(self._persist_db, self.query, self.location, self.source_stats)
+        finally:
+            for db in (self._dedup_db, self._near_dup_db, self._persist_db):
+                db.close()
+
+        return {
+            'jobs_found': self.jobs_found,
+            'jobs_saved': self.jobs_saved,
+            'jobs_updated': self.jobs_updated,
+            'jobs_enriched': self.jobs_enriched,
+            'errors': result['errors'] + self.rows_failed,
+            'failed_items': result['failed_items'] + self.rows_failed,
+            'sources': self.source_stats,
+            'stages': result['stages'],
+            'elapsed': result['elapsed']
+        }
+
+    def progress(self) -> Dict:
+        """Counts so far and the state of each source (running, done or failed)"""
+        sources = {}
+        for source in self.sources or multi_scraper.get_available_sources():
+            stats = self.source_stats.get(source)
+            if stats is None:
+                sources[source] = {'state': 'running', 'jobs_found': self.found_by_source[source]}
+            else:
+                sources[source] = dict(stats, state='failed' if stats.get('error') else 'done')
+        return {
+            'jobs_found': self.jobs_found,
+            'jobs_saved': self.jobs_saved,
+            'jobs_updated': self.jobs_updated,
+            'jobs_enriched': self.jobs_enriched,
+            'sources': sources
+        }
+
+    def _report_progress(self):
+        if self.on_progress is not None:
+            self.on_progress(self.progress())
+
+    def _pages(self):
+        """Source: pages of jobs from every requested scraper"""
+        seen = None
+        if self.incremental:
+            seen_urls.ensure_fresh(self._dedup_db)
+            seen = seen_urls.might_contain
+
+        yield from multi_scraper.stream_pages(
+            self.query, self.location, self.num_pages, self.sources,
+            seen=seen, stats=self.source_stats, queue_size=settings.PIPELINE_QUEUE_SIZE
+        )
+
+    def _dedup(self, page_jobs: List[Dict]) -> Optional[List[Dict]]:
+        """Drop repeats and stored URLs, passing on full batches"""
+        candidates = []
+        self.found_by_source.update((job_data.get('source') or '').lower() for job_data in page_jobs)
+        for job_data in page_jobs:
+            # Remove duplicates based on title and company
+            key = (job_data['title'].lower(), job_data['company'].lower())
+            if key in self._seen_keys:
+                continue
+            self._seen_keys.add(key)
+            self.jobs_found += 1
+
+            if job_data['job_url'] in self._seen_urls:
+                continue
+            self._seen_urls.add(job_data['job_url'])
+            candidates.append(job_data)
+
+        known_urls = find_known_urls(self._dedup_db, [job_data['job_url'] for job_data in candidates])
+        # End the read so the next page sees batches committed meanwhile
+        self._dedup_db.rollback()
+        self._pending.extend(job_data for job_data in candidates if job_data['job_url'] not in known_urls)
+        self._report_progress()
+
+        if len(self._pending) < settings.PIPELINE_BATCH_SIZE:
+            return None
+        return self._flush()
+
+    def _flush(self) -> List[Dict]:
+        batch, self._pending = self._pending, []
+        return batch
+
+    def _enrich(self, jobs: List[Dict]) -> List[Dict]:
+        """Fill in full descriptions from the detail pages"""
+        enriched = multi_scraper.enrich_jobs(jobs)['enriched']
+        with self._lock:
+            self.jobs_enriched += enriched
+        return jobs
+
+    def _near_dup(self, jobs: List[Dict]) -> List:
+        """Set aside near duplicates before any NLP work"""
+        if not settings.DEDUP_ENABLED:
+            return [(job_data, None) for job_data in jobs]
+
+        accepted, stored_duplicates, stream_duplicates = self._near_duplicates.partition(self._near_dup_db, jobs)
+        self._near_dup_db.rollback()
+        with self._lock:
+            self._stored_duplicates.extend(stored_duplicates)
+            self._stream_duplicates.extend(stream_duplicates)
+        return accepted
+
+    def _analyze(self, items: List) -> List:
+        """Run the NLP analysis for a batch of (job_data, signature)"""
+        analyses = nlp_analyzer.analyze_jobs([
+            (job_data.get('description', ''), job_data.get('requirements', ''))
+            for job_data, _ in items
+        ])
+        return [(job_data, signature, analysis) for (job_data, signature), analysis in zip(items, analyses)]
+
+    def _persist(self, items: List) -> List[Tuple[int, Dict]]:
+        """Upsert and commit one analyzed batch with the duplicates found so far"""
+        db = self._persist_db
+        scraped_at = datetime.utcnow()
+        rows, skills, signatures = [], [], []
+        for job_data, signature, analysis in items:
+            try:
+                rows.append(analyzed_job_row(job_data, analysis, scraped_at))
             except Exception as e:
                 logger.error(f"Error saving job: {e}")
+                self.rows_failed += 1
                 continue
+            skills.append(analysis['required_skills'])
+            signatures.append(signature)
+
+        duplicates = self._take_stored_duplicates()
+        try:
+            written = upsert_jobs(db, rows, skills, signatures)
+            job_ids = {**written['inserted'], **written['updated']}
+            saved_jobs = [(job_ids[row['job_url']], row) for row in rows if row['job_url'] in job_ids]
+            # Links stored meanwhile by a concurrent scrape are skipped, not failed on
+            insert_duplicates(db, duplicates)
+            # Only URLs that are stored from now on: rows rejected above stay unseen
+            urls = list(job_ids) + [duplicate.job_url for duplicate in duplicates]
+            commit_saved_jobs(db, saved_jobs, urls)
+        except Exception as e:
+            db.rollback()
+            if isinstance(e, IntegrityError):
+                # A constraint would fail again: dropping the links keeps later batches working
+                logger.error(f"Dropped {len(duplicates)} near-duplicate links with a failed batch")
+            else:
+                # The links were not stored: leave them to the next batch (or the finish step)
+                with self._lock:
+                    self._stored_duplicates[:0] = duplicates
+            raise
+
+        self.jobs_saved += len(written['inserted'])
+        self.jobs_updated += len(written['updated'])
+        self._report_progress()
+        return saved_jobs
+
+    def _take_stored_duplicates(self) -> List[JobDuplicate]:
+        """Take the links to stored jobs found so far"""
+        with self._lock:
+            duplicates, self._stored_duplicates = self._stored_duplicates, []
+        return duplicates
+
+    def _link_duplicates(self) -> None:
+        """After the last batch: link reposts within the stream to the saved postings"""
+        db = self._persist_db
+        try:
+            duplicates = self._take_stored_duplicates()
+
+            canonical_urls = list({canonical['job_url'] for _, canonical, _ in self._stream_duplicates})
+            canonical_ids = {}
+            for start in range(0, len(canonical_urls), 500):
+                chunk = canonical_urls[start:start + 500]
+                canonical_ids.update(db.query(Job.job_url, Job.id).filter(Job.job_url.in_(chunk)).all())
+
+            for job_data, canonical, similarity in self._stream_duplicates:
+                canonical_id = canonical_ids.get(canonical['job_url'])
+                if canonical_id is not None:
+                    duplicates.append(
+                        duplicate_detector.make_duplicate(job_data, similarity, canonical_job_id=canonical_id)
+                    )
+
+            linked = insert_duplicates(db, duplicates)
+            db.commit()
+            # Skipped links were stored by another scrape, so every URL is stored now
+            seen_urls.add_many([duplicate.job_url for duplicate in duplicates])
+            if linked:
+                logger.info(f"Linked {linked} near-duplicate jobs to canonical postings")
+        except Exception:
+            db.rollback()
+            raise
+
+
+def scrape_key(query: str, location: str, num_pages: int, sources: List[str],
+               enrich_details: bool = False, incremental: bool = False) -> tuple:
+    """Normalized identity of a scrape: requests with equal keys do the same work"""
+    return (
+        ' '.join(query.lower().split()),
+        ' '.join(location.lower().split()),
+        num_pages,
+        tuple(sorted(set(sources))),
+        enrich_details,
+        incremental
+    )
 
-        db.commit()
-        logger.info(f"Scraping complete: {saved_count} jobs saved")
 
-    except Exception as e:
-        logger.error(f"Error in scrape_and_save_jobs: {e}")
-        db.rollback()
+def run_scrape(query: str, location: str, num_pages: int, sources: List[str],
+               enrich_details: bool = False, incremental: bool = False,
+               on_progress: Callable[[Dict], None] = None):
+    """
+    Run a ScrapeIngest, coalesced with identical scrapes
+
+    Args:
+        on_progress: Receives ScrapeIngest.progress() snapshots while this
+            call does the scraping (not when it joins an identical one)
+
+    Returns:
+        (result, how): the ScrapeIngest.run result, and how it was obtained
+        (RAN, IN_FLIGHT or RECENT)
+    """
+    key = scrape_key(query, location, num_pages, sources, enrich_details, incremental)
+    return scrape_flights.do(key, lambda: ScrapeIngest(
+        query, location, num_pages, sources, enrich_details, incremental, on_progress=on_progress
+    ).run())
+
+
+def run_scrape_task(params: Dict, on_progress: Callable[[Dict], None]) -> Dict:
+    """Run one queued scrape task for the scrape worker"""
+    if on_progress is not None:
+        on_progress({'sources': {source: {'state': 'running', 'jobs_found': 0} for source in params['sources']}})
+
+    result, how = run_scrape(**params, on_progress=on_progress)
+    logger.info(
+        f"Scraping complete: {result['jobs_saved']} jobs saved, {result['jobs_updated']} updated, "
+        f"{result['errors']} errors, per source: {result['sources']}, per stage: {result['stages']}"
+    )
+    sources = {
+        source: dict(stats, state='failed' if stats.get('error') else 'done')
+        for source, stats in result['sources'].items()
+    }
+    return dict(result, sources=sources, coalesced=how if how != RAN else None)
+
+
+scrape_worker = ScrapeWorker(
+    run_scrape_task,
+    workers=settings.SCRAPE_WORKERS,
+    poll_interval=settings.SCRAPE_TASK_POLL_INTERVAL,
+    progress_interval=settings.SCRAPE_TASK_PROGRESS_INTERVAL,
+    stale_after=settings.SCRAPE_TASK_STALE_AFTER,
+    max_attempts=settings.SCRAPE_TASK_MAX_ATTEMPTS
+)
+
+
+def task_to_dict(task: ScrapeTask) -> Dict:
+    """API representation of a scrape task"""
+    finished_or_now = task.finished_at or datetime.utcnow()
+    return {
+        'id': task.id,
+        'state': task.state,
+        'query': task.query,
+        'location': task.location,
+        'num_pages': task.num_pages,
+        'sources': json.loads(task.sources),
+        'enrich_details': task.enrich_details,
+        'incremental': task.incremental,
+        'created_at': task.created_at,
+        'started_at': task.started_at,
+        'finished_at': task.finished_at,
+        'queued_seconds': round(((task.started_at or finished_or_now) - task.created_at).total_seconds(), 3),
+        'run_seconds': round((finished_or_now - task.started_at).total_seconds(), 3) if task.started_at else None,
+        'jobs_found': task.jobs_found,
+        'jobs_saved': task.jobs_saved,
+        'jobs_updated': task.jobs_updated,
+        'jobs_enriched': task.jobs_enriched,
+        'progress': json.loads(task.progress) if task.progress else {},
+        'stages': json.loads(task.stages) if task.stages else {},
+        'coalesced': task.coalesced,
+        'errors': task.errors or 0,
+        'failed_items': task.failed_items or 0,
+        'attempts': task.attempts,
+        'worker': task.worker,
+        'error': task.error
+    }
 
 
 @router.post("/scrape", response_model=ScrapeResponse)
-async def scrape_jobs(
-    scrape_request: ScrapeRequest,
-    background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
-):
+def scrape_jobs(scrape_request: ScrapeRequest, db: Session = Depends(get_db)):
     """
-    Scrape jobs from specified source
+    Queue a scrape for the scrape workers
+
+    Follow it with GET /tasks/{task_id}. An identical scrape that finished
+    within SCRAPE_COALESCE_TTL answers at once instead; one that is still
+    running is joined by the new task rather than crawled twice.
 
     Args:
         scrape_request: Scraping parameters (query, location, pages, source)
 
     Returns:
-        Response with scraping status
+        Response with the task id
     """
     available_sources = multi_scraper.get_available_sources()
     invalid_sources = [s for s in scrape_request.sources if s not in available_sources]
@@ -118,30 +541,54 @@ async def scrape_jobs(
             detail=f"Invalid sources: {invalid_sources}. Available: {available_sources}"
         )
 
-    # Add scraping task to background
-    background_tasks.add_task(
-        scrape_and_save_jobs,
+    # An identical scrape that just finished answers this one
+    how, result = scrape_flights.peek(scrape_key(
+        scrape_request.query, scrape_request.location, scrape_request.num_pages, scrape_request.sources,
+        scrape_request.enrich_details, scrape_request.incremental
+    ))
+    if how == RECENT:
+        return ScrapeResponse(
+            message="Identical scrape completed recently",
+            jobs_found=result['jobs_found'],
+            jobs_saved=result['jobs_saved'],
+            jobs_updated=result['jobs_updated'],
+            sources=result['sources'],
+            elapsed=result['elapsed'],
+            jobs_enriched=result['jobs_enriched'],
+            stages=result['stages'],
+            errors=result['errors'],
+            failed_items=result['failed_items'],
+            coalesced=how
+        )
+
+    task = scrape_worker.submit(
+        db,
         scrape_request.query,
         scrape_request.location,
         scrape_request.num_pages,
         scrape_request.sources,
-        db
+        enrich_details=scrape_request.enrich_details,
+        incremental=scrape_request.incremental
     )
 
     return ScrapeResponse(
-        message=f"Scraping started from: {', '.join(scrape_request.sources)}",
+        message=f"Scraping queued as task {task.id} for: {', '.join(scrape_request.sources)}",
         jobs_found=0,
-        jobs_saved=0
+        jobs_saved=0,
+        task_id=task.id,
+        coalesced=IN_FLIGHT if how == IN_FLIGHT else None
     )
 
 
 @router.post("/scrape-sync", response_model=ScrapeResponse)
-def scrape_jobs_sync(
-    scrape_request: ScrapeRequest,
-    db: Session = Depends(get_db)
-):
+async def scrape_jobs_sync(scrape_request: ScrapeRequest):
     """
-    Scrape jobs synchronously (blocks until complete)
+    Scrape jobs synchronously (responds when complete)
+
+    The scrape streams through the ingest pipeline on its own threads,
+    committing batch by batch; the response adds per-stage throughput.
+    Identical requests arriving while it runs, or shortly after it
+    finished (SCRAPE_COALESCE_TTL), get its result instead of scraping.
 
     Args:
         scrape_request: Scraping parameters
@@ -159,65 +606,113 @@ def scrape_jobs_sync(
         )
 
     try:
-        jobs = multi_scraper.search_jobs(
+        result, how = await run_in_threadpool(
+            run_scrape,
             scrape_request.query,
             scrape_request.location,
             scrape_request.num_pages,
-            scrape_request.sources
+            scrape_request.sources,
+            enrich_details=scrape_request.enrich_details,
+            incremental=scrape_request.incremental
         )
 
-        saved_count = 0
-
-        for job_data in jobs:
-            try:
-                # Check if job already exists
-                existing_job = db.query(Job).filter(Job.job_url == job_data['job_url']).first()
-                if existing_job:
-                    continue
-
-                # Analyze job with NLP
-                analysis = nlp_analyzer.analyze_job(
-                    job_data.get('description', ''),
-                    job_data.get('requirements', '')
-                )
-
-                # Create job entry
-                db_job = Job(
-                    title=job_data['title'],
-                    company=job_data['company'],
-                    location=job_data['location'],
-                    description=job_data['description'],
-                    job_url=job_data['job_url'],
-                    source=job_data['source'],
-                    posted_date=job_data.get('posted_date', datetime.utcnow()),
-                    scraped_at=datetime.utcnow(),
-                    required_skills=str(analysis['required_skills']),
-                    experience_required=analysis['experience_years'],
-                    is_active=True
-                )
-
-                # Extract salary if available
-                if job_data.get('salary'):
-                    salary_range = nlp_analyzer.extract_salary_range(job_data['salary'])
-                    db_job.salary_min = salary_range.get('min')
-                    db_job.salary_max = salary_range.get('max')
-
-                db.add(db_job)
-                saved_count += 1
-
-            except Exception as e:
-                logger.error(f"Error saving job: {e}")
-                continue
-
-        db.commit()
+        message = {
+            IN_FLIGHT: "Joined an identical scrape in progress",
+            RECENT: "Identical scrape completed recently"
+        }.get(how, "Scraping completed")
+        if result['errors']:
+            message += f" with {result['errors']} failed batches ({result['failed_items']} items dropped)"
 
         return ScrapeResponse(
-            message="Scraping completed",
-            jobs_found=len(jobs),
-            jobs_saved=saved_count
+            message=message,
+            jobs_found=result['jobs_found'],
+            jobs_saved=result['jobs_saved'],
+            jobs_updated=result['jobs_updated'],
+            sources=result['sources'],
+            elapsed=result['elapsed'],
+            jobs_enriched=result['jobs_enriched'],
+            stages=result['stages'],
+            errors=result['errors'],
+            failed_items=result['failed_items'],
+            coalesced=how if how != RAN else None
         )
 
     except Exception as e:
         logger.error(f"Error scraping jobs: {e}")
-        db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/tasks")
+def list_tasks(state: Optional[str] = None, skip: int = 0, limit: int = 50, db: Session = Depends(get_db)):
+    """List scrape tasks, newest first, optionally only those in one state"""
+    tasks = db.query(ScrapeTask)
+    if state:
+        tasks = tasks.filter(ScrapeTask.state == state)
+    return [task_to_dict(task) for task in tasks.order_by(ScrapeTask.id.desc()).offset(skip).limit(limit).all()]
+
+
+@router.get("/tasks/{task_id}")
+def get_task(task_id: int, db: Session = Depends(get_db)):
+    """Get a scrape task's state, per-source progress, counts, durations and error"""
+    task = db.query(ScrapeTask).filter(ScrapeTask.id == task_id).first()
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return task_to_dict(task)
+
+
+@router.get("/watermarks")
+def get_watermarks(db: Session = Depends(get_db)):
+    """List incremental scrape watermarks, most recently run first"""
+    watermarks = db.query(ScrapeWatermark).order_by(ScrapeWatermark.last_run_at.desc()).all()
+    return [
+        {
+            'source': watermark.source,
+            'query': watermark.query,
+            'location': watermark.location,
+            'runs': watermark.runs,
+            'last_run_at': watermark.last_run_at,
+            'last_new_at': watermark.last_new_at,
+            'pages_fetched': watermark.pages_fetched,
+            'jobs_found': watermark.jobs_found,
+            'jobs_new': watermark.jobs_new
+        }
+        for watermark in watermarks
+    ]
+
+
+@router.get("/analysis-cache")
+def get_analysis_cache_stats():
+    """Get hit/miss counters for the NLP analysis cache"""
+    return analysis_cache.stats()
+
+
+@router.get("/http-stats")
+def get_http_stats():
+    """Get request counts, connection reuse and throttling of the scrape engine"""
+    return scrape_engine.stats()
+
+
+@router.get("/coalescing")
+def get_coalescing_stats():
+    """Get counts of scrapes run, joined while in flight and answered from recent results"""
+    return scrape_flights.stats()
+
+
+@router.get("/health")
+def get_scraper_health():
+    """Get circuit state, error rate and backoff of each source and host, and board snapshot stats"""
+    hosts = scrape_engine.breaker.stats()
+    snapshots = multi_scraper.snapshot_stats()
+    sources = {}
+    for source, host in multi_scraper.source_hosts().items():
+        # Sources that have not sent a request yet are healthy
+        sources[source] = dict(hosts.get(host) or {'state': 'closed', 'error_rate': 0.0, 'requests': 0}, host=host)
+        if source in snapshots:
+            sources[source]['snapshot'] = snapshots[source]
+    return {'sources': sources, 'hosts': hosts}
+
+
+@router.get("/parse-stats")
+def get_parse_stats():
+    """Get per-site result page parse times"""
+    return parse_stats.stats()
@@ -6,6 +6,7 @@ from passlib.context import CryptContext
 
 from app.core.database import get_db
 from app.models.models import User, UserProfile
+from app.services.match_scores import match_score_updater
 
 router = APIRouter()
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -157,6 +158,7 @@ def create_user_profile(
         existing_profile.remote_preference = profile.remote_preference
         db.commit()
         db.refresh(existing_profile)
+        match_score_updater.schedule_user(user_id)
         return existing_profile
     else:
         # Create new profile
@@ -186,6 +188,7 @@ def create_user_profile(
         db.add(db_profile)
         db.commit()
         db.refresh(db_profile)
+        match_score_updater.schedule_user(user_id)
         return db_profile
 
 
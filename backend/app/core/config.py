@@ -19,7 +19,84 @@ class Settings(BaseSettings):
 
     # Scraping
     HEADLESS_BROWSER: bool = True
-    SCRAPING_DELAY: int = 2
+    SCRAPING_DELAY: int = 2  # seconds between requests to the same host (token bucket rate)
+    SCRAPING_BURST: int = 1  # requests a host may get back to back after being idle
+    SCRAPE_DEADLINE: float = 120  # seconds per source before a scrape is cancelled
+
+    # Shared async scraper HTTP client
+    HTTP_MAX_CONNECTIONS: int = 20  # concurrent connections across all hosts
+    HTTP_MAX_KEEPALIVE: int = 10  # idle connections kept alive for reuse
+    HTTP_CONNECT_TIMEOUT: float = 5
+    HTTP_READ_TIMEOUT: float = 10
+
+    # Per-host backoff and circuit breaker
+    BACKOFF_BASE: float = 2  # seconds after the first failure, doubling per failure in a row
+    BACKOFF_MAX: float = 120  # cap on that backoff (Retry-After is honoured beyond it)
+    CIRCUIT_FAILURE_THRESHOLD: int = 5  # failures in a row before a host is cut off
+    CIRCUIT_COOLDOWN: float = 300  # seconds a host stays cut off before a probe request
+    HEALTH_WINDOW: int = 50  # recent requests per host the reported error rate covers
+
+    # Scraper response cache
+    HTTP_CACHE_ENABLED: bool = True
+    HTTP_CACHE_PATH: str = "./data/http_cache.sqlite3"
+    HTTP_CACHE_MAX_MB: int = 100  # body bytes kept before least recently used entries are evicted
+    HTTP_CACHE_TTL: int = 300  # seconds a response is served without revalidation
+    HTTP_DETAIL_CACHE_TTL: int = 86400  # job detail pages change rarely
+
+    # Offline scraping: record/replay fixtures and a stand-in upstream
+    SCRAPE_FIXTURE_MODE: str = "off"  # off, record (save live responses) or replay (never touch the network)
+    SCRAPE_FIXTURE_DIR: str = "./data/scrape_fixtures"
+    SCRAPE_FIXTURE_LATENCY: float = 0  # seconds added to each replayed response
+    SCRAPE_FIXTURE_JITTER: float = 0  # +/- seconds of random variation on that latency
+    SCRAPE_UPSTREAM_OVERRIDE: str = ""  # send every scraper request to this base URL (e.g. the fixture server)
+
+    # Scrape task workers
+    SCRAPE_WORKERS: int = 2  # threads running queued scrapes in the API process (0 = external workers only)
+    SCRAPE_TASK_POLL_INTERVAL: float = 5  # seconds between checks for tasks queued by other processes
+    SCRAPE_TASK_PROGRESS_INTERVAL: float = 1  # minimum seconds between progress writes per task
+    SCRAPE_TASK_STALE_AFTER: float = 3600  # seconds without progress before a running task is requeued
+    SCRAPE_TASK_MAX_ATTEMPTS: int = 3  # runs of an abandoned task before it is marked failed
+
+    # Identical scrape requests
+    SCRAPE_COALESCE_TTL: float = 60  # seconds a finished scrape answers identical requests (0 = only while running)
+
+    # Detail page enrichment
+    ENRICH_MAX_CONCURRENCY: int = 8  # detail pages fetched at once (per-host rate limits still apply)
+
+    # Incremental scraping
+    SEEN_FILTER_CAPACITY: int = 1_000_000  # URLs the Bloom filter is sized for
+    SEEN_FILTER_ERROR_RATE: float = 0.001
+    SEEN_FILTER_MAX_AGE: int = 600  # seconds before the filter is rebuilt from the database
+
+    # Streaming scrape ingest
+    PIPELINE_QUEUE_SIZE: int = 4  # batches buffered between stages
+    PIPELINE_BATCH_SIZE: int = 100  # jobs per analyzed and committed batch
+    PIPELINE_ENRICH_WORKERS: int = 2
+    PIPELINE_ANALYZE_WORKERS: int = 2
+
+    # NLP batch analysis
+    NLP_MAX_WORKERS: int = 0  # 0 = one process per CPU core
+    NLP_BATCH_CHUNK_SIZE: int = 50
+    NLP_PARALLEL_THRESHOLD: int = 100  # smaller batches run in-process
+
+    # NLP analysis cache
+    ANALYSIS_CACHE_SIZE: int = 10000
+    ANALYSIS_CACHE_PERSIST: bool = False
+
+    # Similar jobs index
+    SIMILARITY_INDEX_DIR: str = "./data/similarity_index"
+    SIMILARITY_INDEX_SAVE_EVERY: int = 500  # changes between saves; always saved on shutdown
+    SIMILARITY_INDEX_SYNC_INTERVAL: int = 60  # seconds between catch-ups with jobs saved by other processes
+
+    # Near-duplicate detection
+    DEDUP_ENABLED: bool = True
+    DEDUP_THRESHOLD: float = 0.8  # estimated Jaccard similarity of description shingles
+    DEDUP_NUM_PERM: int = 128
+    DEDUP_BANDS: int = 16
+
+    # Bulk match scoring
+    MATCH_ENGINE_MAX_AGE: int = 60  # seconds before the job x skill matrix is rebuilt
+    MATCH_SCORE_BATCH_SIZE: int = 1000
 
     # App
     PROJECT_NAME: str = "Job Application Automation"
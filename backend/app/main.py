@@ -1,12 +1,18 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
-from app.core.database import engine
+from app.core.database import engine, SessionLocal
 from app.models.models import Base
 from app.api import jobs, applications, users, scraper, auth
+from app.services.similarity_index import similarity_index
+from app.services.dedup_service import duplicate_detector
+from app.services.match_scores import match_score_updater
+from app.services.skill_index import backfill_job_skills
+from app.services.search_index import job_search
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
+job_search.setup(engine)
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -43,6 +49,34 @@ async def root():
     }
 
 
+# Load search indexes and start the scrape workers and board refresh on startup
+@app.on_event("startup")
+def load_indexes():
+    similarity_index.load_or_build(SessionLocal)
+
+    db = SessionLocal()
+    try:
+        backfill_job_skills(db)
+        if settings.DEDUP_ENABLED:
+            duplicate_detector.backfill(db)
+    finally:
+        db.close()
+
+    scraper.scrape_worker.start()
+    scraper.multi_scraper.start_background_refresh()
+
+
+# Release worker pools and persist indexes on shutdown
+@app.on_event("shutdown")
+def shutdown_workers():
+    scraper.scrape_worker.stop()
+    scraper.multi_scraper.stop_background_refresh()
+    scraper.scrape_engine.close()
+    scraper.nlp_analyzer.shutdown()
+    match_score_updater.shutdown()
+    similarity_index.save()
+
+
 # Health check
 @app.get("/health")
 async def health_check():
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Float, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, BigInteger, String, Text, DateTime, Float, ForeignKey, Boolean, LargeBinary, Index, UniqueConstraint
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -87,6 +87,7 @@ class Job(Base):
 
     # Relationships
     applications = relationship("JobApplication", back_populates="job")
+    skills = relationship("JobSkill", back_populates="job", cascade="all, delete-orphan")
 
 
 class JobApplication(Base):
@@ -107,3 +108,139 @@ class JobApplication(Base):
     # Relationships
     user = relationship("User", back_populates="applications")
     job = relationship("Job", back_populates="applications")
+
+
+class AnalysisCacheEntry(Base):
+    __tablename__ = "analysis_cache"
+
+    # sha256 of the analyzer version and normalized job text
+    key = Column(String(64), primary_key=True)
+    version = Column(Integer, index=True, nullable=False)
+    result = Column(Text, nullable=False)  # JSON string
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class JobSignature(Base):
+    __tablename__ = "job_signatures"
+
+    job_id = Column(Integer, ForeignKey("jobs.id"), primary_key=True)
+    signature = Column(LargeBinary, nullable=False)  # MinHash values as uint32 bytes
+
+    # Relationships
+    job = relationship("Job")
+
+
+class JobLSHBucket(Base):
+    __tablename__ = "job_lsh_buckets"
+
+    id = Column(Integer, primary_key=True, index=True)
+    band = Column(Integer, nullable=False)
+    bucket = Column(BigInteger, nullable=False)
+    job_id = Column(Integer, ForeignKey("jobs.id"), index=True)
+
+    # Relationships
+    job = relationship("Job")
+
+    __table_args__ = (
+        Index("ix_job_lsh_buckets_band_bucket", "band", "bucket"),
+    )
+
+
+class JobDuplicate(Base):
+    __tablename__ = "job_duplicates"
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_url = Column(String, unique=True)
+    canonical_job_id = Column(Integer, ForeignKey("jobs.id"), index=True)
+    title = Column(String)
+    company = Column(String)
+    source = Column(String)
+    similarity = Column(Float)
+    detected_at = Column(DateTime, default=datetime.utcnow)
+
+    # Relationships
+    canonical_job = relationship("Job")
+
+
+class JobMatchScore(Base):
+    __tablename__ = "job_match_scores"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    job_id = Column(Integer, ForeignKey("jobs.id"), nullable=False, index=True)
+    score = Column(Float, nullable=False)
+    computed_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "job_id", name="uq_job_match_scores_user_job"),
+        # "Top matches for user X" is a range scan on this index
+        Index("ix_job_match_scores_user_score", "user_id", "score"),
+    )
+
+
+class JobSkill(Base):
+    __tablename__ = "job_skills"
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_id = Column(Integer, ForeignKey("jobs.id"), nullable=False, index=True)
+    skill = Column(String, nullable=False)
+
+    # Relationships
+    job = relationship("Job", back_populates="skills")
+
+    __table_args__ = (
+        UniqueConstraint("job_id", "skill", name="uq_job_skills_job_skill"),
+        # Postings list per skill
+        Index("ix_job_skills_skill_job", "skill", "job_id"),
+    )
+
+
+# Informational: incremental crawls stop on the stored job URLs, not on these
+class ScrapeWatermark(Base):
+    __tablename__ = "scrape_watermarks"
+
+    id = Column(Integer, primary_key=True, index=True)
+    source = Column(String, nullable=False)
+    query = Column(String, nullable=False)  # normalized (stripped, lowercased)
+    location = Column(String, nullable=False, default="")
+    runs = Column(Integer, nullable=False, default=0)
+    last_run_at = Column(DateTime)
+    last_new_at = Column(DateTime)  # last run that found an unseen posting
+    pages_fetched = Column(Integer, default=0)  # by the last run
+    jobs_found = Column(Integer, default=0)
+    jobs_new = Column(Integer, default=0)
+
+    __table_args__ = (
+        UniqueConstraint("source", "query", "location", name="uq_scrape_watermarks_source_query_location"),
+    )
+
+
+class ScrapeTask(Base):
+    __tablename__ = "scrape_tasks"
+
+    id = Column(Integer, primary_key=True, index=True)
+    query = Column(String, nullable=False)
+    location = Column(String, nullable=False, default="")
+    num_pages = Column(Integer, nullable=False, default=1)
+    sources = Column(Text, nullable=False)  # JSON list
+    enrich_details = Column(Boolean, default=False)
+    incremental = Column(Boolean, default=False)
+
+    state = Column(String, nullable=False, default="queued", index=True)  # queued, running, succeeded, partial, failed
+    worker = Column(String, nullable=True)  # host:pid/thread that ran it
+    attempts = Column(Integer, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, nullable=True)  # last progress report (heartbeat)
+    finished_at = Column(DateTime, nullable=True)
+
+    jobs_found = Column(Integer, default=0)
+    jobs_saved = Column(Integer, default=0)
+    jobs_updated = Column(Integer, default=0)
+    jobs_enriched = Column(Integer, default=0)
+    progress = Column(Text, nullable=True)  # JSON: per-source state and stats
+    stages = Column(Text, nullable=True)  # JSON: per-stage pipeline stats
+    coalesced = Column(String, nullable=True)  # answered by an identical scrape (in_flight/recent)
+    errors = Column(Integer, default=0)  # failed pipeline batches and jobs
+    failed_items = Column(Integer, default=0)  # items dropped by those failures
+    error = Column(Text, nullable=True)
@@ -1,7 +1,10 @@
-import requests
-from typing import List, Dict
+import httpx
+from typing import AsyncIterator, List, Dict
 from datetime import datetime
 import logging
+from .async_engine import ScrapeEngine, in_order, scrape_engine
+from .circuit_breaker import CircuitOpenError
+from .incremental import IncrementalCrawl
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -15,12 +18,13 @@ class AdzunaScraper:
     Free tier: 1000 calls/month
     """
 
-    def __init__(self, app_id: str = None, app_key: str = None):
+    def __init__(self, app_id: str = None, app_key: str = None, engine: ScrapeEngine = None):
         self.base_url = "https://api.adzuna.com/v1/api/jobs"
         # Demo credentials - replace with your own from https://developer.adzuna.com/
         self.app_id = app_id or "YOUR_APP_ID"  # Get from Adzuna
         self.app_key = app_key or "YOUR_APP_KEY"  # Get from Adzuna
         self.country = "us"  # United States
+        self.engine = engine or scrape_engine
 
     def search_jobs(self, query: str, location: str = "", num_pages: int = 1) -> List[Dict]:
         """
@@ -34,47 +38,78 @@ class AdzunaScraper:
         Returns:
             List of job dictionaries
         """
+        return self.engine.run(self.search_jobs_async(query, location, num_pages))
+
+    async def search_jobs_async(self, query: str, location: str = "", num_pages: int = 1,
+                                crawl: IncrementalCrawl = None) -> List[Dict]:
+        """
+        Search for jobs using Adzuna API (runs on the engine loop)
+
+        All pages are fetched concurrently, or one by one until nothing new
+        turns up when an incremental crawl is given.
+        """
+        jobs = [job async for page_jobs in self.iter_pages(query, location, num_pages, crawl) for job in page_jobs]
+
+        logger.info(f"Total jobs scraped: {len(jobs)}")
+        return jobs
+
+    async def iter_pages(self, query: str, location: str = "", num_pages: int = 1,
+                         crawl: IncrementalCrawl = None) -> AsyncIterator[List[Dict]]:
+        """Yield the jobs of each API results page, in page order, as soon as it arrives"""
+        if crawl is not None:
+            pages = crawl.pages(lambda page: self._fetch_page(query, location, page, raise_errors=True), num_pages)
+        else:
+            pages = in_order(self._fetch_page(query, location, page) for page in range(num_pages))
+        async for page_jobs in pages:
+            yield page_jobs
+
+    async def _fetch_page(self, query: str, location: str, page: int, raise_errors: bool = False) -> List[Dict]:
+        """Fetch and parse one page of API results (errors give no jobs, or are raised with raise_errors)"""
         jobs = []
         results_per_page = 10
 
-        for page in range(num_pages):
-            try:
-                url = f"{self.base_url}/{self.country}/search/{page + 1}"
-
-                params = {
-                    'app_id': self.app_id,
-                    'app_key': self.app_key,
-                    'what': query,
-                    'where': location,
-                    'results_per_page': results_per_page,
-                    'content-type': 'application/json'
-                }
-
-                response = requests.get(url, params=params, timeout=10)
-                response.raise_for_status()
-
-                data = response.json()
-                results = data.get('results', [])
-
-                logger.info(f"Found {len(results)} jobs on page {page + 1}")
-
-                for job in results:
-                    try:
-                        job_data = self._parse_job(job)
-                        if job_data:
-                            jobs.append(job_data)
-                    except Exception as e:
-                        logger.error(f"Error parsing job: {e}")
-                        continue
-
-            except requests.exceptions.RequestException as e:
-                logger.error(f"Error fetching page {page + 1}: {e}")
-                continue
-            except Exception as e:
-                logger.error(f"Unexpected error on page {page + 1}: {e}")
-                continue
+        try:
+            url = f"{self.base_url}/{self.country}/search/{page + 1}"
+
+            params = {
+                'app_id': self.app_id,
+                'app_key': self.app_key,
+                'what': query,
+                'where': location,
+                'results_per_page': results_per_page,
+                'content-type': 'application/json'
+            }
+
+            # API with its own quota, not throttled like page scrapes
+            response = await self.engine.fetch(url, throttle=False, params=params)
+            response.raise_for_status()
+
+            data = response.json()
+            results = data.get('results', [])
+
+            logger.info(f"Found {len(results)} jobs on page {page + 1}")
+
+            for job in results:
+                try:
+                    job_data = self._parse_job(job)
+                    if job_data:
+                        jobs.append(job_data)
+                except Exception as e:
+                    logger.error(f"Error parsing job: {e}")
+                    continue
+
+        except CircuitOpenError:
+            # The source is cut off: stop instead of failing every remaining page
+            raise
+        except httpx.HTTPError as e:
+            if raise_errors:
+                raise
+            logger.error(f"Error fetching page {page + 1}: {e}")
+        except Exception as e:
+            if raise_errors:
+                raise
+            logger.error(f"Unexpected error on page {page + 1}: {e}")
 
-        logger.info(f"Total jobs scraped: {len(jobs)}")
         return jobs
 
     def _parse_job(self, job: Dict) -> Dict:
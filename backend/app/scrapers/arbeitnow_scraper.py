@@ -1,21 +1,102 @@
-import requests
-from typing import List, Dict
+import asyncio
+import re
+import time
+from concurrent.futures import Future
+import httpx
+from typing import AsyncIterator, List, Dict, Optional
 from datetime import datetime
 import logging
+from .async_engine import ScrapeEngine, scrape_engine
+from .incremental import IncrementalCrawl
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+_TOKEN_PATTERN = re.compile(r'\w+')
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercased word tokens"""
+    return _TOKEN_PATTERN.findall((text or '').lower())
+
+
+class ArbeitnowSnapshot:
+    """
+    Local copy of the whole Arbeitnow board with a token index
+
+    The index maps every token of a job's title and tags to the positions
+    of the jobs containing it, so a query is a few set intersections.
+    """
+
+    def __init__(self):
+        self.jobs: List[Dict] = []
+        self.index: Dict[str, List[int]] = {}
+        self.pages = 0
+        self.truncated = False  # max_pages was reached with more pages left
+        self.fetched_at = time.monotonic()
+
+    def add(self, job: Dict, raw: Dict):
+        """Append a parsed job, indexing the title and tags of its raw record"""
+        position = len(self.jobs)
+        self.jobs.append(job)
+        tokens = set(tokenize(raw.get('title', '')))
+        for tag in raw.get('tags') or []:
+            tokens.update(tokenize(tag))
+        for token in tokens:
+            self.index.setdefault(token, []).append(position)
+
+    def search(self, query: str, limit: int) -> List[Dict]:
+        """
+        Find jobs whose title or tags contain every token of the query
+
+        Args:
+            query: Job search query
+            limit: Maximum number of jobs to return
+
+        Returns:
+            Copies of the matching jobs, in board order
+        """
+        tokens = set(tokenize(query))
+        if not tokens:
+            return []
+
+        postings = sorted((self.index.get(token, []) for token in tokens), key=len)
+        matches = set(postings[0])
+        for posting in postings[1:]:
+            if not matches:
+                break
+            matches.intersection_update(posting)
+
+        return [dict(self.jobs[position]) for position in sorted(matches)[:limit]]
+
+    def age(self) -> float:
+        """Seconds since the snapshot was fetched"""
+        return time.monotonic() - self.fetched_at
+
 
 class ArbeitnowScraper:
     """
     Scraper for Arbeitnow Job Board API
     Free API with no authentication required
     Good for international jobs, especially tech roles
+
+    The API has no search, so the whole board is crawled page by page into
+    an ArbeitnowSnapshot and queries are answered from its token index.
+    start_refreshing() recrawls the board every refresh_interval seconds
+    on the engine loop, so queries never wait for a crawl; without it (or
+    before its first crawl finished) a query crawls once if there is no
+    snapshot yet and starts a refresh, without waiting, if it is stale.
     """
 
-    def __init__(self):
+    def __init__(self, engine: ScrapeEngine = None, refresh_interval: float = 900, max_pages: int = 50):
         self.base_url = "https://www.arbeitnow.com/api/job-board-api"
+        self.engine = engine or scrape_engine
+        self.refresh_interval = refresh_interval
+        self.max_pages = max_pages
+
+        self._snapshot: Optional[ArbeitnowSnapshot] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._refresher: Optional[Future] = None
 
     def search_jobs(self, query: str, location: str = "", num_pages: int = 1) -> List[Dict]:
         """
@@ -24,59 +105,142 @@ class ArbeitnowScraper:
         Args:
             query: Job search query (e.g., "Python Developer")
             location: Location for job search (not used by this API)
-            num_pages: Number of pages to fetch
+            num_pages: Number of pages of results (10 per page)
 
         Returns:
             List of job dictionaries
         """
-        jobs = []
+        return self.engine.run(self.search_jobs_async(query, location, num_pages))
 
-        try:
-            # Arbeitnow API doesn't support pagination the same way
-            # We'll fetch and filter results
-            response = requests.get(self.base_url, timeout=10)
-            response.raise_for_status()
+    async def search_jobs_async(self, query: str, location: str = "", num_pages: int = 1,
+                                crawl: IncrementalCrawl = None) -> List[Dict]:
+        """
+        Search the local board snapshot (runs on the engine loop)
 
-            data = response.json()
-            results = data.get('data', [])
+        crawl is accepted for interface parity; the snapshot costs no
+        requests per query, so there is nothing to stop early.
+        """
+        snapshot = await self._get_snapshot()
+        if snapshot is None:
+            return []
 
-            logger.info(f"Fetched {len(results)} total jobs from Arbeitnow")
+        # Limit results based on num_pages (10 per page)
+        jobs = snapshot.search(query, num_pages * 10)
+        logger.info(f"Found {len(jobs)} jobs matching '{query}' in {len(snapshot.jobs)} Arbeitnow jobs")
+        return jobs
+
+    async def iter_pages(self, query: str, location: str = "", num_pages: int = 1,
+                         crawl: IncrementalCrawl = None) -> AsyncIterator[List[Dict]]:
+        """Yield the snapshot matches in pages of 10"""
+        jobs = await self.search_jobs_async(query, location, num_pages, crawl)
+        for start in range(0, len(jobs), 10):
+            yield jobs[start:start + 10]
+
+    def start_refreshing(self):
+        """Recrawl the board every refresh_interval seconds on the engine loop"""
+        if self._refresher is None or self._refresher.done():
+            self._refresher = self.engine.submit(self._refresh_periodically())
 
-            # Filter jobs based on query
-            query_lower = query.lower()
-            filtered_jobs = []
+    def stop_refreshing(self):
+        """Stop the periodic recrawl"""
+        if self._refresher is not None:
+            self._refresher.cancel()
+            self._refresher = None
 
-            for job in results:
-                title = job.get('title', '').lower()
-                tags = ' '.join(job.get('tags', [])).lower()
-                description = job.get('description', '').lower()
+    async def _refresh_periodically(self):
+        """Crawl now and then every refresh_interval seconds, until cancelled"""
+        while True:
+            await self._start_refresh()
+            await asyncio.sleep(self.refresh_interval)
 
-                # Check if query matches title, tags, or description
-                if query_lower in title or query_lower in tags or query_lower in description:
-                    filtered_jobs.append(job)
+    def _start_refresh(self) -> asyncio.Future:
+        """The running crawl, or a new one (call on the engine loop)"""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.ensure_future(self.refresh())
+        # Shielded: a cancelled caller must not abort the shared crawl
+        return asyncio.shield(self._refresh_task)
 
-            # Limit results based on num_pages (10 per page)
-            limit = num_pages * 10
-            filtered_jobs = filtered_jobs[:limit]
+    async def _get_snapshot(self) -> Optional[ArbeitnowSnapshot]:
+        """Return the current snapshot, crawling first if there is none yet"""
+        snapshot = self._snapshot
+        if snapshot is None:
+            await self._start_refresh()
+            return self._snapshot
 
-            logger.info(f"Found {len(filtered_jobs)} jobs matching '{query}'")
+        if snapshot.age() >= self.refresh_interval and (self._refresher is None or self._refresher.done()):
+            # Not refreshed periodically: refresh now, answering from the stale copy meanwhile
+            self._start_refresh()
+        return snapshot
 
-            for job in filtered_jobs:
-                try:
-                    job_data = self._parse_job(job)
-                    if job_data:
-                        jobs.append(job_data)
-                except Exception as e:
-                    logger.error(f"Error parsing job: {e}")
-                    continue
+    def snapshot_stats(self) -> Dict:
+        """Size, age and completeness of the snapshot in use"""
+        snapshot = self._snapshot
+        return {
+            'jobs': len(snapshot.jobs) if snapshot is not None else 0,
+            'pages': snapshot.pages if snapshot is not None else 0,
+            'age_seconds': round(snapshot.age(), 1) if snapshot is not None else None,
+            'truncated': snapshot.truncated if snapshot is not None else False,
+            'refreshing_periodically': self._refresher is not None and not self._refresher.done()
+        }
+
+    async def refresh(self) -> Optional[ArbeitnowSnapshot]:
+        """
+        Crawl every page of the board into a new snapshot
 
-        except requests.exceptions.RequestException as e:
+        Pages are parsed one at a time and only the parsed jobs are kept, so
+        memory holds at most one raw page. If the crawl fails part way the
+        previous snapshot is kept (a partial one is used only if there is
+        no previous snapshot).
+
+        Returns:
+            The snapshot in use after the refresh
+        """
+        snapshot = ArbeitnowSnapshot()
+        url = self.base_url
+        complete = False
+
+        try:
+            while url and snapshot.pages < self.max_pages:
+                response = await self.engine.fetch(url, throttle=False)
+                response.raise_for_status()
+                data = response.json()
+                del response
+
+                results = data.get('data') or []
+                for job in results:
+                    try:
+                        job_data = self._parse_job(job)
+                        if job_data:
+                            snapshot.add(job_data, job)
+                    except Exception as e:
+                        logger.error(f"Error parsing job: {e}")
+                        continue
+
+                snapshot.pages += 1
+                url = (data.get('links') or {}).get('next') if results else None
+                del data
+
+            if url:
+                snapshot.truncated = True
+                logger.warning(
+                    f"Arbeitnow crawl stopped at max_pages={self.max_pages} with more pages left: "
+                    f"the snapshot misses the rest of the board"
+                )
+            complete = True
+
+        except httpx.HTTPError as e:
             logger.error(f"Error fetching jobs from Arbeitnow: {e}")
         except Exception as e:
             logger.error(f"Unexpected error: {e}")
 
-        logger.info(f"Total jobs parsed: {len(jobs)}")
-        return jobs
+        if complete or self._snapshot is None and snapshot.jobs:
+            snapshot.fetched_at = time.monotonic()
+            self._snapshot = snapshot
+            logger.info(
+                f"Arbeitnow snapshot: {len(snapshot.jobs)} jobs from {snapshot.pages} pages, "
+                f"{len(snapshot.index)} tokens"
+            )
+        return self._snapshot
 
     def _parse_job(self, job: Dict) -> Dict:
         """Parse individual job from Arbeitnow API response"""
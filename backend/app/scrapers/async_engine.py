@@ -0,0 +1,395 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import AsyncIterator, Awaitable, Dict, Iterable, Optional, Tuple
+from urllib.parse import urlsplit
+import logging
+
+import httpx
+
+from app.core.config import settings
+from .circuit_breaker import CircuitBreaker, HostHealth
+from .fixtures import FixtureStore
+from .http_cache import HttpCache
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def full_url(url: str, params=None) -> str:
+    """URL with params merged into any query string it already carries"""
+    target = httpx.URL(url)
+    return str(target.copy_merge_params(params) if params else target)
+
+
+async def in_order(coros: Iterable[Awaitable]) -> AsyncIterator:
+    """
+    Run coroutines concurrently and yield their results in the given order
+
+    Each result is yielded as soon as it and all earlier ones are done;
+    closing the iterator early cancels whatever is still running.
+    """
+    tasks = [asyncio.ensure_future(coro) for coro in coros]
+    try:
+        for task in tasks:
+            yield await task
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+class TokenBucket:
+    """
+    Token bucket rate limiter for one host
+
+    Refills at rate tokens per second up to capacity. Each acquire() takes a
+    token, reserving a future one (and sleeping until it is due) when the
+    bucket is empty, so concurrent callers are spaced out in arrival order.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.scale = 1.0  # slowed down while the host pushes back
+
+    def reserve(self) -> float:
+        """Take a token and return how many seconds until it may be used"""
+        if self.rate <= 0:
+            return 0.0
+        rate = self.rate * self.scale
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * rate)
+        self.updated = now
+        self.tokens -= 1
+        return max(-self.tokens / rate, 0.0)
+
+    async def acquire(self) -> float:
+        """
+        Wait for a token
+
+        Returns:
+            Seconds spent waiting
+        """
+        # No await between reading and updating the bucket, so the event
+        # loop makes this atomic without a lock
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+
+class ScrapeEngine:
+    """
+    Asynchronous HTTP engine shared by all scrapers
+
+    Runs one httpx.AsyncClient on a dedicated event loop thread, with
+    keep-alive connection pools and a token bucket per host in place of
+    blocking sleeps. A circuit breaker tracks each host's health: hosts
+    that throttle or fail are backed off and slowed down, and cut off
+    for a cool-down after repeated failures. Coroutines can be awaited from any event loop with
+    call() (cancellation propagates to the engine) or run to completion
+    from synchronous code with run(); both accept a deadline in seconds.
+    """
+
+    def __init__(self, delay: float = 2, burst: float = 1, max_connections: int = 20,
+                 max_keepalive: int = 10, timeout: Tuple[float, float] = (5, 10),
+                 cache: Optional[HttpCache] = None, detail_ttl: float = 86400,
+                 fixtures: Optional[FixtureStore] = None, upstream: Optional[str] = None,
+                 breaker: Optional[CircuitBreaker] = None):
+        """
+        Args:
+            delay: Seconds between requests to the same host (0 = unlimited)
+            burst: Requests a host may receive back to back after being idle
+            max_connections: Concurrent connections across all hosts
+            max_keepalive: Idle connections kept alive for reuse
+            timeout: (connect, read) timeout in seconds
+            cache: Persistent response cache (None = always fetch)
+            detail_ttl: Cache freshness for job detail pages, in seconds
+            fixtures: Record responses to, or replay them from, a fixture store
+            upstream: Base URL every request is sent to instead of the real
+                host, which travels in X-Forwarded-Host/-Proto (stand-in server)
+            breaker: Per-host backoff and circuit breaking (default settings if None)
+        """
+        self.rate = 1 / delay if delay > 0 else 0
+        self.burst = burst
+        self.limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive)
+        self.timeout = httpx.Timeout(timeout[1], connect=timeout[0])
+        self.cache = cache
+        self.detail_ttl = detail_ttl
+        self.fixtures = fixtures
+        self.upstream = httpx.URL(upstream) if upstream else None
+        self.breaker = breaker or CircuitBreaker()
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._start_lock = threading.Lock()
+        self._buckets: Dict[str, TokenBucket] = {}
+
+        self.requests_sent = 0
+        self.errors = 0
+        self.connections_opened = 0
+        self._host_stats: Dict[str, Dict] = {}
+
+    def set_host_delay(self, host: str, delay: float):
+        """Use a different delay (seconds between requests) for one host"""
+        self._buckets[host.lower()] = TokenBucket(1 / delay if delay > 0 else 0, self.burst)
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """The engine's event loop, started on first use"""
+        with self._start_lock:
+            if self._loop is None or self._loop.is_closed():
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever, name="scrape-engine", daemon=True
+                )
+                self._thread.start()
+            return self._loop
+
+    def _in_engine_loop(self) -> bool:
+        """True when called from a coroutine running on the engine loop"""
+        try:
+            return asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            return False
+
+    def submit(self, coro: Awaitable) -> Future:
+        """Schedule a coroutine on the engine loop"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Awaitable, deadline: Optional[float] = None):
+        """
+        Run a coroutine on the engine loop and block until it finishes
+
+        Args:
+            coro: Coroutine to run
+            deadline: Seconds before it is cancelled (None = no limit)
+
+        Raises:
+            concurrent.futures.TimeoutError: If the deadline passed
+        """
+        if self._in_engine_loop():
+            coro.close()
+            raise RuntimeError("ScrapeEngine.run() would block its own event loop, use call()")
+        future = self.submit(coro)
+        try:
+            return future.result(deadline)
+        except (FutureTimeoutError, KeyboardInterrupt):
+            future.cancel()
+            raise
+
+    async def call(self, coro: Awaitable, deadline: Optional[float] = None):
+        """
+        Await a coroutine on the engine loop from any event loop
+
+        Args:
+            coro: Coroutine to run
+            deadline: Seconds before it is cancelled (None = no limit)
+
+        Raises:
+            asyncio.TimeoutError: If the deadline passed
+        """
+        if self._in_engine_loop():
+            return await asyncio.wait_for(coro, deadline)
+        # Cancelling the wrapper (deadline or caller cancelled) cancels the engine task
+        return await asyncio.wait_for(asyncio.wrap_future(self.submit(coro)), deadline)
+
+    async def fetch(self, url: str, throttle: bool = True, cache: bool = True,
+                    ttl: Optional[float] = None, **kwargs) -> httpx.Response:
+        """
+        GET a URL (must be awaited on the engine loop, e.g. inside call/run)
+
+        Fresh cached responses are returned without any network I/O or
+        throttling; stale ones are revalidated with a conditional request.
+        Cache reads and writes run on worker threads, off the engine loop.
+
+        Args:
+            url: URL to fetch
+            throttle: Apply the per-host token bucket
+            cache: Use the response cache, if the engine has one
+            ttl: Seconds a stored response stays fresh (default: the cache's)
+            kwargs: Passed to httpx.AsyncClient.get (headers, params, ...)
+
+        Returns:
+            The response (raise_for_status is left to the caller)
+        """
+        if not cache or self.cache is None:
+            return await self._request(url, throttle, **kwargs)
+
+        request_url = full_url(url, kwargs.get('params'))
+        key = self.cache.make_key(request_url)
+        cached = await asyncio.to_thread(self.cache.get, key)
+
+        if cached is not None:
+            if cached.is_fresh:
+                self.cache.record('hits')
+                return cached.to_response(request_url)
+            kwargs['headers'] = {**(kwargs.get('headers') or {}), **cached.validators()}
+
+        response = await self._request(url, throttle, **kwargs)
+
+        if response.status_code == 304 and cached is not None:
+            await asyncio.to_thread(self.cache.renew, key, response, ttl)
+            self.cache.record('revalidated')
+            return cached.to_response(request_url)
+
+        self.cache.record('misses')
+        if response.status_code == 200:
+            await asyncio.to_thread(self.cache.put, key, response, ttl)
+        return response
+
+    async def _request(self, url: str, throttle: bool, **kwargs) -> httpx.Response:
+        """
+        Send a GET over the network, rate limited per host and guarded by its circuit
+
+        Raises:
+            CircuitOpenError: If the host's circuit is open (nothing is sent)
+        """
+        host = urlsplit(url).netloc.lower()
+        health = self.breaker.host(host)
+        health.before_request()
+        try:
+            response = await self._send(host, health, url, throttle, **kwargs)
+        except httpx.HTTPError as e:
+            health.record_error(e)
+            raise
+        except BaseException:
+            # Cancelled or cut off before an outcome: free the probe slot
+            health.abandon()
+            raise
+
+        health.record_response(response.status_code, response.headers.get('retry-after'))
+        return response
+
+    async def _send(self, host: str, health: HostHealth, url: str, throttle: bool, **kwargs) -> httpx.Response:
+        """Wait for the host's rate limit and backoff, then send the request"""
+        stats = self._host_stats.setdefault(
+            host, {'requests': 0, 'connections': 0, 'errors': 0, 'throttled_seconds': 0.0, 'backoff_seconds': 0.0}
+        )
+
+        if throttle:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = self._buckets[host] = TokenBucket(self.rate, self.burst)
+            bucket.scale = health.rate_factor
+            stats['throttled_seconds'] += await bucket.acquire()
+
+        backoff = health.backoff_remaining()
+        if backoff > 0:
+            stats['backoff_seconds'] += backoff
+            await asyncio.sleep(backoff)
+        health.ensure_closed()
+
+        async def trace(event_name: str, info: Dict):
+            # A completed TCP connect means the request could not reuse a kept-alive connection
+            if event_name == 'connection.connect_tcp.complete':
+                self.connections_opened += 1
+                stats['connections'] += 1
+
+        self.requests_sent += 1
+        stats['requests'] += 1
+
+        request_url = full_url(url, kwargs.get('params'))
+        if self.fixtures is not None and self.fixtures.mode == 'replay':
+            return await self.fixtures.replay(request_url)
+
+        if self.upstream is not None:
+            target = httpx.URL(url)
+            kwargs['headers'] = {
+                **(kwargs.get('headers') or {}),
+                'X-Forwarded-Host': target.netloc.decode('ascii'),
+                'X-Forwarded-Proto': target.scheme
+            }
+            url = str(target.copy_with(scheme=self.upstream.scheme, host=self.upstream.host, port=self.upstream.port))
+
+        try:
+            response = await self._get_client().get(url, extensions={'trace': trace}, **kwargs)
+        except httpx.HTTPError:
+            self.errors += 1
+            stats['errors'] += 1
+            raise
+
+        # 304s carry no body worth replaying
+        if self.fixtures is not None and self.fixtures.mode == 'record' and response.status_code != 304:
+            # A file write: keep it off the engine loop
+            await asyncio.to_thread(self.fixtures.save, request_url, response)
+        return response
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Create the client lazily on the engine loop it will be used from"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                limits=self.limits, timeout=self.timeout, follow_redirects=True
+            )
+        return self._client
+
+    def stats(self) -> Dict:
+        """Return request counts, connection reuse and throttling per host"""
+        hosts = {}
+        for host, stats in list(self._host_stats.items()):
+            hosts[host] = dict(
+                stats,
+                reused=max(stats['requests'] - stats['errors'] - stats['connections'], 0),
+                throttled_seconds=round(stats['throttled_seconds'], 3),
+                backoff_seconds=round(stats['backoff_seconds'], 3)
+            )
+
+        return {
+            'requests': self.requests_sent,
+            'errors': self.errors,
+            'connections_opened': self.connections_opened,
+            'connections_reused': sum(host['reused'] for host in hosts.values()),
+            'hosts': hosts,
+            'cache': self.cache.stats() if self.cache is not None else None,
+            'fixtures': self.fixtures.stats() if self.fixtures is not None else None
+        }
+
+    def close(self):
+        """Close pooled connections and the cache, and stop the engine loop"""
+        if self.cache is not None:
+            self.cache.close()
+
+        with self._start_lock:
+            loop, self._loop = self._loop, None
+        if loop is None:
+            return
+
+        if self._client is not None:
+            client, self._client = self._client, None
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop).result(5)
+        loop.call_soon_threadsafe(loop.stop)
+        self._thread.join(5)
+        loop.close()
+
+
+scrape_engine = ScrapeEngine(
+    delay=settings.SCRAPING_DELAY,
+    burst=settings.SCRAPING_BURST,
+    max_connections=settings.HTTP_MAX_CONNECTIONS,
+    max_keepalive=settings.HTTP_MAX_KEEPALIVE,
+    timeout=(settings.HTTP_CONNECT_TIMEOUT, settings.HTTP_READ_TIMEOUT),
+    cache=HttpCache(
+        settings.HTTP_CACHE_PATH,
+        max_bytes=settings.HTTP_CACHE_MAX_MB * 1024 * 1024,
+        ttl=settings.HTTP_CACHE_TTL
+    ) if settings.HTTP_CACHE_ENABLED else None,
+    detail_ttl=settings.HTTP_DETAIL_CACHE_TTL,
+    fixtures=FixtureStore(
+        settings.SCRAPE_FIXTURE_DIR,
+        mode=settings.SCRAPE_FIXTURE_MODE,
+        latency=settings.SCRAPE_FIXTURE_LATENCY,
+        jitter=settings.SCRAPE_FIXTURE_JITTER
+    ) if settings.SCRAPE_FIXTURE_MODE != "off" else None,
+    upstream=settings.SCRAPE_UPSTREAM_OVERRIDE or None,
+    breaker=CircuitBreaker(
+        failure_threshold=settings.CIRCUIT_FAILURE_THRESHOLD,
+        cooldown=settings.CIRCUIT_COOLDOWN,
+        backoff_base=settings.BACKOFF_BASE,
+        backoff_max=settings.BACKOFF_MAX,
+        window=settings.HEALTH_WINDOW
+    )
+)
@@ -0,0 +1,239 @@
+import time
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# The site is pushing back: back off and slow down
+THROTTLE_STATUSES = {429, 503}
+# Blocked or failing: counts towards opening the circuit, like throttling
+FAILURE_STATUSES = THROTTLE_STATUSES | {403, 500, 502, 504}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request to a host whose circuit is open"""
+
+    def __init__(self, host: str, retry_in: float):
+        self.host = host
+        self.retry_in = retry_in
+        super().__init__(f"Circuit open for {host}, retrying in {retry_in:.0f}s")
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta seconds or HTTP date)"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class HostHealth:
+    """
+    Health of one host: backoff, request rate and circuit state
+
+    Every failure (throttled, blocked, server error or transport error)
+    makes further requests wait backoff_base * 2^(failures - 1) seconds,
+    or as long as Retry-After asks; throttling also halves the request
+    rate, which recovers gradually on success. After failure_threshold
+    failures in a row (or a Retry-After beyond the cooldown) the circuit
+    opens and requests fail immediately for cooldown seconds. Then a
+    single probe request is let through: success closes the circuit,
+    failure opens it again.
+    """
+
+    def __init__(self, host: str, failure_threshold: int = 5, cooldown: float = 300,
+                 backoff_base: float = 2, backoff_max: float = 120, window: int = 50,
+                 min_rate_factor: float = 0.125):
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.min_rate_factor = min_rate_factor
+
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.backoff_until = 0.0
+        self.open_until = 0.0
+        self.rate_factor = 1.0  # multiplier on the host's token bucket rate
+        self._probing = False
+
+        # Recent outcomes (True = success) for the error rate
+        self.outcomes = deque(maxlen=window)
+        self.requests = 0
+        self.failures = 0
+        self.short_circuited = 0
+        self.times_opened = 0
+        self.last_status: Optional[int] = None
+        self.last_error: Optional[str] = None
+
+    def before_request(self):
+        """
+        Admit a request, or raise CircuitOpenError
+
+        Moves an open circuit whose cooldown is over to half-open and lets
+        exactly one probe through.
+        """
+        now = time.monotonic()
+        if self.state == OPEN:
+            if now < self.open_until:
+                self.short_circuited += 1
+                raise CircuitOpenError(self.host, self.open_until - now)
+            self.state = HALF_OPEN
+            self._probing = False
+            logger.info(f"Circuit half-open for {self.host}, sending a probe request")
+
+        if self.state == HALF_OPEN:
+            if self._probing:
+                self.short_circuited += 1
+                raise CircuitOpenError(self.host, 0)
+            self._probing = True
+
+    def ensure_closed(self):
+        """Raise if the circuit opened while a request was waiting to be sent"""
+        if self.state == OPEN:
+            self.short_circuited += 1
+            raise CircuitOpenError(self.host, max(self.open_until - time.monotonic(), 0))
+
+    def abandon(self):
+        """A request ended without an outcome (e.g. cancelled): let another probe through"""
+        if self.state == HALF_OPEN:
+            self._probing = False
+
+    def backoff_remaining(self) -> float:
+        """Seconds a request must still wait after recent failures"""
+        return max(self.backoff_until - time.monotonic(), 0.0)
+
+    def record_response(self, status: int, retry_after: Optional[str] = None):
+        """Record the outcome of a response"""
+        self.last_status = status
+        if status in FAILURE_STATUSES:
+            self._failure(f"HTTP {status}", parse_retry_after(retry_after), status in THROTTLE_STATUSES)
+        else:
+            self._success()
+
+    def record_error(self, error: Exception):
+        """Record a request that failed without a response"""
+        self.last_status = None
+        self._failure(f"{type(error).__name__}: {error}", None, False)
+
+    def _success(self):
+        self.requests += 1
+        self.outcomes.append(True)
+        self.consecutive_failures = 0
+        self.backoff_until = 0.0
+        # Additive increase back to full speed
+        self.rate_factor = min(1.0, self.rate_factor + 0.1)
+        if self.state == HALF_OPEN:
+            self.state = CLOSED
+            self._probing = False
+            logger.info(f"Circuit closed for {self.host}")
+
+    def _failure(self, error: str, retry_after: Optional[float], throttled: bool):
+        self.requests += 1
+        self.failures += 1
+        self.outcomes.append(False)
+        self.consecutive_failures += 1
+        self.last_error = error
+        if throttled:
+            # Multiplicative decrease
+            self.rate_factor = max(self.min_rate_factor, self.rate_factor / 2)
+
+        backoff = min(self.backoff_max, self.backoff_base * 2 ** (self.consecutive_failures - 1))
+        if retry_after is not None:
+            backoff = retry_after
+        now = time.monotonic()
+        self.backoff_until = max(self.backoff_until, now + backoff)
+
+        if (self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold
+                or backoff >= self.cooldown):
+            self.state = OPEN
+            self._probing = False
+            self.open_until = now + max(self.cooldown, backoff)
+            self.times_opened += 1
+            logger.warning(
+                f"Circuit open for {self.host} after {self.consecutive_failures} failures ({error}), "
+                f"cooling down {self.open_until - now:.0f}s"
+            )
+        else:
+            logger.warning(f"{self.host} failed ({error}), backing off {backoff:.1f}s")
+
+    def stats(self) -> Dict:
+        now = time.monotonic()
+        state = self.state
+        if state == OPEN and now >= self.open_until:
+            state = HALF_OPEN  # the next request will probe
+        return {
+            'state': state,
+            'error_rate': round(self.outcomes.count(False) / len(self.outcomes), 3) if self.outcomes else 0.0,
+            'consecutive_failures': self.consecutive_failures,
+            'requests': self.requests,
+            'failures': self.failures,
+            'short_circuited': self.short_circuited,
+            'times_opened': self.times_opened,
+            'backoff_seconds': round(self.backoff_remaining(), 1),
+            'reopens_in': round(max(self.open_until - now, 0), 1) if self.state == OPEN else 0,
+            'rate_factor': round(self.rate_factor, 3),
+            'last_status': self.last_status,
+            'last_error': self.last_error
+        }
+
+
+class CircuitBreaker:
+    """Per-host HostHealth registry used by the ScrapeEngine"""
+
+    def __init__(self, failure_threshold: int = 5, cooldown: float = 300, backoff_base: float = 2,
+                 backoff_max: float = 120, window: int = 50):
+        """
+        Args:
+            failure_threshold: Failures in a row that open a host's circuit
+            cooldown: Seconds an open circuit rejects requests before a probe
+            backoff_base: Seconds of backoff after the first failure (doubles per failure)
+            backoff_max: Upper bound of that backoff (Retry-After is honoured beyond it)
+            window: Recent requests the error rate is computed over
+        """
+        self.options = {
+            'failure_threshold': failure_threshold,
+            'cooldown': cooldown,
+            'backoff_base': backoff_base,
+            'backoff_max': backoff_max,
+            'window': window
+        }
+        self._hosts: Dict[str, HostHealth] = {}
+
+    def host(self, host: str) -> HostHealth:
+        """Health of a host, created on first use"""
+        health = self._hosts.get(host)
+        if health is None:
+            health = self._hosts[host] = HostHealth(host, **self.options)
+        return health
+
+    def is_open(self, host: str) -> bool:
+        health = self._hosts.get(host)
+        return health is not None and health.state == OPEN and time.monotonic() < health.open_until
+
+    def reset(self, host: str = None):
+        """Forget the health of one host, or of all hosts"""
+        if host is None:
+            self._hosts.clear()
+        else:
+            self._hosts.pop(host, None)
+
+    def stats(self) -> Dict[str, Dict]:
+        return {host: health.stats() for host, health in list(self._hosts.items())}
@@ -0,0 +1,92 @@
+"""
+Stand-in upstream that serves recorded scraper fixtures over HTTP
+
+Point the scrapers at it with SCRAPE_UPSTREAM_OVERRIDE=http://host:port;
+the engine then sends every request here with the real host in
+X-Forwarded-Host, and the response recorded for that URL is returned.
+
+    python -m app.scrapers.fixture_server --dir ./data/scrape_fixtures --port 8765 --latency 0.2
+"""
+import argparse
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import logging
+
+from .fixtures import FixtureStore
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def make_handler(store: FixtureStore):
+    """Request handler class bound to a fixture store"""
+
+    class FixtureHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, like the real sites
+
+        def do_GET(self):
+            host = self.headers.get('X-Forwarded-Host') or self.headers.get('Host', '')
+            scheme = self.headers.get('X-Forwarded-Proto', 'https')
+            url = f"{scheme}://{host}{self.path}"
+
+            delay = store.delay()
+            if delay:
+                time.sleep(delay)
+
+            fixture = store.lookup(url)
+            if fixture is None:
+                self.send_response(404)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+
+            self.send_response(fixture.status)
+            for name, value in fixture.headers.items():
+                self.send_header(name, value)
+            self.send_header('Content-Length', str(len(fixture.body)))
+            self.end_headers()
+            self.wfile.write(fixture.body)
+
+        def log_message(self, format, *args):
+            logger.debug(format % args)
+
+    return FixtureHandler
+
+
+def serve_fixtures(store: FixtureStore, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """
+    Start serving a fixture store on a background thread
+
+    Args:
+        store: Fixtures to serve (its latency and jitter apply per request)
+        host: Interface to bind
+        port: Port to bind (0 = any free port, see server.server_port)
+
+    Returns:
+        The running server; call shutdown() to stop it
+    """
+    server = ThreadingHTTPServer((host, port), make_handler(store))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="fixture-server", daemon=True).start()
+    logger.info(f"Serving fixtures from {store.directory} on http://{host}:{server.server_port}")
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve recorded scraper fixtures")
+    parser.add_argument("--dir", default="./data/scrape_fixtures", help="Fixture directory")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to each response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="+/- seconds of random variation")
+    args = parser.parse_args()
+
+    fixture_server = serve_fixtures(
+        FixtureStore(args.dir, latency=args.latency, jitter=args.jitter), args.host, args.port
+    )
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        fixture_server.shutdown()
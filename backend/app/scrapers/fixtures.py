@@ -0,0 +1,210 @@
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import random
+import threading
+from datetime import datetime
+from typing import Dict, Iterator, Optional
+from urllib.parse import urlencode
+import logging
+
+import httpx
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+FIXTURE_FORMAT = "scrape-fixtures"
+FIXTURE_VERSION = 1
+
+# Credentials never end up in fixture keys or files
+REDACTED_PARAMS = {'app_id', 'app_key', 'api_key', 'apikey', 'key', 'token'}
+
+# Bodies are stored decoded, so transfer-level headers no longer apply
+_SKIPPED_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding', 'connection', 'set-cookie'}
+
+FIXTURE_MODES = ('record', 'replay')
+
+
+def normalize_url(url: str) -> str:
+    """Canonical form of a URL for fixture lookups: sorted query, credentials dropped"""
+    parsed = httpx.URL(url)
+    params = sorted(
+        (name, value) for name, value in parsed.params.multi_items() if name.lower() not in REDACTED_PARAMS
+    )
+    base = str(parsed.copy_with(query=None, fragment=None))
+    return f"{base}?{urlencode(params)}" if params else base
+
+
+class Fixture:
+    """One recorded response"""
+
+    def __init__(self, url: str, status: int, headers: Dict[str, str], body: bytes, recorded_at: str = None):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.recorded_at = recorded_at or datetime.utcnow().isoformat()
+
+    def to_dict(self) -> Dict:
+        try:
+            body, encoding = self.body.decode('utf-8'), 'utf-8'
+        except UnicodeDecodeError:
+            body, encoding = base64.b64encode(self.body).decode('ascii'), 'base64'
+        return {
+            'version': FIXTURE_VERSION,
+            'method': 'GET',
+            'url': self.url,
+            'status': self.status,
+            'headers': self.headers,
+            'body_encoding': encoding,
+            'body': body,
+            'recorded_at': self.recorded_at
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Fixture':
+        if data.get('version') != FIXTURE_VERSION:
+            raise ValueError(f"Unsupported fixture version: {data.get('version')}")
+        body = data['body']
+        body = base64.b64decode(body) if data['body_encoding'] == 'base64' else body.encode('utf-8')
+        return cls(data['url'], data['status'], data['headers'], body, data.get('recorded_at'))
+
+    def to_response(self, url: str) -> httpx.Response:
+        return httpx.Response(
+            self.status, headers=self.headers, content=self.body, request=httpx.Request('GET', url)
+        )
+
+
+class FixtureStore:
+    """
+    Record and replay scraper responses as versioned files on disk
+
+    Layout: <directory>/manifest.json names the format and version, and
+    each response lives in <directory>/<host>/<sha256 of the normalized
+    URL>.json with its status, headers and body. In record mode the
+    ScrapeEngine saves every network response; in replay mode it answers
+    from the store instead of the network (404 for unknown URLs), after
+    latency +/- jitter seconds to mimic a real site.
+    """
+
+    def __init__(self, directory: str, mode: str = 'replay', latency: float = 0.0, jitter: float = 0.0):
+        if mode not in FIXTURE_MODES:
+            raise ValueError(f"Fixture mode must be one of {FIXTURE_MODES}")
+        self.directory = directory
+        self.mode = mode
+        self.latency = latency
+        self.jitter = jitter
+
+        self._lock = threading.Lock()
+        self._checked = False
+
+        self.replayed = 0
+        self.missing = 0
+        self.recorded = 0
+
+    @staticmethod
+    def make_key(url: str) -> str:
+        return hashlib.sha256(normalize_url(url).encode('utf-8')).hexdigest()
+
+    def _path(self, url: str) -> str:
+        host = httpx.URL(url).host or 'unknown'
+        return os.path.join(self.directory, host, f"{self.make_key(url)}.json")
+
+    def _check_manifest(self, create: bool):
+        """Create the manifest, or refuse a directory in another format version"""
+        if self._checked:
+            return
+        path = os.path.join(self.directory, 'manifest.json')
+        if os.path.exists(path):
+            with open(path) as f:
+                manifest = json.load(f)
+            if manifest.get('format') != FIXTURE_FORMAT or manifest.get('version') != FIXTURE_VERSION:
+                raise ValueError(f"{self.directory} holds fixtures in an unsupported format: {manifest}")
+        elif create:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(path, 'w') as f:
+                json.dump({'format': FIXTURE_FORMAT, 'version': FIXTURE_VERSION}, f)
+        self._checked = True
+
+    def load(self, url: str) -> Optional[Fixture]:
+        """Return the fixture recorded for a URL, or None"""
+        with self._lock:
+            self._check_manifest(create=False)
+        try:
+            with open(self._path(url)) as f:
+                return Fixture.from_dict(json.load(f))
+        except FileNotFoundError:
+            return None
+
+    def fixtures(self) -> Iterator[Fixture]:
+        """Every fixture in the store, host by host (e.g. for parser tests)"""
+        with self._lock:
+            self._check_manifest(create=False)
+        if not os.path.isdir(self.directory):
+            return
+        for host in sorted(os.listdir(self.directory)):
+            host_directory = os.path.join(self.directory, host)
+            if not os.path.isdir(host_directory):
+                continue
+            for name in sorted(os.listdir(host_directory)):
+                if name.endswith('.json'):
+                    with open(os.path.join(host_directory, name)) as f:
+                        yield Fixture.from_dict(json.load(f))
+
+    def lookup(self, url: str) -> Optional[Fixture]:
+        """load() for serving a request, counting replayed and missing URLs"""
+        fixture = self.load(url)
+        with self._lock:
+            if fixture is None:
+                self.missing += 1
+            else:
+                self.replayed += 1
+        if fixture is None:
+            logger.warning(f"No fixture for {normalize_url(url)}")
+        return fixture
+
+    def save(self, url: str, response: httpx.Response) -> Fixture:
+        """Write a response to the store, replacing any earlier recording"""
+        headers = {
+            name: value for name, value in response.headers.items() if name.lower() not in _SKIPPED_HEADERS
+        }
+        fixture = Fixture(normalize_url(url), response.status_code, headers, response.content)
+        path = self._path(url)
+
+        with self._lock:
+            self._check_manifest(create=True)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write then rename, so a concurrent replay never reads half a file
+            temporary = f"{path}.tmp"
+            with open(temporary, 'w') as f:
+                json.dump(fixture.to_dict(), f)
+            os.replace(temporary, path)
+            self.recorded += 1
+        return fixture
+
+    def delay(self) -> float:
+        """Simulated response time for one replayed request"""
+        return max(0.0, self.latency + random.uniform(-self.jitter, self.jitter))
+
+    async def replay(self, url: str) -> httpx.Response:
+        """Answer a request from the store (runs on the engine loop)"""
+        delay = self.delay()
+        if delay:
+            await asyncio.sleep(delay)
+
+        fixture = await asyncio.to_thread(self.lookup, url)
+        if fixture is None:
+            return httpx.Response(404, content=b'', request=httpx.Request('GET', url))
+        return fixture.to_response(url)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'mode': self.mode,
+                'directory': self.directory,
+                'replayed': self.replayed,
+                'missing': self.missing,
+                'recorded': self.recorded
+            }
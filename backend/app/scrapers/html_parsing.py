@@ -0,0 +1,138 @@
+import threading
+from typing import Dict, List, Optional
+import logging
+
+from bs4.dammit import UnicodeDammit
+from lxml import etree, html
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Strings inside these tags are not page text (BeautifulSoup's get_text skips them too)
+_NON_TEXT_TAGS = frozenset(('script', 'style', 'template'))
+
+
+def has_class(name: str) -> str:
+    """XPath predicate: the class attribute contains the class name as a token"""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+def class_contains(fragment: str, ignore_case: bool = False) -> str:
+    """XPath predicate: some class name contains the fragment"""
+    if ignore_case:
+        return (
+            "contains(translate(@class, 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), "
+            f"'{fragment.lower()}')"
+        )
+    return f"contains(@class, '{fragment}')"
+
+
+def selector(expression: str) -> etree.XPath:
+    """Compile an XPath expression once, at import time"""
+    return etree.XPath(expression)
+
+
+def select_first(compiled: etree.XPath, element) -> Optional[html.HtmlElement]:
+    """First match of a compiled selector, or None"""
+    matches = compiled(element)
+    return matches[0] if matches else None
+
+
+def first_match(selectors: List[etree.XPath], element) -> Optional[html.HtmlElement]:
+    """First element found by the first selector (in priority order) that matches anything"""
+    for compiled in selectors:
+        match = select_first(compiled, element)
+        if match is not None:
+            return match
+    return None
+
+
+def parse_document(content: bytes) -> html.HtmlElement:
+    """
+    Parse an HTML page with lxml
+
+    Bytes are decoded the way BeautifulSoup decodes them (declared charset,
+    then UTF-8, then Windows-1252), so text comes out identical.
+    """
+    markup = UnicodeDammit(content, is_html=True).unicode_markup
+    return html.document_fromstring(markup or '<html></html>')
+
+
+def text_content(element, separator: str = '') -> str:
+    """
+    Equivalent of BeautifulSoup's get_text(separator, strip=True) for an lxml element
+
+    (Recursion depth is bounded by libxml2's own nesting limit.)
+    """
+    parts: List[str] = []
+
+    def collect(node):
+        if node.text:
+            parts.append(node.text)
+        for child in node:
+            # Comments, processing instructions and script/style contents are skipped,
+            # but the text that follows them still belongs to this element
+            if isinstance(child.tag, str) and child.tag not in _NON_TEXT_TAGS:
+                collect(child)
+            if child.tail:
+                parts.append(child.tail)
+
+    collect(element)
+    return separator.join(part.strip() for part in parts if part.strip())
+
+
+def extract_requirements(description: str) -> str:
+    """
+    Extract requirements section from job description
+    This is a simple implementation - can be enhanced with NLP
+    """
+    requirements_keywords = ['requirements', 'qualifications', 'skills', 'experience']
+    lines = description.lower().split('\n')
+
+    requirements = []
+    capture = False
+
+    for line in lines:
+        if any(keyword in line for keyword in requirements_keywords):
+            capture = True
+            continue
+
+        if capture:
+            if line.strip() and not any(keyword in line for keyword in ['responsibilities', 'benefits', 'about']):
+                requirements.append(line)
+            else:
+                break
+
+    return '\n'.join(requirements)
+
+
+class ParseStats:
+    """Per-site timing of result page parsing"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sites: Dict[str, Dict] = {}
+
+    def record(self, site: str, seconds: float, cards: int):
+        """Add one parsed page"""
+        with self._lock:
+            entry = self._sites.setdefault(site, {'pages': 0, 'cards': 0, 'seconds': 0.0})
+            entry['pages'] += 1
+            entry['cards'] += cards
+            entry['seconds'] += seconds
+
+    def stats(self) -> Dict:
+        """Return pages, cards and parse time per site"""
+        with self._lock:
+            return {
+                site: {
+                    'pages': entry['pages'],
+                    'cards': entry['cards'],
+                    'total_ms': round(entry['seconds'] * 1000, 2),
+                    'avg_ms_per_page': round(entry['seconds'] * 1000 / entry['pages'], 3)
+                }
+                for site, entry in self._sites.items()
+            }
+
+
+parse_stats = ParseStats()
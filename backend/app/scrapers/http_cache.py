@@ -0,0 +1,219 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+import logging
+
+import httpx
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Only these headers are kept; bodies are stored decoded, so encoding and
+# length headers of the original response no longer apply
+_STORED_HEADERS = ('content-type', 'etag', 'last-modified')
+
+
+class CachedResponse:
+    """A stored response body with its validators"""
+
+    def __init__(self, status: int, headers: Dict[str, str], body: bytes, expires_at: float):
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.expires_at = expires_at
+
+    @property
+    def is_fresh(self) -> bool:
+        return time.time() < self.expires_at
+
+    def validators(self) -> Dict[str, str]:
+        """Conditional request headers for revalidating this entry"""
+        headers = {}
+        if self.headers.get('etag'):
+            headers['If-None-Match'] = self.headers['etag']
+        if self.headers.get('last-modified'):
+            headers['If-Modified-Since'] = self.headers['last-modified']
+        return headers
+
+    def to_response(self, url: str) -> httpx.Response:
+        """Rebuild an httpx.Response for callers"""
+        return httpx.Response(
+            self.status, headers=self.headers, content=self.body,
+            request=httpx.Request('GET', url)
+        )
+
+
+class HttpCache:
+    """
+    Persistent cache of GET response bodies for the scrapers
+
+    Entries live in a SQLite file keyed by a hash of the full URL (query
+    included). Fresh entries are served without touching the network;
+    stale ones are revalidated with If-None-Match / If-Modified-Since and
+    a 304 renews them. The file is kept under max_bytes of body data by
+    evicting the least recently used entries; the body total is summed
+    once when the file is opened and kept up to date from then on.
+
+    Every method does blocking file I/O: async callers run them on a
+    worker thread (see ScrapeEngine.fetch).
+    """
+
+    def __init__(self, path: str, max_bytes: int = 100 * 1024 * 1024, ttl: float = 300):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._size = 0  # body bytes stored, valid once the file is open
+
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(url: str) -> str:
+        """Cache key for a full URL (hashed so API keys in URLs are not stored)"""
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the cache file on first use (lock held)"""
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS http_cache (
+                    key TEXT PRIMARY KEY,
+                    status INTEGER NOT NULL,
+                    headers TEXT NOT NULL,
+                    body BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    expires_at REAL NOT NULL,
+                    last_used REAL NOT NULL
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS ix_http_cache_last_used ON http_cache (last_used)")
+            self._conn.commit()
+            self._size = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM http_cache").fetchone()[0]
+        return self._conn
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        """Return the stored entry for a key, fresh or stale, or None"""
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT status, headers, body, expires_at FROM http_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE http_cache SET last_used = ? WHERE key = ?", (time.time(), key))
+            conn.commit()
+        return CachedResponse(row[0], json.loads(row[1]), row[2], row[3])
+
+    def put(self, key: str, response: httpx.Response, ttl: Optional[float] = None):
+        """Store a successful response, evicting old entries if over budget"""
+        if 'no-store' in response.headers.get('cache-control', '').lower():
+            return
+
+        headers = {name: response.headers[name] for name in _STORED_HEADERS if name in response.headers}
+        body = response.content
+        if len(body) > self.max_bytes:
+            return
+
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            replaced = conn.execute("SELECT size FROM http_cache WHERE key = ?", (key,)).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO http_cache (key, status, headers, body, size, expires_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, response.status_code, json.dumps(headers), body, len(body),
+                 now + (self.ttl if ttl is None else ttl), now)
+            )
+            self._size += len(body) - (replaced[0] if replaced else 0)
+            self.stores += 1
+            self._evict(conn)
+            conn.commit()
+
+    def renew(self, key: str, response: httpx.Response, ttl: Optional[float] = None):
+        """Extend a revalidated entry, taking updated validators from the 304"""
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT headers FROM http_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return
+            headers = json.loads(row[0])
+            headers.update({name: response.headers[name] for name in ('etag', 'last-modified') if name in response.headers})
+            now = time.time()
+            conn.execute(
+                "UPDATE http_cache SET headers = ?, expires_at = ?, last_used = ? WHERE key = ?",
+                (json.dumps(headers), now + (self.ttl if ttl is None else ttl), now, key)
+            )
+            conn.commit()
+
+    def _evict(self, conn: sqlite3.Connection):
+        """Drop least recently used entries until the bodies fit max_bytes (lock held)"""
+        if self._size <= self.max_bytes:
+            return
+
+        excess = self._size - self.max_bytes
+        freed = 0
+        victims = []
+        for key, size in conn.execute("SELECT key, size FROM http_cache ORDER BY last_used"):
+            victims.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        conn.executemany("DELETE FROM http_cache WHERE key = ?", victims)
+        self._size -= freed
+        self.evictions += len(victims)
+
+    def record(self, outcome: str):
+        """Count a lookup outcome: 'hits', 'revalidated' or 'misses'"""
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def clear(self):
+        """Delete every entry and reset the counters"""
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM http_cache")
+            conn.commit()
+            self._size = 0
+            self.hits = self.revalidated = self.misses = self.stores = self.evictions = 0
+
+    def stats(self) -> Dict:
+        """Return hit/revalidate/miss counters and current size"""
+        with self._lock:
+            entries, size = 0, 0
+            if self._conn is not None:
+                entries = self._conn.execute("SELECT COUNT(*) FROM http_cache").fetchone()[0]
+                size = self._size
+            lookups = self.hits + self.revalidated + self.misses
+            return {
+                'entries': entries,
+                'size_bytes': size,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'revalidated': self.revalidated,
+                'misses': self.misses,
+                'stores': self.stores,
+                'evictions': self.evictions,
+                'hit_rate': round((self.hits + self.revalidated) / lookups, 4) if lookups else 0.0
+            }
+
+    def close(self):
+        """Close the cache file"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,78 @@
+from typing import AsyncIterator, Awaitable, Callable, Dict, List
+import logging
+
+from .circuit_breaker import CircuitOpenError
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class IncrementalCrawl:
+    """
+    Page-by-page crawl of one source that stops when nothing new turns up
+
+    Pages are fetched in order and the crawl ends at the first page,
+    fetched and parsed successfully, whose job URLs have all been seen
+    before (or that is empty): results are newest first, so later pages
+    would only repeat stored postings. A page whose fetch failed is
+    counted and skipped instead, since its emptiness says nothing about
+    being caught up. All jobs of the fetched pages are returned; seen()
+    only decides where to stop, the exact duplicate check happens before
+    saving.
+    """
+
+    def __init__(self, seen: Callable[[str], bool]):
+        self.seen = seen
+        self.pages_fetched = 0
+        self.pages_failed = 0
+        self.new_jobs = 0
+        self.stopped_early = False
+
+    async def pages(self, fetch_page: Callable[[int], Awaitable[List[Dict]]],
+                    num_pages: int) -> AsyncIterator[List[Dict]]:
+        """
+        Fetch pages 0..num_pages-1 until one yields no unseen job
+
+        Args:
+            fetch_page: Coroutine function returning the jobs of a page and
+                raising if the page could not be fetched or parsed
+            num_pages: Maximum number of pages
+
+        Yields:
+            The jobs of each fetched page
+        """
+        for page in range(num_pages):
+            try:
+                page_jobs = await fetch_page(page)
+            except CircuitOpenError:
+                raise
+            except Exception as e:
+                self.pages_failed += 1
+                logger.error(f"Error fetching page {page + 1}, continuing with the next one: {e}")
+                continue
+            self.pages_fetched += 1
+
+            # Checked before yielding: once streamed, the page may get stored
+            new_jobs = sum(1 for job in page_jobs if not self.seen(job['job_url']))
+            self.new_jobs += new_jobs
+            yield page_jobs
+
+            if not new_jobs:
+                self.stopped_early = page + 1 < num_pages
+                if self.stopped_early:
+                    logger.info(f"Nothing new on page {page + 1}, skipping the remaining pages")
+                break
+
+    async def paginate(self, fetch_page: Callable[[int], Awaitable[List[Dict]]],
+                       num_pages: int) -> List[Dict]:
+        """Jobs of all pages fetched by pages()"""
+        return [job async for page_jobs in self.pages(fetch_page, num_pages) for job in page_jobs]
+
+    def stats(self) -> Dict:
+        """Pages fetched and failed, new jobs and whether pagination stopped early"""
+        return {
+            'pages_fetched': self.pages_fetched,
+            'pages_failed': self.pages_failed,
+            'new_jobs': self.new_jobs,
+            'stopped_early': self.stopped_early
+        }
@@ -1,25 +1,69 @@
-import requests
-from bs4 import BeautifulSoup
-from typing import List, Dict
+import asyncio
 import time
+from typing import AsyncIterator, List, Dict
 from datetime import datetime
 import logging
+from urllib.parse import urlsplit
+from .async_engine import ScrapeEngine, in_order, scrape_engine
+from .circuit_breaker import CircuitOpenError
+from .incremental import IncrementalCrawl
+from .html_parsing import (
+    class_contains, extract_requirements, first_match, has_class, parse_document, parse_stats, select_first, selector,
+    text_content
+)
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Precompiled selectors, tried in order as Indeed's structure varies
+CARD_SELECTORS = [
+    selector(f"//div[{has_class('job_seen_beacon')}]"),
+    selector(f"//div[{class_contains('cardOutline')}]"),
+]
+TITLE_LINKS = selector(f"//a[{class_contains('jcs-JobTitle')}]")
+PARENT_DIV = selector("(ancestor::div)[last()]")
+
+TITLE_SELECTORS = [
+    selector(f"(.//h2[{has_class('jobTitle')}])[1]"),
+    selector(f"(.//a[{has_class('jcs-JobTitle')}])[1]"),
+    selector("(.//span[@title])[1]"),
+]
+COMPANY_SELECTORS = [
+    selector(f"(.//span[{has_class('companyName')}])[1]"),
+    selector("(.//span[@data-testid='company-name'])[1]"),
+]
+LOCATION_SELECTORS = [
+    selector(f"(.//div[{has_class('companyLocation')}])[1]"),
+    selector("(.//div[@data-testid='text-location'])[1]"),
+]
+LINK_SELECTORS = [
+    selector(f"(.//a[{has_class('jcs-JobTitle')}])[1]"),
+    selector("(.//a[@href])[1]"),
+]
+SNIPPET_SELECTORS = [
+    selector(f"(.//div[{has_class('job-snippet')}])[1]"),
+    selector(f"(.//div[{class_contains('snippet', ignore_case=True)}])[1]"),
+]
+SALARY_SELECTORS = [
+    selector(f"(.//span[{has_class('salary-snippet')}])[1]"),
+    selector(f"(.//div[{class_contains('salary', ignore_case=True)}])[1]"),
+]
+DESCRIPTION_SELECTOR = selector("(//div[@id='jobDescriptionText'])[1]")
+
 
 class IndeedScraper:
     """Scraper for Indeed job postings"""
 
-    def __init__(self, delay: int = 2):
+    def __init__(self, delay: int = 2, engine: ScrapeEngine = None):
         self.base_url = "https://www.indeed.com"
         self.delay = delay
+        # Requests are rate limited per host by the engine's token buckets
+        self.engine = engine or scrape_engine
+        self.engine.set_host_delay(urlsplit(self.base_url).netloc, delay)
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
             'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate, br',
             'DNT': '1',
             'Connection': 'keep-alive',
             'Upgrade-Insecure-Requests': '1',
@@ -41,86 +85,115 @@ class IndeedScraper:
         Returns:
             List of job dictionaries
         """
-        jobs = []
-
-        for page in range(num_pages):
-            start = page * 10
-            search_url = f"{self.base_url}/jobs?q={query.replace(' ', '+')}&l={location.replace(' ', '+')}&start={start}"
+        return self.engine.run(self.search_jobs_async(query, location, num_pages))
 
-            try:
-                response = requests.get(search_url, headers=self.headers, timeout=10)
-                response.raise_for_status()
+    async def search_jobs_async(self, query: str, location: str = "", num_pages: int = 1,
+                                crawl: IncrementalCrawl = None) -> List[Dict]:
+        """
+        Search for jobs on Indeed (runs on the engine loop)
 
-                soup = BeautifulSoup(response.content, 'html.parser')
+        All pages are fetched concurrently, or one by one until nothing new
+        turns up when an incremental crawl is given.
+        """
+        return [job async for page_jobs in self.iter_pages(query, location, num_pages, crawl) for job in page_jobs]
+
+    async def iter_pages(self, query: str, location: str = "", num_pages: int = 1,
+                         crawl: IncrementalCrawl = None) -> AsyncIterator[List[Dict]]:
+        """Yield the jobs of each results page, in page order, as soon as it is parsed"""
+        if crawl is not None:
+            pages = crawl.pages(
+                lambda page: self._scrape_page(query, location, page, num_pages, raise_errors=True), num_pages
+            )
+        else:
+            pages = in_order(self._scrape_page(query, location, page, num_pages) for page in range(num_pages))
+        async for page_jobs in pages:
+            yield page_jobs
+
+    async def _scrape_page(self, query: str, location: str, page: int, num_pages: int,
+                           raise_errors: bool = False) -> List[Dict]:
+        """Fetch and parse one results page (errors give no jobs, or are raised with raise_errors)"""
+        jobs = []
+        start = page * 10
+        search_url = f"{self.base_url}/jobs?q={query.replace(' ', '+')}&l={location.replace(' ', '+')}&start={start}"
 
-                # Try multiple selectors as Indeed's structure varies
-                job_cards = soup.find_all('div', class_='job_seen_beacon')
-                if not job_cards:
-                    job_cards = soup.find_all('div', class_=lambda x: x and 'cardOutline' in x)
-                if not job_cards:
-                    job_cards = soup.find_all('a', class_=lambda x: x and 'jcs-JobTitle' in x)
-                    job_cards = [card.find_parent('div') for card in job_cards if card.find_parent('div')]
+        try:
+            response = await self.engine.fetch(search_url, headers=self.headers)
+            response.raise_for_status()
 
-                logger.info(f"Found {len(job_cards)} job cards on page {page + 1}")
+            # Parsing is CPU-bound: run it on a worker thread so the engine
+            # loop keeps serving the other requests meanwhile
+            jobs = await asyncio.to_thread(self._parse_results_page, response.content, page)
+            logger.info(f"Scraped page {page + 1}/{num_pages} - Added {len(jobs)} valid jobs")
 
-                for card in job_cards:
-                    try:
-                        job = self._parse_job_card(card)
-                        if job and job.get('title') != 'N/A':
-                            jobs.append(job)
-                    except Exception as e:
-                        logger.error(f"Error parsing job card: {e}")
-                        continue
+        except CircuitOpenError:
+            # The source is cut off: stop instead of failing every remaining page
+            raise
+        except Exception as e:
+            if raise_errors:
+                raise
+            logger.error(f"Error scraping page {page + 1}: {e}")
 
-                logger.info(f"Scraped page {page + 1}/{num_pages} - Added {len([j for j in jobs if j])} valid jobs")
-                time.sleep(self.delay)
+        return jobs
 
+    def _parse_results_page(self, content: bytes, page: int) -> List[Dict]:
+        """Parse the job cards of a results page (runs on a worker thread)"""
+        jobs = []
+        started = time.perf_counter()
+        document = parse_document(content)
+
+        # Try multiple selectors as Indeed's structure varies
+        job_cards = []
+        for compiled in CARD_SELECTORS:
+            job_cards = compiled(document)
+            if job_cards:
+                break
+        if not job_cards:
+            # Title links without a card wrapper: use each link's closest div
+            job_cards = [
+                parent for parent in (select_first(PARENT_DIV, link) for link in TITLE_LINKS(document))
+                if parent is not None
+            ]
+
+        for card in job_cards:
+            try:
+                job = self._parse_job_card(card)
+                if job and job.get('title') != 'N/A':
+                    jobs.append(job)
             except Exception as e:
-                logger.error(f"Error scraping page {page + 1}: {e}")
+                logger.error(f"Error parsing job card: {e}")
                 continue
 
+        parse_stats.record('indeed', time.perf_counter() - started, len(job_cards))
+        logger.info(f"Found {len(job_cards)} job cards on page {page + 1}")
         return jobs
 
     def _parse_job_card(self, card) -> Dict:
         """Parse individual job card"""
         try:
             # Title - try multiple selectors
-            title_elem = card.find('h2', class_='jobTitle')
-            if not title_elem:
-                title_elem = card.find('a', class_='jcs-JobTitle')
-            if not title_elem:
-                title_elem = card.find('span', title=True)
-            title = title_elem.get_text(strip=True) if title_elem else "N/A"
+            title_elem = first_match(TITLE_SELECTORS, card)
+            title = text_content(title_elem) if title_elem is not None else "N/A"
 
             # Company - try multiple selectors
-            company_elem = card.find('span', class_='companyName')
-            if not company_elem:
-                company_elem = card.find('span', attrs={'data-testid': 'company-name'})
-            company = company_elem.get_text(strip=True) if company_elem else "N/A"
+            company_elem = first_match(COMPANY_SELECTORS, card)
+            company = text_content(company_elem) if company_elem is not None else "N/A"
 
             # Location - try multiple selectors
-            location_elem = card.find('div', class_='companyLocation')
-            if not location_elem:
-                location_elem = card.find('div', attrs={'data-testid': 'text-location'})
-            location = location_elem.get_text(strip=True) if location_elem else "Remote"
+            location_elem = first_match(LOCATION_SELECTORS, card)
+            location = text_content(location_elem) if location_elem is not None else "Remote"
 
             # Job URL
-            link_elem = card.find('a', class_='jcs-JobTitle')
-            if not link_elem:
-                link_elem = card.find('a', href=True)
-            job_url = f"{self.base_url}{link_elem['href']}" if link_elem and link_elem.get('href') else ""
+            link_elem = first_match(LINK_SELECTORS, card)
+            href = link_elem.get('href') if link_elem is not None else None
+            job_url = f"{self.base_url}{href}" if href else ""
 
             # Snippet (short description)
-            snippet_elem = card.find('div', class_='job-snippet')
-            if not snippet_elem:
-                snippet_elem = card.find('div', attrs={'class': lambda x: x and 'snippet' in x.lower() if x else False})
-            description = snippet_elem.get_text(strip=True) if snippet_elem else f"Position for {title} at {company}"
+            snippet_elem = first_match(SNIPPET_SELECTORS, card)
+            description = text_content(snippet_elem) if snippet_elem is not None else f"Position for {title} at {company}"
 
             # Salary (if available)
-            salary_elem = card.find('span', class_='salary-snippet')
-            if not salary_elem:
-                salary_elem = card.find('div', attrs={'class': lambda x: x and 'salary' in x.lower() if x else False})
-            salary = salary_elem.get_text(strip=True) if salary_elem else None
+            salary_elem = first_match(SALARY_SELECTORS, card)
+            salary = text_content(salary_elem) if salary_elem is not None else None
 
             # Only return if we have minimum required fields
             if title == "N/A" or company == "N/A":
@@ -152,15 +225,16 @@ class IndeedScraper:
         Returns:
             Dictionary with detailed job information
         """
+        return self.engine.run(self.get_job_details_async(job_url))
+
+    async def get_job_details_async(self, job_url: str) -> Dict:
+        """Scrape detailed job information from job URL (runs on the engine loop)"""
         try:
-            response = requests.get(job_url, headers=self.headers, timeout=10)
+            # Postings rarely change, so detail pages stay cached longer than result pages
+            response = await self.engine.fetch(job_url, headers=self.headers, ttl=self.engine.detail_ttl)
             response.raise_for_status()
 
-            soup = BeautifulSoup(response.content, 'html.parser')
-
-            # Full job description
-            description_elem = soup.find('div', id='jobDescriptionText')
-            description = description_elem.get_text(strip=True) if description_elem else ""
+            description = await asyncio.to_thread(self._parse_description, response.content)
 
             return {
                 'description': description,
@@ -171,29 +245,16 @@ class IndeedScraper:
             logger.error(f"Error getting job details: {e}")
             return {}
 
-    def _extract_requirements(self, description: str) -> str:
-        """
-        Extract requirements section from job description
-        This is a simple implementation - can be enhanced with NLP
-        """
-        requirements_keywords = ['requirements', 'qualifications', 'skills', 'experience']
-        lines = description.lower().split('\n')
+    def _parse_description(self, content: bytes) -> str:
+        """Full job description of a detail page (runs on a worker thread)"""
+        document = parse_document(content)
+        # One line per text block so sections can be found
+        description_elem = select_first(DESCRIPTION_SELECTOR, document)
+        return text_content(description_elem, '\n') if description_elem is not None else ""
 
-        requirements = []
-        capture = False
-
-        for line in lines:
-            if any(keyword in line for keyword in requirements_keywords):
-                capture = True
-                continue
-
-            if capture:
-                if line.strip() and not any(keyword in line for keyword in ['responsibilities', 'benefits', 'about']):
-                    requirements.append(line)
-                else:
-                    break
-
-        return '\n'.join(requirements)
+    def _extract_requirements(self, description: str) -> str:
+        """Extract requirements section from job description"""
+        return extract_requirements(description)
 
 
 if __name__ == "__main__":
@@ -1,20 +1,41 @@
-import requests
-from bs4 import BeautifulSoup
-from typing import List, Dict
+import asyncio
 import time
+from typing import AsyncIterator, List, Dict
 from datetime import datetime
 import logging
+from urllib.parse import urlsplit
+from .async_engine import ScrapeEngine, in_order, scrape_engine
+from .circuit_breaker import CircuitOpenError
+from .incremental import IncrementalCrawl
+from .html_parsing import (
+    extract_requirements, first_match, has_class, parse_document, parse_stats, select_first, selector, text_content
+)
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Precompiled selectors
+CARD_SELECTOR = selector(f"//div[{has_class('base-card')}]")
+TITLE_SELECTOR = selector(f"(.//h3[{has_class('base-search-card__title')}])[1]")
+COMPANY_SELECTOR = selector(f"(.//h4[{has_class('base-search-card__subtitle')}])[1]")
+LOCATION_SELECTOR = selector(f"(.//span[{has_class('job-search-card__location')}])[1]")
+LINK_SELECTOR = selector(f"(.//a[{has_class('base-card__full-link')}])[1]")
+# Tried in this order: the markup is nested in the description__text
+# wrapper, which also holds the "Show more/Show less" buttons
+DESCRIPTION_SELECTORS = [
+    selector(f"(//div[{has_class('show-more-less-html__markup')}])[1]"),
+    selector(f"(//div[{has_class('description__text')}])[1]"),
+]
+
 
 class LinkedInScraper:
     """Scraper for LinkedIn job postings (public listings)"""
 
-    def __init__(self, delay: int = 2):
+    def __init__(self, delay: int = 2, engine: ScrapeEngine = None):
         self.base_url = "https://www.linkedin.com"
         self.delay = delay
+        self.engine = engine or scrape_engine
+        self.engine.set_host_delay(urlsplit(self.base_url).netloc, delay)
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
@@ -23,52 +44,86 @@ class LinkedInScraper:
 
     def search_jobs(self, query: str, location: str = "", num_pages: int = 1) -> List[Dict]:
         """Search for jobs on LinkedIn"""
+        return self.engine.run(self.search_jobs_async(query, location, num_pages))
+
+    async def search_jobs_async(self, query: str, location: str = "", num_pages: int = 1,
+                                crawl: IncrementalCrawl = None) -> List[Dict]:
+        """
+        Search for jobs on LinkedIn (runs on the engine loop)
+
+        All pages are fetched concurrently, or one by one until nothing new
+        turns up when an incremental crawl is given.
+        """
+        return [job async for page_jobs in self.iter_pages(query, location, num_pages, crawl) for job in page_jobs]
+
+    async def iter_pages(self, query: str, location: str = "", num_pages: int = 1,
+                         crawl: IncrementalCrawl = None) -> AsyncIterator[List[Dict]]:
+        """Yield the jobs of each results page, in page order, as soon as it is parsed"""
+        if crawl is not None:
+            pages = crawl.pages(lambda page: self._scrape_page(query, location, page, raise_errors=True), num_pages)
+        else:
+            pages = in_order(self._scrape_page(query, location, page) for page in range(num_pages))
+        async for page_jobs in pages:
+            yield page_jobs
+
+    async def _scrape_page(self, query: str, location: str, page: int, raise_errors: bool = False) -> List[Dict]:
+        """Fetch and parse one LinkedIn results page (errors give no jobs, or are raised with raise_errors)"""
         jobs = []
+        start = page * 25
+        search_url = f"{self.base_url}/jobs/search/?keywords={query.replace(' ', '%20')}&location={location.replace(' ', '%20')}&start={start}"
 
-        for page in range(num_pages):
-            start = page * 25
-            search_url = f"{self.base_url}/jobs/search/?keywords={query.replace(' ', '%20')}&location={location.replace(' ', '%20')}&start={start}"
+        try:
+            response = await self.engine.fetch(search_url, headers=self.headers)
+            response.raise_for_status()
 
-            try:
-                response = requests.get(search_url, headers=self.headers, timeout=10)
-                response.raise_for_status()
+            # Parsing is CPU-bound: keep it off the engine loop
+            jobs = await asyncio.to_thread(self._parse_results_page, response.content, page)
 
-                soup = BeautifulSoup(response.content, 'html.parser')
-                job_cards = soup.find_all('div', class_='base-card')
+        except CircuitOpenError:
+            # The source is cut off: stop instead of failing every remaining page
+            raise
+        except Exception as e:
+            if raise_errors:
+                raise
+            logger.error(f"Error scraping LinkedIn page {page + 1}: {e}")
 
-                logger.info(f"LinkedIn: Found {len(job_cards)} job cards on page {page + 1}")
+        return jobs
 
-                for card in job_cards:
-                    try:
-                        job = self._parse_job_card(card)
-                        if job and job.get('title') != 'N/A':
-                            jobs.append(job)
-                    except Exception as e:
-                        logger.error(f"Error parsing LinkedIn job card: {e}")
-                        continue
+    def _parse_results_page(self, content: bytes, page: int) -> List[Dict]:
+        """Parse the job cards of a LinkedIn results page (runs on a worker thread)"""
+        jobs = []
+        started = time.perf_counter()
+        document = parse_document(content)
+        job_cards = CARD_SELECTOR(document)
 
-                time.sleep(self.delay)
+        logger.info(f"LinkedIn: Found {len(job_cards)} job cards on page {page + 1}")
 
+        for card in job_cards:
+            try:
+                job = self._parse_job_card(card)
+                if job and job.get('title') != 'N/A':
+                    jobs.append(job)
             except Exception as e:
-                logger.error(f"Error scraping LinkedIn page {page + 1}: {e}")
+                logger.error(f"Error parsing LinkedIn job card: {e}")
                 continue
 
+        parse_stats.record('linkedin', time.perf_counter() - started, len(job_cards))
         return jobs
 
     def _parse_job_card(self, card) -> Dict:
         """Parse individual LinkedIn job card"""
         try:
-            title_elem = card.find('h3', class_='base-search-card__title')
-            title = title_elem.get_text(strip=True) if title_elem else "N/A"
+            title_elem = select_first(TITLE_SELECTOR, card)
+            title = text_content(title_elem) if title_elem is not None else "N/A"
 
-            company_elem = card.find('h4', class_='base-search-card__subtitle')
-            company = company_elem.get_text(strip=True) if company_elem else "N/A"
+            company_elem = select_first(COMPANY_SELECTOR, card)
+            company = text_content(company_elem) if company_elem is not None else "N/A"
 
-            location_elem = card.find('span', class_='job-search-card__location')
-            location = location_elem.get_text(strip=True) if location_elem else "Remote"
+            location_elem = select_first(LOCATION_SELECTOR, card)
+            location = text_content(location_elem) if location_elem is not None else "Remote"
 
-            link_elem = card.find('a', class_='base-card__full-link')
-            job_url = link_elem['href'] if link_elem and link_elem.get('href') else ""
+            link_elem = select_first(LINK_SELECTOR, card)
+            job_url = (link_elem.get('href') or "") if link_elem is not None else ""
 
             description = f"{title} position at {company} in {location}"
 
@@ -90,3 +145,42 @@ class LinkedInScraper:
         except Exception as e:
             logger.error(f"Error in LinkedIn _parse_job_card: {e}")
             return None
+
+    def get_job_details(self, job_url: str) -> Dict:
+        """
+        Scrape the full description from a public LinkedIn job page
+
+        Args:
+            job_url: URL of the job posting
+
+        Returns:
+            Dictionary with description and requirements (empty on failure)
+        """
+        return self.engine.run(self.get_job_details_async(job_url))
+
+    async def get_job_details_async(self, job_url: str) -> Dict:
+        """Scrape the full description from a public LinkedIn job page (runs on the engine loop)"""
+        try:
+            response = await self.engine.fetch(job_url, headers=self.headers, ttl=self.engine.detail_ttl)
+            response.raise_for_status()
+
+            description = await asyncio.to_thread(self._parse_description, response.content)
+
+            return {
+                'description': description,
+                'requirements': self._extract_requirements(description)
+            }
+
+        except Exception as e:
+            logger.error(f"Error getting LinkedIn job details: {e}")
+            return {}
+
+    def _parse_description(self, content: bytes) -> str:
+        """Full job description of a LinkedIn job page (runs on a worker thread)"""
+        document = parse_document(content)
+        description_elem = first_match(DESCRIPTION_SELECTORS, document)
+        return text_content(description_elem, '\n') if description_elem is not None else ""
+
+    def _extract_requirements(self, description: str) -> str:
+        """Extract requirements section from job description"""
+        return extract_requirements(description)
@@ -1,5 +1,11 @@
-from typing import List, Dict
+import asyncio
+from typing import Callable, Iterator, List, Dict, Set
+import time
 import logging
+from urllib.parse import urlsplit
+from .arbeitnow_scraper import ArbeitnowScraper
+from .async_engine import ScrapeEngine, scrape_engine
+from .incremental import IncrementalCrawl
 from .indeed_scraper import IndeedScraper
 from .linkedin_scraper import LinkedInScraper
 
@@ -8,12 +14,25 @@ logger = logging.getLogger(__name__)
 
 
 class MultiSourceScraper:
-    """Scraper that aggregates jobs from multiple sources"""
+    """
+    Scraper that aggregates jobs from multiple sources
 
-    def __init__(self, delay: int = 2):
+    All sources and their pages are fetched concurrently on the shared
+    async ScrapeEngine; per-host token buckets keep requests to one site
+    spaced out while different sites never wait on each other. Each source
+    gets its own deadline so a slow site cannot hold up the others.
+    """
+
+    def __init__(self, delay: int = 2, engine: ScrapeEngine = None, deadline: float = 120,
+                 enrich_concurrency: int = 8):
+        self.engine = engine or scrape_engine
+        self.deadline = deadline
+        self.enrich_concurrency = enrich_concurrency
         self.scrapers = {
-            'indeed': IndeedScraper(delay=delay),
-            'linkedin': LinkedInScraper(delay=delay)
+            'indeed': IndeedScraper(delay=delay, engine=self.engine),
+            'linkedin': LinkedInScraper(delay=delay, engine=self.engine),
+            # Answered from a periodically refreshed board snapshot, not per query
+            'arbeitnow': ArbeitnowScraper(engine=self.engine)
         }
 
     def search_jobs(self, query: str, location: str = "", num_pages: int = 1, sources: List[str] = None) -> List[Dict]:
@@ -29,38 +48,301 @@ class MultiSourceScraper:
         Returns:
             Aggregated list of jobs from all sources
         """
+        return self.search_jobs_with_stats(query, location, num_pages, sources)['jobs']
+
+    def search_jobs_with_stats(self, query: str, location: str = "", num_pages: int = 1,
+                               sources: List[str] = None, seen: Callable[[str], bool] = None) -> Dict:
+        """
+        Search for jobs across multiple sources, reporting per-source results
+
+        Args:
+            query: Job search query
+            location: Location for job search
+            num_pages: Number of pages per source
+            sources: List of sources to use (default: all)
+            seen: Incremental mode: tells whether a job URL is already stored;
+                each source then stops at the first page with nothing new
+
+        Returns:
+            Dictionary with
+            - jobs: unique jobs, in source order
+            - sources: per source, jobs found, seconds taken and error (if any),
+              plus pages fetched, new jobs and whether it stopped early in
+              incremental mode
+            - elapsed: total wall time in seconds
+        """
+        return self.engine.run(self._search(query, location, num_pages, sources, seen))
+
+    async def search_jobs_with_stats_async(self, query: str, location: str = "", num_pages: int = 1,
+                                           sources: List[str] = None,
+                                           seen: Callable[[str], bool] = None) -> Dict:
+        """Awaitable search_jobs_with_stats for use inside any event loop"""
+        return await self.engine.call(self._search(query, location, num_pages, sources, seen))
+
+    async def _search(self, query: str, location: str, num_pages: int, sources: List[str] = None,
+                      seen: Callable[[str], bool] = None) -> Dict:
+        """Scrape the requested sources concurrently (runs on the engine loop)"""
         if sources is None:
             sources = list(self.scrapers.keys())
 
-        all_jobs = []
+        started = time.monotonic()
+        selected = []
 
-        for source in sources:
+        for source in dict.fromkeys(sources):
             if source not in self.scrapers:
                 logger.warning(f"Unknown source: {source}")
                 continue
+            selected.append(source)
 
-            try:
-                logger.info(f"Scraping {source}...")
-                jobs = self.scrapers[source].search_jobs(query, location, num_pages)
-                logger.info(f"Found {len(jobs)} jobs from {source}")
-                all_jobs.extend(jobs)
-            except Exception as e:
-                logger.error(f"Error scraping {source}: {e}")
-                continue
+        # gather keeps request order, so results do not depend on which source finishes first
+        results = await asyncio.gather(*(
+            self._scrape_source(source, query, location, num_pages, seen) for source in selected
+        ))
+
+        all_jobs = []
+        source_stats = {}
+        for source, (jobs, stats) in zip(selected, results):
+            all_jobs.extend(jobs)
+            source_stats[source] = stats
 
         # Remove duplicates based on title and company
         unique_jobs = []
-        seen = set()
+        seen_keys = set()
 
         for job in all_jobs:
             key = (job['title'].lower(), job['company'].lower())
-            if key not in seen:
-                seen.add(key)
+            if key not in seen_keys:
+                seen_keys.add(key)
                 unique_jobs.append(job)
 
-        logger.info(f"Total unique jobs: {len(unique_jobs)}")
-        return unique_jobs
+        elapsed = round(time.monotonic() - started, 3)
+        logger.info(f"Total unique jobs: {len(unique_jobs)} ({elapsed}s)")
+        return {
+            'jobs': unique_jobs,
+            'sources': source_stats,
+            'elapsed': elapsed
+        }
+
+    async def _scrape_source(self, source: str, query: str, location: str, num_pages: int,
+                             seen: Callable[[str], bool] = None):
+        """Scrape one source within its deadline, isolating its errors from the others"""
+        started = time.monotonic()
+        jobs = []
+        error = None
+        crawl = IncrementalCrawl(seen) if seen is not None else None
+
+        try:
+            logger.info(f"Scraping {source}...")
+            jobs = await asyncio.wait_for(
+                self.scrapers[source].search_jobs_async(query, location, num_pages, crawl=crawl), self.deadline
+            )
+            logger.info(f"Found {len(jobs)} jobs from {source}")
+        except asyncio.TimeoutError:
+            logger.error(f"Scraping {source} timed out after {self.deadline}s")
+            error = f"timed out after {self.deadline}s"
+        except Exception as e:
+            logger.error(f"Error scraping {source}: {e}")
+            error = str(e)
+
+        stats = {
+            'jobs_found': len(jobs),
+            'seconds': round(time.monotonic() - started, 3),
+            'error': error
+        }
+        if crawl is not None:
+            stats.update(crawl.stats())
+        return jobs, stats
+
+    def stream_pages(self, query: str, location: str = "", num_pages: int = 1, sources: List[str] = None,
+                     seen: Callable[[str], bool] = None, stats: Dict = None,
+                     queue_size: int = 4) -> Iterator[List[Dict]]:
+        """
+        Yield pages of jobs from all sources as they are parsed
+
+        Sources are scraped concurrently on the engine loop into a bounded
+        queue; when the consumer falls behind, the scrapers pause instead of
+        buffering results. Jobs are not deduplicated across sources.
+
+        Args:
+            query: Job search query
+            location: Location for job search
+            num_pages: Number of pages per source
+            sources: List of sources to use (default: all)
+            seen: Incremental mode, as in search_jobs_with_stats
+            stats: Filled with per-source stats as each source finishes
+            queue_size: Pages buffered ahead of the consumer
+
+        Yields:
+            The jobs of one results page
+        """
+        if sources is None:
+            sources = list(self.scrapers.keys())
+        if stats is None:
+            stats = {}
+
+        selected = []
+        for source in dict.fromkeys(sources):
+            if source not in self.scrapers:
+                logger.warning(f"Unknown source: {source}")
+                continue
+            selected.append(source)
+
+        pages = self.engine.run(self._make_queue(queue_size))
+        producer = self.engine.submit(self._produce_pages(pages, selected, query, location, num_pages, seen, stats))
+        try:
+            while True:
+                page_jobs = self.engine.run(pages.get())
+                if page_jobs is None:
+                    break
+                yield page_jobs
+        finally:
+            # Consumer stopped early: cancel the scrapers still running
+            producer.cancel()
+
+    @staticmethod
+    async def _make_queue(maxsize: int) -> asyncio.Queue:
+        """Create the queue on the engine loop it is used from"""
+        return asyncio.Queue(maxsize=maxsize)
+
+    async def _produce_pages(self, pages: asyncio.Queue, sources: List[str], query: str, location: str,
+                             num_pages: int, seen: Callable[[str], bool], stats: Dict):
+        """Scrape every source into the page queue, then put the end marker"""
+        try:
+            await asyncio.gather(*(
+                self._stream_source(pages, source, query, location, num_pages, seen, stats) for source in sources
+            ))
+        except Exception as e:
+            logger.error(f"Error streaming pages: {e}")
+        # Not reached when cancelled: the consumer is gone and the queue may be full
+        await pages.put(None)
+
+    async def _stream_source(self, pages: asyncio.Queue, source: str, query: str, location: str,
+                             num_pages: int, seen: Callable[[str], bool], stats: Dict):
+        """
+        Stream one source into the page queue within its deadline
+
+        Time spent waiting for room in the queue does not count against the
+        deadline, so a slow consumer cannot time a source out.
+        """
+        started = time.monotonic()
+        remaining = self.deadline
+        jobs_found = 0
+        error = None
+        crawl = IncrementalCrawl(seen) if seen is not None else None
+
+        page_iterator = self.scrapers[source].iter_pages(query, location, num_pages, crawl=crawl)
+        try:
+            logger.info(f"Streaming {source}...")
+            while True:
+                waited = time.monotonic()
+                try:
+                    page_jobs = await asyncio.wait_for(page_iterator.__anext__(), max(remaining, 0))
+                except StopAsyncIteration:
+                    break
+                remaining -= time.monotonic() - waited
+                jobs_found += len(page_jobs)
+                await pages.put(page_jobs)
+            logger.info(f"Found {jobs_found} jobs from {source}")
+        except asyncio.TimeoutError:
+            logger.error(f"Scraping {source} timed out after {self.deadline}s")
+            error = f"timed out after {self.deadline}s"
+        except Exception as e:
+            logger.error(f"Error scraping {source}: {e}")
+            error = str(e)
+        finally:
+            await page_iterator.aclose()
+
+        stats[source] = {
+            'jobs_found': jobs_found,
+            'seconds': round(time.monotonic() - started, 3),
+            'error': error
+        }
+        if crawl is not None:
+            stats[source].update(crawl.stats())
+
+    def enrich_jobs(self, jobs: List[Dict], skip_urls: Set[str] = None) -> Dict:
+        """
+        Replace stub descriptions with the full text from each job's detail page
+
+        Jobs are updated in place: description and requirements are filled in
+        when the detail page yields a description.
+
+        Args:
+            jobs: Job dictionaries returned by search_jobs
+            skip_urls: Job URLs not to fetch (e.g. already stored and enriched)
+
+        Returns:
+            Counts of jobs fetched, enriched and skipped
+        """
+        return self.engine.run(self._enrich(jobs, skip_urls or set()))
+
+    async def enrich_jobs_async(self, jobs: List[Dict], skip_urls: Set[str] = None) -> Dict:
+        """Awaitable enrich_jobs for use inside any event loop"""
+        return await self.engine.call(self._enrich(jobs, skip_urls or set()))
+
+    async def _enrich(self, jobs: List[Dict], skip_urls: Set[str]) -> Dict:
+        """Fetch detail pages with bounded concurrency (runs on the engine loop)"""
+        scrapers_by_source = {
+            name.lower(): scraper for name, scraper in self.scrapers.items()
+            if hasattr(scraper, 'get_job_details_async')
+        }
+
+        targets = []
+        target_urls = set(skip_urls)
+        for job in jobs:
+            job_url = job.get('job_url')
+            scraper = scrapers_by_source.get((job.get('source') or '').lower())
+            if not job_url or job_url in target_urls or scraper is None:
+                continue
+            target_urls.add(job_url)
+            targets.append((job, scraper))
+
+        # The semaphore bounds pages in flight; the engine still rate limits per host
+        semaphore = asyncio.Semaphore(self.enrich_concurrency)
+
+        async def enrich(job: Dict, scraper) -> bool:
+            async with semaphore:
+                details = await scraper.get_job_details_async(job['job_url'])
+            if not details.get('description'):
+                return False
+            job['description'] = details['description']
+            job['requirements'] = details.get('requirements', '')
+            return True
+
+        started = time.monotonic()
+        results = await asyncio.gather(*(enrich(job, scraper) for job, scraper in targets))
+        enriched = sum(results)
+
+        logger.info(f"Enriched {enriched}/{len(targets)} jobs from detail pages")
+        return {
+            'fetched': len(targets),
+            'enriched': enriched,
+            'skipped': len(jobs) - len(targets),
+            'seconds': round(time.monotonic() - started, 3)
+        }
 
     def get_available_sources(self) -> List[str]:
         """Get list of available job sources"""
         return list(self.scrapers.keys())
+
+    def start_background_refresh(self):
+        """Start the periodic refresh of sources answered from a local snapshot"""
+        for scraper in self.scrapers.values():
+            if hasattr(scraper, 'start_refreshing'):
+                scraper.start_refreshing()
+
+    def stop_background_refresh(self):
+        for scraper in self.scrapers.values():
+            if hasattr(scraper, 'stop_refreshing'):
+                scraper.stop_refreshing()
+
+    def snapshot_stats(self) -> Dict[str, Dict]:
+        """Snapshot size, age and truncation of the sources answered from one"""
+        return {
+            source: scraper.snapshot_stats() for source, scraper in self.scrapers.items()
+            if hasattr(scraper, 'snapshot_stats')
+        }
+
+    def source_hosts(self) -> Dict[str, str]:
+        """Host each source scrapes, as tracked by the engine's circuit breaker"""
+        return {source: urlsplit(scraper.base_url).netloc.lower() for source, scraper in self.scrapers.items()}
@@ -0,0 +1,187 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+import logging
+
+from sqlalchemy import insert, select
+
+from app.models.models import AnalysisCacheEntry
+from app.services.job_store import UPSERT_INSERTS
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class AnalysisCache:
+    """
+    Memoize job analysis results by content hash
+
+    Keys are derived from the analyzer version and the normalized job text,
+    so bumping the version makes every older entry unreachable. Results live
+    in a size-capped in-memory LRU and, optionally, in the analysis_cache
+    table so they survive restarts.
+    """
+
+    def __init__(self, version: int, max_size: int = 10000,
+                 session_factory: Optional[Callable] = None):
+        self.version = version
+        self.max_size = max_size
+        self.session_factory = session_factory
+
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._purged = False
+
+        self.hits = 0
+        self.misses = 0
+        self.persistent_hits = 0
+
+    def make_key(self, normalized_text: str) -> str:
+        """Build the cache key for already-normalized job text"""
+        digest = hashlib.sha256(f"{self.version}\x00{normalized_text}".encode('utf-8'))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return a cached result, or None on a miss"""
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: List[str]) -> Dict[str, Dict]:
+        """
+        Look up several keys at once
+
+        Args:
+            keys: Cache keys from make_key
+
+        Returns:
+            Dictionary of key to cached result for the keys that were found
+        """
+        found = {}
+        missing = []
+
+        with self._lock:
+            for key in keys:
+                payload = self._entries.get(key)
+                if payload is None:
+                    missing.append(key)
+                    continue
+                self._entries.move_to_end(key)
+                found[key] = json.loads(payload)
+
+        if missing and self.session_factory:
+            persisted = self._load_persisted(missing)
+            with self._lock:
+                for key, payload in persisted.items():
+                    self._remember(key, payload)
+                    found[key] = json.loads(payload)
+                self.persistent_hits += len(persisted)
+
+        with self._lock:
+            # Count each requested key once, duplicates included
+            for key in keys:
+                if key in found:
+                    self.hits += 1
+                else:
+                    self.misses += 1
+
+        return found
+
+    def set(self, key: str, result: Dict):
+        """Store one analysis result"""
+        self.set_many({key: result})
+
+    def set_many(self, results: Dict[str, Dict]):
+        """Store several analysis results"""
+        if not results:
+            return
+
+        payloads = {key: json.dumps(result) for key, result in results.items()}
+        with self._lock:
+            for key, payload in payloads.items():
+                self._remember(key, payload)
+
+        if self.session_factory:
+            self._store_persisted(payloads)
+
+    def clear(self):
+        """Drop all in-memory entries and reset the counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.persistent_hits = 0
+
+    def stats(self) -> Dict:
+        """Return hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'version': self.version,
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'persistent_hits': self.persistent_hits,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'persistent': self.session_factory is not None
+            }
+
+    def _remember(self, key: str, payload: str):
+        """Insert into the LRU, evicting the oldest entries past max_size (lock held)"""
+        self._entries[key] = payload
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def _load_persisted(self, keys: List[str]) -> Dict[str, str]:
+        """Fetch stored payloads for the given keys from the database"""
+        db = self.session_factory()
+        try:
+            self._purge_stale(db)
+            rows = db.query(AnalysisCacheEntry.key, AnalysisCacheEntry.result).filter(
+                AnalysisCacheEntry.key.in_(set(keys)),
+                AnalysisCacheEntry.version == self.version
+            ).all()
+            return {key: result for key, result in rows}
+        except Exception as e:
+            logger.error(f"Error reading analysis cache: {e}")
+            db.rollback()
+            return {}
+        finally:
+            db.close()
+
+    def _store_persisted(self, payloads: Dict[str, str]):
+        """Write payloads to the database, skipping keys that are already stored"""
+        db = self.session_factory()
+        try:
+            self._purge_stale(db)
+            table = AnalysisCacheEntry.__table__
+            rows = [{'key': key, 'version': self.version, 'result': payload} for key, payload in payloads.items()]
+            dialect_insert = UPSERT_INSERTS.get(db.get_bind().dialect.name)
+            if dialect_insert is not None:
+                # Keys stored meanwhile by another process are skipped, not failing the batch
+                db.execute(dialect_insert(table).on_conflict_do_nothing(index_elements=[table.c.key]), rows)
+            else:
+                existing = set(db.execute(select(table.c.key).where(table.c.key.in_(list(payloads)))).scalars())
+                rows = [row for row in rows if row['key'] not in existing]
+                if rows:
+                    db.execute(insert(table), rows)
+            db.commit()
+        except Exception as e:
+            logger.error(f"Error writing analysis cache: {e}")
+            db.rollback()
+        finally:
+            db.close()
+
+    def _purge_stale(self, db):
+        """Delete rows written by older analyzer versions, once per process"""
+        if self._purged:
+            return
+        deleted = db.query(AnalysisCacheEntry).filter(
+            AnalysisCacheEntry.version != self.version
+        ).delete(synchronize_session=False)
+        db.commit()
+        self._purged = True
+        if deleted:
+            logger.info(f"Purged {deleted} stale analysis cache entries")
@@ -0,0 +1,278 @@
+import hashlib
+import re
+import zlib
+from typing import Dict, List, Optional, Tuple
+import logging
+
+import numpy as np
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.models import Job, JobDuplicate, JobLSHBucket, JobSignature
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+
+_TAG_PATTERN = re.compile(r'<[^>]+>')
+_WORD_PATTERN = re.compile(r'\w+')
+
+# Stored for jobs without words: marks them as indexed, never matches
+EMPTY_SIGNATURE = b''
+
+
+class MinHasher:
+    """Compute MinHash signatures over word shingles of a text"""
+
+    def __init__(self, num_perm: int = 128, shingle_size: int = 5, seed: int = 1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+
+        # Fixed seed so signatures stay comparable across processes and restarts.
+        # a, b < 2^31 keep a * x + b inside uint64 for 32-bit shingle hashes.
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, 1 << 31, size=num_perm, dtype=np.int64).astype(np.uint64)
+        self._b = rng.randint(0, 1 << 31, size=num_perm, dtype=np.int64).astype(np.uint64)
+
+    def shingles(self, text: str) -> np.ndarray:
+        """Hash the word n-grams of text (HTML tags stripped, lowercased)"""
+        words = _WORD_PATTERN.findall(_TAG_PATTERN.sub(' ', text or '').lower())
+        size = min(self.shingle_size, len(words))
+        if size == 0:
+            return np.zeros(0, dtype=np.uint64)
+
+        hashes = {
+            zlib.crc32(' '.join(words[i:i + size]).encode('utf-8'))
+            for i in range(len(words) - size + 1)
+        }
+        return np.fromiter(hashes, dtype=np.uint64, count=len(hashes))
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """
+        Compute the MinHash signature of a text
+
+        Args:
+            text: Job description
+
+        Returns:
+            Array of num_perm uint32 values, or None if the text has no words
+        """
+        shingles = self.shingles(text)
+        if len(shingles) == 0:
+            return None
+
+        permuted = (np.outer(self._a, shingles) + self._b[:, None]) % _MERSENNE_PRIME & _MAX_HASH
+        return permuted.min(axis=1).astype(np.uint32)
+
+
+def estimate_similarity(signature_a: np.ndarray, signature_b: np.ndarray) -> float:
+    """Estimate the Jaccard similarity of two texts from their signatures"""
+    return float(np.mean(signature_a == signature_b))
+
+
+class NearDuplicateDetector:
+    """
+    Find near-duplicate job postings with MinHash and banded LSH
+
+    Each stored job has its signature in job_signatures and one row per band
+    in job_lsh_buckets. A lookup only reads the jobs that share at least one
+    band bucket with the new posting (an indexed lookup per band), then
+    verifies them against the full signature.
+    """
+
+    def __init__(self, num_perm: int = 128, bands: int = 16, threshold: float = 0.8):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.hasher = MinHasher(num_perm=num_perm)
+        self.bands = bands
+        self.rows_per_band = num_perm // bands
+        self.threshold = threshold
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """MinHash signature for a job description (None if it has no words)"""
+        return self.hasher.signature(text)
+
+    def band_buckets(self, signature: np.ndarray) -> List[Tuple[int, int]]:
+        """Hash each band of a signature to a signed 64-bit bucket id"""
+        buckets = []
+        for band in range(self.bands):
+            chunk = signature[band * self.rows_per_band:(band + 1) * self.rows_per_band]
+            digest = hashlib.blake2b(chunk.tobytes(), digest_size=8).digest()
+            buckets.append((band, int.from_bytes(digest, 'big', signed=True)))
+        return buckets
+
+    def find_duplicate(self, db: Session, signature: np.ndarray,
+                       buckets: Optional[List[Tuple[int, int]]] = None) -> Optional[Tuple[int, float]]:
+        """
+        Find a stored active job that is a near duplicate of the signature
+
+        Args:
+            db: Database session
+            signature: MinHash signature of the new posting
+            buckets: band_buckets(signature), if already computed
+
+        Returns:
+            (canonical job id, estimated similarity) or None
+        """
+        if buckets is None:
+            buckets = self.band_buckets(signature)
+        candidate_ids = {
+            job_id for (job_id,) in db.query(JobLSHBucket.job_id).filter(
+                or_(*[and_(JobLSHBucket.band == band, JobLSHBucket.bucket == bucket) for band, bucket in buckets])
+            ).distinct().all()
+        }
+        if not candidate_ids:
+            return None
+
+        rows = db.query(JobSignature.job_id, JobSignature.signature).join(
+            Job, Job.id == JobSignature.job_id
+        ).filter(
+            JobSignature.job_id.in_(candidate_ids),
+            Job.is_active == True
+        ).all()
+
+        best = None
+        for job_id, stored in rows:
+            similarity = estimate_similarity(signature, np.frombuffer(stored, dtype=np.uint32))
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (job_id, similarity)
+        return best
+
+    def register(self, db: Session, job: Job, signature: np.ndarray):
+        """
+        Add a job's signature and LSH buckets to the session
+
+        Works for jobs that are not flushed yet; the ids are filled in when
+        the session flushes. Jobs without a signature get an empty marker
+        row and no buckets, so backfill does not pick them up again.
+        """
+        if signature is None:
+            db.add(JobSignature(job=job, signature=EMPTY_SIGNATURE))
+            return
+        db.add(JobSignature(job=job, signature=signature.tobytes()))
+        for band, bucket in self.band_buckets(signature):
+            db.add(JobLSHBucket(job=job, band=band, bucket=bucket))
+
+    @staticmethod
+    def make_duplicate(job_data: Dict, similarity: float, **canonical) -> JobDuplicate:
+        """
+        Build the link row for a duplicate posting
+
+        Args:
+            job_data: Scraped duplicate posting
+            similarity: Estimated similarity to the canonical job
+            canonical: canonical_job_id=... or canonical_job=<Job>
+        """
+        return JobDuplicate(
+            job_url=job_data['job_url'],
+            title=job_data.get('title'),
+            company=job_data.get('company'),
+            source=job_data.get('source'),
+            similarity=round(similarity, 4),
+            **canonical
+        )
+
+    def backfill(self, db: Session, batch_size: int = 500) -> int:
+        """
+        Compute signatures for active jobs stored before deduplication existed
+
+        Returns:
+            Number of jobs indexed
+        """
+        indexed = 0
+        while True:
+            jobs = db.query(Job).outerjoin(
+                JobSignature, JobSignature.job_id == Job.id
+            ).filter(
+                Job.is_active == True,
+                JobSignature.job_id == None
+            ).limit(batch_size).all()
+            if not jobs:
+                break
+
+            for job in jobs:
+                self.register(db, job, self.signature(job.description or ''))
+            db.commit()
+            indexed += len(jobs)
+
+        if indexed:
+            logger.info(f"Indexed {indexed} existing jobs for near-duplicate detection")
+        return indexed
+
+
+class NearDuplicateStream:
+    """
+    Near-duplicate partition that remembers accepted postings across batches
+
+    For streamed ingestion, where a batch must also be checked against
+    postings accepted from earlier batches that may not be stored yet.
+    """
+
+    def __init__(self, detector: NearDuplicateDetector):
+        self.detector = detector
+        self._signatures: List[np.ndarray] = []
+        self._postings: List[Dict] = []
+        self._buckets: Dict[Tuple[int, int], List[int]] = {}
+
+    def partition(self, db: Session, jobs: List[Dict]):
+        """
+        Split a batch into new postings and near duplicates
+
+        Args:
+            db: Database session
+            jobs: Job dictionaries returned by the scrapers
+
+        Returns:
+            Tuple of
+            - new postings as [(job_data, signature or None if it has no words)],
+            - duplicates of stored jobs as unsaved JobDuplicate rows,
+            - duplicates of postings accepted earlier in the stream as
+              [(job_data, canonical job_data, similarity)]
+        """
+        detector = self.detector
+        new_jobs: List[Tuple[Dict, Optional[np.ndarray]]] = []
+        stored_duplicates: List[JobDuplicate] = []
+        stream_duplicates: List[Tuple[Dict, Dict, float]] = []
+
+        for job_data in jobs:
+            signature = detector.signature(job_data.get('description', ''))
+            if signature is None:
+                # Nothing to compare, keep the posting
+                new_jobs.append((job_data, None))
+                continue
+
+            buckets = detector.band_buckets(signature)
+
+            match = detector.find_duplicate(db, signature, buckets)
+            if match:
+                canonical_id, similarity = match
+                stored_duplicates.append(detector.make_duplicate(job_data, similarity, canonical_job_id=canonical_id))
+                continue
+
+            best = None
+            for index in {i for bucket in buckets for i in self._buckets.get(bucket, [])}:
+                similarity = estimate_similarity(signature, self._signatures[index])
+                if similarity >= detector.threshold and (best is None or similarity > best[1]):
+                    best = (index, similarity)
+
+            if best:
+                stream_duplicates.append((job_data, self._postings[best[0]], best[1]))
+                continue
+
+            for bucket in buckets:
+                self._buckets.setdefault(bucket, []).append(len(self._postings))
+            self._signatures.append(signature)
+            self._postings.append(job_data)
+            new_jobs.append((job_data, signature))
+
+        return new_jobs, stored_duplicates, stream_duplicates
+
+
+duplicate_detector = NearDuplicateDetector(
+    num_perm=settings.DEDUP_NUM_PERM,
+    bands=settings.DEDUP_BANDS,
+    threshold=settings.DEDUP_THRESHOLD
+)
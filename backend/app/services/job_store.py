@@ -0,0 +1,178 @@
+from datetime import datetime
+from typing import Dict, List, Optional
+import logging
+
+import numpy as np
+from sqlalchemy import bindparam, delete, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models.models import Job, JobDuplicate, JobLSHBucket, JobSignature, JobSkill
+from app.services.dedup_service import EMPTY_SIGNATURE, duplicate_detector
+from app.services.skill_index import normalize_skills
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Columns refreshed when a stored posting is written again (posted_date and
+# match_score are kept)
+UPDATED_COLUMNS = (
+    'title', 'company', 'location', 'description', 'requirements', 'salary_min', 'salary_max',
+    'source', 'scraped_at', 'is_active', 'required_skills', 'experience_required'
+)
+
+# Dialects with INSERT ... ON CONFLICT ... RETURNING
+UPSERT_INSERTS = {'sqlite': sqlite.insert, 'postgresql': postgresql.insert}
+
+# Columns of a near-duplicate link row
+DUPLICATE_COLUMNS = ('job_url', 'canonical_job_id', 'title', 'company', 'source', 'similarity')
+
+
+def _insert_new(db: Session, rows: List[Dict]) -> Dict[str, int]:
+    """Insert job rows in one executemany, skipping URLs stored meanwhile; returns {job_url: id}"""
+    table = Job.__table__
+    dialect_insert = UPSERT_INSERTS.get(db.get_bind().dialect.name)
+    if dialect_insert is not None:
+        statement = dialect_insert(table).on_conflict_do_nothing(
+            index_elements=[table.c.job_url]
+        ).returning(table.c.job_url, table.c.id)
+        return dict(db.execute(statement, rows).all())
+
+    db.execute(insert(table), rows)
+    urls = [row['job_url'] for row in rows]
+    return dict(db.execute(select(table.c.job_url, table.c.id).where(table.c.job_url.in_(urls))).all())
+
+
+def _write_indexes(db: Session, job_ids: List[int], skills: List[List[str]],
+                   signatures: List[Optional[np.ndarray]], replace: bool):
+    """Insert the skill postings and MinHash index rows of written jobs"""
+    if replace and job_ids:
+        for model in (JobSkill, JobSignature, JobLSHBucket):
+            db.execute(delete(model.__table__).where(model.__table__.c.job_id.in_(job_ids)))
+
+    skill_rows = [
+        {'job_id': job_id, 'skill': skill}
+        for job_id, job_skills in zip(job_ids, skills) for skill in normalize_skills(job_skills)
+    ]
+    signature_rows, bucket_rows = [], []
+    for job_id, signature in zip(job_ids, signatures):
+        if signature is None:
+            signature_rows.append({'job_id': job_id, 'signature': EMPTY_SIGNATURE})
+            continue
+        signature_rows.append({'job_id': job_id, 'signature': signature.tobytes()})
+        bucket_rows.extend(
+            {'job_id': job_id, 'band': band, 'bucket': bucket}
+            for band, bucket in duplicate_detector.band_buckets(signature)
+        )
+
+    for model, rows in ((JobSkill, skill_rows), (JobSignature, signature_rows), (JobLSHBucket, bucket_rows)):
+        if rows:
+            db.execute(insert(model.__table__), rows)
+
+
+def upsert_jobs(db: Session, rows: List[Dict], skills: List[List[str]],
+                signatures: List[Optional[np.ndarray]], update_existing: bool = True,
+                batch_size: int = 500) -> Dict[str, Dict[str, int]]:
+    """
+    Insert new jobs and refresh stored ones, matched on job_url, in bulk
+
+    Per batch, one IN query finds the stored URLs; new rows go in with a
+    single executemany INSERT ... ON CONFLICT (job_url) DO NOTHING
+    RETURNING id (SQLite and PostgreSQL), so a posting committed by
+    another writer in the meantime is skipped instead of failing the
+    batch, and stored rows are refreshed with one executemany UPDATE by
+    primary key. Skill postings and MinHash index rows are (re)written
+    with executemany inserts as well. Nothing goes through the ORM unit
+    of work; the caller commits.
+
+    Args:
+        db: Database session
+        rows: Job column values (every row with the same keys, job_url included)
+        skills: Extracted skills per row
+        signatures: MinHash signature (or None) per row
+        update_existing: Refresh stored jobs (False = leave them untouched)
+        batch_size: Rows per IN query and statement
+
+    Returns:
+        inserted and updated: {job_url: job id} of the jobs written
+    """
+    # The last row wins if a URL is repeated
+    latest = {row['job_url']: index for index, row in enumerate(rows)}
+    urls = list(latest)
+    inserted, updated = {}, {}
+
+    for start in range(0, len(urls), batch_size):
+        chunk = urls[start:start + batch_size]
+        stored = dict(db.execute(select(Job.job_url, Job.id).where(Job.job_url.in_(chunk))).all())
+
+        new_urls = [url for url in chunk if url not in stored]
+        if new_urls:
+            written = _insert_new(db, [rows[latest[url]] for url in new_urls])
+            inserted.update(written)
+            _write_indexes(
+                db, list(written.values()),
+                [skills[latest[url]] for url in written], [signatures[latest[url]] for url in written],
+                replace=False
+            )
+
+        if update_existing and stored:
+            db.execute(update(Job.__table__).where(Job.__table__.c.id == bindparam('_id')), [
+                dict({column: rows[latest[url]][column] for column in UPDATED_COLUMNS}, _id=job_id)
+                for url, job_id in stored.items()
+            ])
+            updated.update(stored)
+            _write_indexes(
+                db, list(stored.values()),
+                [skills[latest[url]] for url in stored], [signatures[latest[url]] for url in stored],
+                replace=True
+            )
+
+    skipped = len(urls) - len(inserted) - len(updated)
+    logger.info(
+        f"Upserted {len(urls)} jobs: {len(inserted)} inserted, {len(updated)} updated"
+        + (f", {skipped} skipped (stored concurrently)" if skipped else "")
+    )
+    return {'inserted': inserted, 'updated': updated}
+
+
+def insert_duplicates(db: Session, duplicates: List[JobDuplicate]) -> int:
+    """
+    Insert near-duplicate link rows, skipping URLs that are linked already
+
+    A link stored meanwhile by a concurrent scrape (job_url is unique) is
+    skipped with ON CONFLICT (job_url) DO NOTHING instead of failing the
+    transaction. The caller commits.
+
+    Args:
+        db: Database session
+        duplicates: Unsaved JobDuplicate rows with canonical_job_id set
+
+    Returns:
+        Number of links inserted
+    """
+    # The last link wins if a URL is repeated
+    rows = list({
+        duplicate.job_url: dict(
+            {column: getattr(duplicate, column) for column in DUPLICATE_COLUMNS},
+            detected_at=duplicate.detected_at or datetime.utcnow()
+        )
+        for duplicate in duplicates
+    }.values())
+    if not rows:
+        return 0
+
+    table = JobDuplicate.__table__
+    dialect_insert = UPSERT_INSERTS.get(db.get_bind().dialect.name)
+    if dialect_insert is not None:
+        statement = dialect_insert(table).on_conflict_do_nothing(
+            index_elements=[table.c.job_url]
+        ).returning(table.c.job_url)
+        return len(db.execute(statement, rows).all())
+
+    linked = set(db.execute(
+        select(table.c.job_url).where(table.c.job_url.in_([row['job_url'] for row in rows]))
+    ).scalars())
+    rows = [row for row in rows if row['job_url'] not in linked]
+    if rows:
+        db.execute(insert(table), rows)
+    return len(rows)
@@ -0,0 +1,214 @@
+import ast
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+import logging
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.models import Job
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SKILL_WEIGHT = 70
+EXPERIENCE_WEIGHT = 30
+
+
+def parse_skill_list(value: Optional[str]) -> List[str]:
+    """
+    Parse a stored skill list
+
+    Job skills are stored as str(list) and profile skills as JSON; both are
+    valid Python literals, so neither needs eval().
+    """
+    if not value:
+        return []
+    try:
+        skills = ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        return []
+    return [str(skill).lower() for skill in skills] if isinstance(skills, (list, tuple, set)) else []
+
+
+def compute_match_scores(matched: np.ndarray, required_counts: np.ndarray,
+                         required_experience: np.ndarray, user_experience) -> np.ndarray:
+    """
+    Vectorized form of the calculate_match_score formula
+
+    Args:
+        matched: Matched skill counts, shape (jobs,) or (jobs, users)
+        required_counts: Number of required skills per job, shape (jobs,)
+        required_experience: Required years per job, shape (jobs,)
+        user_experience: Years of experience, scalar or shape (users,)
+
+    Returns:
+        Unrounded scores between 0 and 100 with the shape of matched
+    """
+    shape = (-1,) + (1,) * (np.ndim(matched) - 1)
+    required_counts = np.asarray(required_counts, dtype=np.float64).reshape(shape)
+    required_experience = np.asarray(required_experience, dtype=np.float64).reshape(shape)
+    user_experience = np.asarray(user_experience, dtype=np.float64)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Skill matching (70% weight), neutral score if no skills detected
+        skill_score = np.where(
+            required_counts > 0, matched / required_counts * SKILL_WEIGHT, SKILL_WEIGHT / 2
+        )
+        # Experience matching (30% weight), partial credit below the requirement
+        exp_score = np.where(
+            required_experience > 0,
+            np.minimum(user_experience / required_experience, 1.0) * EXPERIENCE_WEIGHT,
+            EXPERIENCE_WEIGHT / 2
+        )
+
+    return np.minimum(skill_score + exp_score, 100)
+
+
+def build_skill_matrix(skill_lists: List[List[str]], skill_columns: Dict[str, int],
+                       grow: bool = True) -> sparse.csr_matrix:
+    """
+    Build a rows x skills 0/1 CSR matrix
+
+    Args:
+        skill_lists: One list of lowercased skills per row
+        skill_columns: Skill to column mapping, extended in place when grow is set
+        grow: Add unseen skills as new columns; otherwise ignore them
+    """
+    indices, indptr = [], [0]
+    for skills in skill_lists:
+        for skill in set(skills):
+            column = skill_columns.get(skill)
+            if column is None and grow:
+                column = skill_columns.setdefault(skill, len(skill_columns))
+            if column is not None:
+                indices.append(column)
+        indptr.append(len(indices))
+
+    return sparse.csr_matrix(
+        (np.ones(len(indices), dtype=np.float32), np.asarray(indices, dtype=np.int32), np.asarray(indptr)),
+        shape=(len(skill_lists), len(skill_columns))
+    )
+
+
+class MatchEngine:
+    """
+    Score one profile against every active job in a single vectorized pass
+
+    Builds a job x skill indicator matrix and a required-experience vector
+    from the stored Job.required_skills and Job.experience_required columns,
+    then applies the same 70/30 skill/experience formula as
+    NLPJobAnalyzer.calculate_match_score with sparse and NumPy operations.
+    The matrix is rebuilt lazily after invalidate() or once it is older than
+    max_age seconds (other worker processes may have ingested jobs).
+    """
+
+    def __init__(self, max_age: float = 60.0):
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._built_at: Optional[float] = None
+
+        self.job_ids = np.zeros(0, dtype=np.int64)
+        self.skill_columns: Dict[str, int] = {}
+        self._skills = sparse.csr_matrix((0, 0), dtype=np.float32)
+        self._required_counts = np.zeros(0, dtype=np.float32)
+        self._required_experience = np.zeros(0, dtype=np.float32)
+
+    def invalidate(self):
+        """Force a rebuild on the next scoring call"""
+        self._built_at = None
+
+    def _ensure_built(self, db: Session):
+        """Rebuild the job x skill matrix if it is missing or stale"""
+        if self._built_at is not None and time.monotonic() - self._built_at < self.max_age:
+            return
+
+        rows = db.query(Job.id, Job.required_skills, Job.experience_required).filter(
+            Job.is_active == True
+        ).all()
+
+        skill_columns: Dict[str, int] = {}
+        skills = build_skill_matrix([parse_skill_list(row[1]) for row in rows], skill_columns)
+
+        self.job_ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+        self.skill_columns = skill_columns
+        self._skills = skills
+        self._required_counts = np.diff(skills.indptr).astype(np.float32)
+        self._required_experience = np.fromiter(
+            (row[2] or 0 for row in rows), dtype=np.float32, count=len(rows)
+        )
+        self._built_at = time.monotonic()
+        logger.info(f"Match engine built: {len(rows)} jobs x {len(skill_columns)} skills")
+
+    def score_all(self, db: Session, user_skills: List[str],
+                  user_experience: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Score a profile against every active job
+
+        Args:
+            db: Database session
+            user_skills: List of user's skills
+            user_experience: User's years of experience
+
+        Returns:
+            (job ids, unrounded match scores between 0 and 100)
+        """
+        with self._lock:
+            self._ensure_built(db)
+            job_ids = self.job_ids
+            skills = self._skills
+            required_counts = self._required_counts
+            required_experience = self._required_experience
+            skill_columns = self.skill_columns
+
+        user_vector = build_skill_matrix([[s.lower() for s in user_skills]], skill_columns, grow=False)
+        matched = (skills @ user_vector.T).toarray().ravel()
+
+        return job_ids, compute_match_scores(matched, required_counts, required_experience, user_experience)
+
+    def rank(self, db: Session, user_skills: List[str], user_experience: int,
+             limit: int = 20, skip: int = 0, min_score: Optional[float] = None) -> List[Tuple[int, float]]:
+        """
+        Rank active jobs for a profile
+
+        Args:
+            db: Database session
+            user_skills: List of user's skills
+            user_experience: User's years of experience
+            limit: Number of results to return
+            skip: Number of top results to skip (pagination)
+            min_score: Only return jobs scoring at least this much
+
+        Returns:
+            List of (job_id, match score) pairs, best first
+        """
+        job_ids, scores = self.score_all(db, user_skills, user_experience)
+        # Filter and order on the scores as returned, so a job shown with
+        # min_score exactly is kept and equal shown scores tie
+        scores = np.round(scores, 2)
+
+        if min_score is not None:
+            keep = scores >= min_score
+            job_ids, scores = job_ids[keep], scores[keep]
+
+        wanted = min(skip + limit, len(scores))
+        if wanted <= 0:
+            return []
+
+        # Partial selection of the requested pages (keeping every job tied
+        # with the cut-off score), then a full order on that subset only;
+        # ties go to newer jobs
+        if wanted < len(scores):
+            cutoff = -np.partition(-scores, wanted - 1)[wanted - 1]
+            top = np.flatnonzero(scores >= cutoff)
+        else:
+            top = np.arange(len(scores))
+        top = top[np.lexsort((-job_ids[top], -scores[top]))][skip:wanted]
+
+        return [(int(job_ids[i]), float(scores[i])) for i in top]
+
+
+match_engine = MatchEngine(max_age=settings.MATCH_ENGINE_MAX_AGE)
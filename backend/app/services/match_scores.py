@@ -0,0 +1,180 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List
+import logging
+
+import numpy as np
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.models import Job, JobMatchScore, UserProfile
+from app.services.job_store import UPSERT_INSERTS
+from app.services.match_engine import (
+    build_skill_matrix, compute_match_scores, match_engine, parse_skill_list
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def store_match_score(db: Session, user_id: int, job_id: int, score: float):
+    """
+    Insert or replace one user's stored score for a job
+
+    A single INSERT ... ON CONFLICT (user_id, job_id) DO UPDATE (SQLite and
+    PostgreSQL), so concurrent requests for the same pair cannot both
+    insert. The caller commits.
+    """
+    values = {'user_id': user_id, 'job_id': job_id, 'score': score, 'computed_at': datetime.utcnow()}
+    table = JobMatchScore.__table__
+    dialect_insert = UPSERT_INSERTS.get(db.get_bind().dialect.name)
+    if dialect_insert is not None:
+        statement = dialect_insert(table).values(**values)
+        db.execute(statement.on_conflict_do_update(
+            index_elements=[table.c.user_id, table.c.job_id],
+            set_={'score': statement.excluded.score, 'computed_at': statement.excluded.computed_at}
+        ))
+        return
+
+    stored = db.execute(select(table.c.id).where(
+        table.c.user_id == user_id, table.c.job_id == job_id
+    )).scalar()
+    if stored is None:
+        db.execute(insert(table).values(**values))
+    else:
+        db.execute(table.update().where(table.c.id == stored).values(score=score, computed_at=values['computed_at']))
+
+
+class MatchScoreUpdater:
+    """
+    Keep the per-user job_match_scores table up to date
+
+    New jobs are scored against every profile and a saved profile is
+    rescored against every active job. Updates run on a single background
+    thread with its own sessions, so they never block a request and never
+    interleave with each other, and rows are written in executemany batches.
+    """
+
+    def __init__(self, session_factory: Callable = SessionLocal, batch_size: int = 1000):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="match-scores")
+
+    def schedule_user(self, user_id: int) -> Future:
+        """Rescore one user against all active jobs in the background"""
+        return self._executor.submit(self._run, self.rescore_user, user_id)
+
+    def schedule_jobs(self, job_ids: List[int]) -> Future:
+        """Score newly ingested jobs against all profiles in the background"""
+        return self._executor.submit(self._run, self.score_jobs, list(job_ids))
+
+    def shutdown(self):
+        """Stop accepting work and wait for queued updates to finish"""
+        self._executor.shutdown(wait=True)
+
+    def _run(self, update: Callable, argument) -> int:
+        """Run one update with its own session"""
+        db = self.session_factory()
+        try:
+            return update(db, argument)
+        except Exception as e:
+            logger.error(f"Error updating match scores: {e}")
+            db.rollback()
+            return 0
+        finally:
+            db.close()
+
+    def rescore_user(self, db: Session, user_id: int) -> int:
+        """
+        Replace a user's stored scores with fresh ones for every active job
+
+        Returns:
+            Number of scores written
+        """
+        profile = db.query(UserProfile).filter(UserProfile.user_id == user_id).first()
+        if not profile:
+            return 0
+
+        # Jobs ingested since the engine's last build reach this user's
+        # scores through schedule_jobs, which runs on the same thread
+        job_ids, scores = match_engine.score_all(
+            db, parse_skill_list(profile.skills), profile.experience_years or 0
+        )
+
+        db.query(JobMatchScore).filter(JobMatchScore.user_id == user_id).delete(synchronize_session=False)
+        now = datetime.utcnow()
+        rows = [
+            {'user_id': user_id, 'job_id': int(job_id), 'score': round(float(score), 2), 'computed_at': now}
+            for job_id, score in zip(job_ids, scores)
+        ]
+        self._insert(db, rows)
+        db.commit()
+
+        logger.info(f"Rescored user {user_id} against {len(rows)} jobs")
+        return len(rows)
+
+    def score_jobs(self, db: Session, job_ids: List[int]) -> int:
+        """
+        Score jobs against every user profile, replacing any stored scores
+
+        Returns:
+            Number of scores written
+        """
+        profiles = db.query(
+            UserProfile.user_id, UserProfile.skills, UserProfile.experience_years
+        ).filter(UserProfile.user_id != None).all()
+        if not profiles or not job_ids:
+            return 0
+
+        user_ids = np.array([profile[0] for profile in profiles], dtype=np.int64)
+        user_experience = np.array([profile[2] or 0 for profile in profiles], dtype=np.float64)
+        written = 0
+
+        for start in range(0, len(job_ids), self.batch_size):
+            chunk = job_ids[start:start + self.batch_size]
+            jobs = db.query(Job.id, Job.required_skills, Job.experience_required).filter(
+                Job.id.in_(chunk),
+                Job.is_active == True
+            ).all()
+            if not jobs:
+                continue
+
+            skill_columns: Dict[str, int] = {}
+            job_skills = build_skill_matrix([parse_skill_list(job[1]) for job in jobs], skill_columns)
+            user_skills = build_skill_matrix(
+                [parse_skill_list(profile[1]) for profile in profiles], skill_columns, grow=False
+            )
+
+            # jobs x users matrices, one vectorized pass per chunk
+            matched = (job_skills @ user_skills.T).toarray()
+            scores = compute_match_scores(
+                matched,
+                np.diff(job_skills.indptr),
+                np.array([job[2] or 0 for job in jobs], dtype=np.float64),
+                user_experience
+            )
+
+            chunk_ids = [job[0] for job in jobs]
+            db.query(JobMatchScore).filter(JobMatchScore.job_id.in_(chunk_ids)).delete(synchronize_session=False)
+            now = datetime.utcnow()
+            rows = [
+                {'user_id': int(user_id), 'job_id': job_id, 'score': round(float(score), 2), 'computed_at': now}
+                for job_id, job_scores in zip(chunk_ids, scores)
+                for user_id, score in zip(user_ids, job_scores)
+            ]
+            self._insert(db, rows)
+            db.commit()
+            written += len(rows)
+
+        logger.info(f"Scored {len(job_ids)} jobs against {len(profiles)} profiles")
+        return written
+
+    def _insert(self, db: Session, rows: List[Dict]):
+        """Insert score rows with executemany batches"""
+        for start in range(0, len(rows), self.batch_size):
+            db.execute(insert(JobMatchScore), rows[start:start + self.batch_size])
+
+
+match_score_updater = MatchScoreUpdater(batch_size=settings.MATCH_SCORE_BATCH_SIZE)
@@ -1,20 +1,70 @@
+import os
 import re
-from typing import Dict, List, Set
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional, Set, Tuple
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.services.analysis_cache import AnalysisCache
+from app.services.similarity_index import top_k_similarity
+from app.services.skill_matcher import SkillMatcher
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Bump whenever the skill dictionary or any extractor changes so cached
+# analysis results from older versions are no longer served
+ANALYZER_VERSION = 1
+
+# Patterns like "3+ years", "5-7 years", "minimum 2 years"
+EXPERIENCE_PATTERNS = [
+    re.compile(r'(\d+)\+?\s*(?:to|\-)\s*(\d+)?\s*years?'),
+    re.compile(r'minimum\s+(\d+)\s*years?'),
+    re.compile(r'(\d+)\+\s*years?'),
+    re.compile(r'at least\s+(\d+)\s*years?')
+]
+
+# Patterns like "$80,000 - $120,000", "$80k-$100k", "80-100K"
+SALARY_PATTERNS = [
+    re.compile(r'\$(\d{2,3}),?(\d{3})\s*-\s*\$?(\d{2,3}),?(\d{3})', re.IGNORECASE),  # $80,000 - $120,000
+    re.compile(r'\$(\d{2,3})k\s*-\s*\$?(\d{2,3})k', re.IGNORECASE),  # $80k-$100k
+    re.compile(r'(\d{2,3})k\s*-\s*(\d{2,3})k', re.IGNORECASE),  # 80k-100k
+]
+
+SENIOR_KEYWORDS = ('senior', 'lead', 'principal', 'staff', 'architect', 'director')
+
+analysis_cache = AnalysisCache(
+    version=ANALYZER_VERSION,
+    max_size=settings.ANALYSIS_CACHE_SIZE,
+    session_factory=SessionLocal if settings.ANALYSIS_CACHE_PERSIST else None
+)
+
 
 class NLPJobAnalyzer:
     """Analyze job descriptions using NLP techniques"""
 
-    def __init__(self):
+    def __init__(self, max_workers: Optional[int] = None, chunk_size: Optional[int] = None,
+                 parallel_threshold: Optional[int] = None, use_cache: bool = True):
         self.common_skills = self._load_common_skills()
+        self.skill_matcher = SkillMatcher(self.common_skills)
         self.vectorizer = TfidfVectorizer(stop_words='english', max_features=100)
 
+        # Batch analysis settings
+        self.max_workers = max_workers or settings.NLP_MAX_WORKERS or os.cpu_count() or 1
+        self.chunk_size = max(1, chunk_size or settings.NLP_BATCH_CHUNK_SIZE)
+        self.parallel_threshold = (
+            parallel_threshold if parallel_threshold is not None else settings.NLP_PARALLEL_THRESHOLD
+        )
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+        # Shared content-hash cache of analysis results
+        self.cache: Optional[AnalysisCache] = analysis_cache if use_cache else None
+
     def _load_common_skills(self) -> Set[str]:
         """Load common technical skills for matching"""
         return {
@@ -54,16 +104,8 @@ class NLPJobAnalyzer:
         Returns:
             List of identified skills
         """
-        text_lower = text.lower()
-        found_skills = []
-
-        for skill in self.common_skills:
-            # Use word boundaries for better matching
-            pattern = r'\b' + re.escape(skill) + r'\b'
-            if re.search(pattern, text_lower):
-                found_skills.append(skill)
-
-        return found_skills
+        # Single pass over the text with word-boundary checks per hit
+        return self.skill_matcher.find(text.lower())
 
     def extract_experience_years(self, text: str) -> int:
         """
@@ -75,19 +117,14 @@ class NLPJobAnalyzer:
         Returns:
             Number of years of experience required (default: 0)
         """
-        # Patterns like "3+ years", "5-7 years", "minimum 2 years"
-        patterns = [
-            r'(\d+)\+?\s*(?:to|\-)\s*(\d+)?\s*years?',
-            r'minimum\s+(\d+)\s*years?',
-            r'(\d+)\+\s*years?',
-            r'at least\s+(\d+)\s*years?'
-        ]
+        return self._extract_experience_years_lower(text.lower())
 
-        text_lower = text.lower()
+    def _extract_experience_years_lower(self, text_lower: str) -> int:
+        """Extract required years of experience from already-lowercased text"""
         years = []
 
-        for pattern in patterns:
-            matches = re.findall(pattern, text_lower)
+        for pattern in EXPERIENCE_PATTERNS:
+            matches = pattern.findall(text_lower)
             for match in matches:
                 if isinstance(match, tuple):
                     years.extend([int(y) for y in match if y and y.isdigit()])
@@ -107,15 +144,8 @@ class NLPJobAnalyzer:
         Returns:
             Dictionary with min and max salary
         """
-        # Patterns like "$80,000 - $120,000", "$80k-$100k", "80-100K"
-        patterns = [
-            r'\$(\d{2,3}),?(\d{3})\s*-\s*\$?(\d{2,3}),?(\d{3})',  # $80,000 - $120,000
-            r'\$(\d{2,3})k\s*-\s*\$?(\d{2,3})k',  # $80k-$100k
-            r'(\d{2,3})k\s*-\s*(\d{2,3})k',  # 80k-100k
-        ]
-
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for pattern in SALARY_PATTERNS:
+            match = pattern.search(text)
             if match:
                 groups = match.groups()
                 if len(groups) == 4:  # Full format with commas
@@ -130,7 +160,7 @@ class NLPJobAnalyzer:
         return {'min': None, 'max': None}
 
     def calculate_match_score(self, job_description: str, user_skills: List[str],
-                             user_experience: int) -> float:
+                             user_experience: int, analysis: Optional[Dict] = None) -> float:
         """
         Calculate match score between job and user profile
 
@@ -138,13 +168,39 @@ class NLPJobAnalyzer:
             job_description: Job description text
             user_skills: List of user's skills
             user_experience: User's years of experience
+            analysis: Result of analyze_job for this job; when given, the
+                description is not scanned again
 
         Returns:
             Match score between 0 and 100
         """
         # Extract job requirements
-        required_skills = self.extract_skills(job_description)
-        required_experience = self.extract_experience_years(job_description)
+        if analysis is None:
+            analysis = self.analyze_text(job_description)
+
+        return self.score_match(
+            analysis['required_skills'],
+            analysis['experience_years'],
+            user_skills,
+            user_experience
+        )
+
+    @staticmethod
+    def score_match(required_skills: List[str], required_experience: int,
+                    user_skills: List[str], user_experience: int) -> float:
+        """
+        Score a profile against already-extracted job requirements
+
+        Args:
+            required_skills: Skills required by the job
+            required_experience: Years of experience required by the job
+            user_skills: List of user's skills
+            user_experience: User's years of experience
+
+        Returns:
+            Match score between 0 and 100
+        """
+        required_experience = required_experience or 0
 
         # Skill matching (70% weight)
         if required_skills:
@@ -179,46 +235,206 @@ class NLPJobAnalyzer:
             Dictionary with analysis results
         """
         full_text = f"{job_description} {requirements}"
+        text_lower = full_text.lower()
+
+        if self.cache is None:
+            return self.analyze_text(full_text, text_lower)
+
+        cache_key = self.cache.make_key(text_lower)
+        analysis = self.cache.get(cache_key)
+        if analysis is None:
+            analysis = self.analyze_text(full_text, text_lower)
+            self.cache.set(cache_key, analysis)
+
+        analysis['text_length'] = len(full_text)
+        return analysis
+
+    def analyze_text(self, text: str, text_lower: Optional[str] = None) -> Dict:
+        """
+        Run every extractor over one text with a single normalization pass
+
+        The text is lowercased once and shared by the skill matcher and the
+        precompiled experience, salary and seniority patterns. The result can
+        be passed to calculate_match_score so scoring never rescans the text.
+
+        Args:
+            text: Job text (description plus requirements)
+            text_lower: text.lower(), if the caller already computed it
+
+        Returns:
+            Dictionary with analysis results
+        """
+        if text_lower is None:
+            text_lower = text.lower()
 
         analysis = {
-            'required_skills': self.extract_skills(full_text),
-            'experience_years': self.extract_experience_years(full_text),
-            'salary_range': self.extract_salary_range(full_text),
-            'text_length': len(full_text),
-            'is_senior_role': self._is_senior_role(full_text)
+            'required_skills': self.skill_matcher.find(text_lower),
+            'experience_years': self._extract_experience_years_lower(text_lower),
+            'salary_range': self.extract_salary_range(text_lower),
+            'text_length': len(text),
+            'is_senior_role': self._is_senior_role_lower(text_lower)
         }
 
         logger.info(f"Job analysis complete: {len(analysis['required_skills'])} skills found")
         return analysis
 
+    def analyze_jobs(self, batch: List[Tuple[str, str]]) -> List[Dict]:
+        """
+        Analyze many jobs at once
+
+        Cached postings are answered from the analysis cache and identical
+        texts within the batch are analyzed once. The remaining texts run
+        in-process for small batches, or are split into chunks and fanned
+        out over a process pool so bulk scrapes use every core.
+
+        Args:
+            batch: List of (job_description, requirements) pairs
+
+        Returns:
+            List of analysis dictionaries, in the same order as the input
+        """
+        full_texts = [f"{description or ''} {requirements or ''}" for description, requirements in batch]
+
+        if self.cache is None:
+            return self._analyze_texts(full_texts)
+
+        keys = [self.cache.make_key(text.lower()) for text in full_texts]
+        cached = self.cache.get_many(keys)
+
+        # Analyze each distinct uncached text once
+        pending = {}
+        for key, text in zip(keys, full_texts):
+            if key not in cached and key not in pending:
+                pending[key] = text
+
+        fresh = dict(zip(pending, self._analyze_texts(list(pending.values()))))
+        self.cache.set_many(fresh)
+
+        results = []
+        for key, text in zip(keys, full_texts):
+            analysis = dict(cached[key] if key in cached else fresh[key])
+            analysis['text_length'] = len(text)
+            results.append(analysis)
+        return results
+
+    def _analyze_texts(self, full_texts: List[str]) -> List[Dict]:
+        """Analyze combined texts in-process or on the process pool, preserving order"""
+        if self.max_workers <= 1 or len(full_texts) < max(self.parallel_threshold, 2):
+            return _analyze_chunk_with(self, full_texts)
+
+        chunks = [full_texts[i:i + self.chunk_size] for i in range(0, len(full_texts), self.chunk_size)]
+
+        try:
+            executor = self._get_executor()
+            results = []
+            # map() yields chunk results in submission order
+            for chunk_result in executor.map(_analyze_chunk, chunks):
+                results.extend(chunk_result)
+            return results
+        except BrokenProcessPool as e:
+            logger.error(f"NLP process pool failed, analyzing in-process: {e}")
+            self.shutdown()
+            return _analyze_chunk_with(self, full_texts)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Lazily start the process pool used by analyze_jobs"""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+                logger.info(f"Started NLP process pool with {self.max_workers} workers")
+            return self._executor
+
+    def shutdown(self):
+        """Stop the batch analysis process pool, if one was started"""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
     def _is_senior_role(self, text: str) -> bool:
         """Check if job is for senior level"""
-        senior_keywords = ['senior', 'lead', 'principal', 'staff', 'architect', 'director']
-        text_lower = text.lower()
-        return any(keyword in text_lower for keyword in senior_keywords)
+        return self._is_senior_role_lower(text.lower())
 
-    def compare_jobs(self, job_descriptions: List[str]) -> List[float]:
+    def _is_senior_role_lower(self, text_lower: str) -> bool:
+        """Check already-lowercased text for senior level keywords"""
+        return any(keyword in text_lower for keyword in SENIOR_KEYWORDS)
+
+    def compare_jobs(self, job_descriptions: List[str], top_k: Optional[int] = None,
+                     threshold: float = 0.0, block_size: int = 512):
         """
         Compare similarity between multiple job descriptions
 
         Args:
             job_descriptions: List of job description texts
+            top_k: If set, keep only the top_k most similar other jobs per
+                description instead of returning the dense N x N matrix
+            threshold: Minimum similarity kept in top_k mode
+            block_size: Tile size used by top_k mode; bounds peak memory
 
         Returns:
-            Similarity scores matrix
+            Similarity scores matrix, or in top_k mode a list of
+            (i, j, score) triples sorted by i and then by descending score
         """
         if len(job_descriptions) < 2:
             return []
 
         try:
             tfidf_matrix = self.vectorizer.fit_transform(job_descriptions)
-            similarity_matrix = cosine_similarity(tfidf_matrix)
-            return similarity_matrix.tolist()
+
+            if top_k is None:
+                similarity_matrix = cosine_similarity(tfidf_matrix)
+                return similarity_matrix.tolist()
+
+            neighbours = top_k_similarity(tfidf_matrix, top_k, threshold, block_size)
+            return [
+                (i, int(j), round(float(score), 4))
+                for i in range(neighbours.shape[0])
+                for j, score in zip(
+                    neighbours.indices[neighbours.indptr[i]:neighbours.indptr[i + 1]],
+                    neighbours.data[neighbours.indptr[i]:neighbours.indptr[i + 1]]
+                )
+            ]
         except Exception as e:
             logger.error(f"Error comparing jobs: {e}")
             return []
 
 
+# Per-process analyzer used by pool workers, created on first use
+_worker_analyzer: Optional[NLPJobAnalyzer] = None
+
+
+def _empty_analysis(full_text: str) -> Dict:
+    """Analysis used for a job whose text could not be analyzed"""
+    return {
+        'required_skills': [],
+        'experience_years': 0,
+        'salary_range': {'min': None, 'max': None},
+        'text_length': len(full_text),
+        'is_senior_role': False
+    }
+
+
+def _analyze_chunk_with(analyzer: NLPJobAnalyzer, chunk: List[str]) -> List[Dict]:
+    """Analyze a chunk of combined job texts with the given analyzer, one failing job at a time"""
+    results = []
+    for full_text in chunk:
+        try:
+            results.append(analyzer.analyze_text(full_text))
+        except Exception as e:
+            logger.error(f"Error analyzing job: {e}")
+            results.append(_empty_analysis(full_text))
+    return results
+
+
+def _analyze_chunk(chunk: List[str]) -> List[Dict]:
+    """Process pool entry point for analyze_jobs"""
+    global _worker_analyzer
+    if _worker_analyzer is None:
+        # Workers never fan out again and leave caching to the parent process
+        _worker_analyzer = NLPJobAnalyzer(max_workers=1, use_cache=False)
+    return _analyze_chunk_with(_worker_analyzer, chunk)
+
+
 if __name__ == "__main__":
     # Test the analyzer
     analyzer = NLPJobAnalyzer()
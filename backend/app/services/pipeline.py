@@ -0,0 +1,177 @@
+import queue
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Marks the end of a stream on a stage's inbox
+_DONE = object()
+
+
+class PipelineStage:
+    """
+    One step of a StreamingPipeline
+
+    The handler receives one batch (a list) and returns the batch for the
+    next stage, or None/empty to pass nothing on. finish is called once
+    after the last batch and may return a final batch (for stages that
+    accumulate).
+    """
+
+    def __init__(self, name: str, handler: Callable[[List], Optional[List]], workers: int = 1,
+                 finish: Callable[[], Optional[List]] = None):
+        self.name = name
+        self.handler = handler
+        self.workers = max(1, workers)
+        self.finish = finish
+
+        self.batches = 0
+        self.items_in = 0
+        self.items_out = 0
+        self.errors = 0
+        self.failed_items = 0
+        self.busy = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, items_in: int, items_out: int, seconds: float, failed: bool = False):
+        with self._lock:
+            self.batches += 1
+            self.items_in += items_in
+            self.items_out += items_out
+            self.busy += seconds
+            if failed:
+                self.errors += 1
+                self.failed_items += items_in
+
+    def stats(self) -> Dict:
+        return {
+            'workers': self.workers,
+            'batches': self.batches,
+            'items_in': self.items_in,
+            'items_out': self.items_out,
+            'errors': self.errors,
+            'failed_items': self.failed_items,
+            'busy_seconds': round(self.busy, 3),
+            # Per worker-second of handler time, so stages compare regardless of waiting
+            'items_per_second': round((self.items_in or self.items_out) / self.busy, 1) if self.busy else 0.0
+        }
+
+
+class StreamingPipeline:
+    """
+    Run batches from a source through stages connected by bounded queues
+
+    The source and every stage worker run on their own threads. When a
+    stage falls behind, its inbox fills up and the stage before it blocks
+    on put, so backpressure reaches the source and memory stays bounded by
+    queue_size batches per stage. A failing batch is logged and dropped
+    without stopping the stream; the result counts the failed batches and
+    the items they held, per stage and in total.
+    """
+
+    def __init__(self, stages: List[PipelineStage], queue_size: int = 4, name: str = "pipeline"):
+        self.stages = stages
+        self.queue_size = queue_size
+        self.name = name
+
+    def run(self, source: Iterable[List]) -> Dict:
+        """
+        Stream every batch of source through the stages and wait for the end
+
+        Args:
+            source: Iterable of batches (lists), consumed on its own thread
+
+        Returns:
+            Per stage counters and throughput, the failed batches (errors)
+            and items dropped with them (failed_items) over all stages, and
+            the total elapsed seconds
+        """
+        started = time.monotonic()
+        inboxes = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        source_stage = PipelineStage('source', None)
+
+        threads = [threading.Thread(
+            target=self._feed, args=(source, source_stage, inboxes[0] if inboxes else None),
+            name=f"{self.name}-source", daemon=True
+        )]
+        for index, stage in enumerate(self.stages):
+            outbox = inboxes[index + 1] if index + 1 < len(inboxes) else None
+            remaining = [stage.workers]
+            for worker in range(stage.workers):
+                threads.append(threading.Thread(
+                    target=self._work, args=(stage, inboxes[index], outbox, remaining),
+                    name=f"{self.name}-{stage.name}-{worker}", daemon=True
+                ))
+
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        stats = {'source': source_stage.stats()}
+        stats.update({stage.name: stage.stats() for stage in self.stages})
+        return {
+            'stages': stats,
+            'errors': sum(stage['errors'] for stage in stats.values()),
+            'failed_items': sum(stage['failed_items'] for stage in stats.values()),
+            'elapsed': round(time.monotonic() - started, 3)
+        }
+
+    def _feed(self, source: Iterable[List], stage: PipelineStage, outbox: Optional[queue.Queue]):
+        """Pull batches from the source into the first stage"""
+        try:
+            iterator = iter(source)
+            while True:
+                pulled = time.perf_counter()
+                try:
+                    batch = next(iterator)
+                except StopIteration:
+                    break
+                stage.record(0, len(batch), time.perf_counter() - pulled)
+                if batch and outbox is not None:
+                    outbox.put(batch)
+        except Exception as e:
+            logger.error(f"{self.name} source failed: {e}")
+            stage.record(0, 0, 0.0, failed=True)
+        finally:
+            if outbox is not None:
+                outbox.put(_DONE)
+
+    def _work(self, stage: PipelineStage, inbox: queue.Queue, outbox: Optional[queue.Queue], remaining: List[int]):
+        """Worker loop: handle batches until the end marker, the last worker closes the stage"""
+        while True:
+            batch = inbox.get()
+            if batch is _DONE:
+                # Let sibling workers see the end marker too
+                inbox.put(_DONE)
+                break
+
+            self._handle(stage, stage.handler, batch, outbox)
+
+        with stage._lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if not last:
+            return
+
+        if stage.finish is not None:
+            self._handle(stage, lambda _: stage.finish(), [], outbox)
+        if outbox is not None:
+            outbox.put(_DONE)
+
+    def _handle(self, stage: PipelineStage, handler: Callable, batch: List, outbox: Optional[queue.Queue]):
+        """Run one batch through a handler, forwarding its output"""
+        started = time.perf_counter()
+        try:
+            result = handler(batch)
+        except Exception as e:
+            logger.error(f"{self.name} stage {stage.name} failed on a batch of {len(batch)}: {e}")
+            stage.record(len(batch), 0, time.perf_counter() - started, failed=True)
+            return
+
+        stage.record(len(batch), len(result or []), time.perf_counter() - started)
+        if result and outbox is not None:
+            outbox.put(result)
@@ -0,0 +1,299 @@
+import json
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+import logging
+
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal
+from app.models.models import ScrapeTask
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+PARTIAL = 'partial'  # finished, but some batches failed and their jobs were dropped
+FAILED = 'failed'
+
+
+class _ProgressReporter:
+    """Writes a running task's progress snapshots, at most once per interval"""
+
+    def __init__(self, worker: 'ScrapeWorker', task_id: int):
+        self.worker = worker
+        self.task_id = task_id
+        self._lock = threading.Lock()
+        self._last = 0.0
+
+    def __call__(self, snapshot: Dict):
+        # Called from pipeline stage threads; a dropped snapshot is superseded by the next
+        with self._lock:
+            now = time.monotonic()
+            if now - self._last < self.worker.progress_interval:
+                return
+            self._last = now
+            try:
+                self.worker._update(self.task_id, self.worker.progress_values(snapshot))
+            except Exception as e:
+                logger.error(f"Error reporting progress of scrape task {self.task_id}: {e}")
+
+
+class ScrapeWorker:
+    """
+    Run queued scrape tasks on worker threads with their own sessions
+
+    Tasks are rows of the scrape_tasks table, so they survive restarts and
+    their state, progress and errors can be read from any process. Worker
+    threads claim the oldest queued task with a conditional UPDATE (queued
+    -> running), which lets several API processes, or standalone worker
+    processes (python -m app.worker), share one table safely. submit()
+    wakes an idle thread at once; otherwise threads poll the table every
+    poll_interval seconds. Tasks left running by a process that died
+    (no progress for stale_after seconds) are queued again by the next
+    poll, up to max_attempts runs; then they are marked failed, so a task
+    that keeps killing its worker is not retried forever.
+    """
+
+    def __init__(self, run: Callable[[Dict, Callable[[Dict], None]], Dict], session_factory: Callable = SessionLocal,
+                 workers: int = 2, poll_interval: float = 5, progress_interval: float = 1,
+                 stale_after: float = 3600, max_attempts: int = 3):
+        """
+        Args:
+            run: Runs one task: called with the task parameters (query,
+                location, num_pages, sources, enrich_details, incremental)
+                and a progress callback taking a snapshot dict; returns the
+                final counts, errors and failed_items, per-source stats,
+                stages and coalesced flag
+            session_factory: Creates the sessions the worker uses
+            workers: Worker threads (0 = only queue tasks, e.g. for external workers)
+            poll_interval: Seconds between checks for tasks queued elsewhere
+            progress_interval: Minimum seconds between progress writes per task
+            stale_after: Seconds without progress before a running task counts as abandoned
+            max_attempts: Runs of an abandoned task before it is marked failed
+        """
+        self.run = run
+        self.session_factory = session_factory
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.progress_interval = progress_interval
+        self.stale_after = stale_after
+        self.max_attempts = max_attempts
+
+        self._wake = threading.Condition()
+        self._submitted = False  # set by submit() so a wake-up between claim and wait is not lost
+        self._stopping = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._identity = f"{socket.gethostname()}:{os.getpid()}"
+        self._stale_lock = threading.Lock()
+        self._stale_checked = 0.0
+
+    def start(self):
+        """Start the worker threads"""
+        if self._threads or self.workers <= 0:
+            return
+        self._stopping.clear()
+        self._stale_checked = 0.0
+        for number in range(self.workers):
+            thread = threading.Thread(target=self._loop, name=f"scrape-worker-{number}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logger.info(f"Started {self.workers} scrape worker threads")
+
+    def stop(self, timeout: float = 30):
+        """Stop taking tasks and wait for running ones (up to timeout seconds each)"""
+        self._stopping.set()
+        with self._wake:
+            self._wake.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def submit(self, db: Session, query: str, location: str = "", num_pages: int = 1, sources: List[str] = None,
+               enrich_details: bool = False, incremental: bool = False) -> ScrapeTask:
+        """
+        Queue a scrape
+
+        Args:
+            db: Database session (the task is committed)
+            query, location, num_pages, sources, enrich_details, incremental: As in ScrapeRequest
+
+        Returns:
+            The queued ScrapeTask row
+        """
+        task = ScrapeTask(
+            query=query,
+            location=location,
+            num_pages=num_pages,
+            sources=json.dumps(sources or []),
+            enrich_details=enrich_details,
+            incremental=incremental,
+            state=QUEUED,
+            created_at=datetime.utcnow()
+        )
+        db.add(task)
+        db.commit()
+        db.refresh(task)
+
+        with self._wake:
+            self._submitted = True
+            self._wake.notify()
+        return task
+
+    def requeue_stale(self) -> int:
+        """
+        Queue running tasks that stopped reporting progress again
+
+        Tasks that already ran max_attempts times are marked failed instead.
+
+        Returns:
+            Number of tasks queued again
+        """
+        now = datetime.utcnow()
+        stale = (ScrapeTask.state == RUNNING, ScrapeTask.updated_at < now - timedelta(seconds=self.stale_after))
+        db = self.session_factory()
+        try:
+            failed = db.query(ScrapeTask).filter(*stale, ScrapeTask.attempts >= self.max_attempts).update({
+                'state': FAILED, 'finished_at': now,
+                'error': f"Abandoned by its worker {self.max_attempts} times"
+            }, synchronize_session=False)
+            requeued = db.query(ScrapeTask).filter(*stale).update(
+                {'state': QUEUED, 'worker': None}, synchronize_session=False
+            )
+            db.commit()
+        finally:
+            db.close()
+        if failed:
+            logger.error(f"Gave up on {failed} scrape tasks abandoned {self.max_attempts} times")
+        if requeued:
+            logger.warning(f"Requeued {requeued} abandoned scrape tasks")
+        return requeued
+
+    def _requeue_stale_due(self):
+        """Run requeue_stale at most once per poll interval across this process's threads"""
+        with self._stale_lock:
+            now = time.monotonic()
+            if now - self._stale_checked < self.poll_interval:
+                return
+            self._stale_checked = now
+        try:
+            self.requeue_stale()
+        except Exception as e:
+            logger.error(f"Error requeuing abandoned scrape tasks: {e}")
+
+    @staticmethod
+    def progress_values(snapshot: Dict) -> Dict:
+        """Task columns for a progress snapshot or final result"""
+        return {
+            'jobs_found': snapshot.get('jobs_found', 0),
+            'jobs_saved': snapshot.get('jobs_saved', 0),
+            'jobs_updated': snapshot.get('jobs_updated', 0),
+            'jobs_enriched': snapshot.get('jobs_enriched', 0),
+            'progress': json.dumps(snapshot.get('sources', {}), default=str),
+            'updated_at': datetime.utcnow()
+        }
+
+    def _loop(self):
+        """Claim and run tasks until stopped"""
+        name = f"{self._identity}/{threading.current_thread().name}"
+        while not self._stopping.is_set():
+            self._requeue_stale_due()
+            try:
+                task = self._claim(name)
+            except Exception as e:
+                logger.error(f"Error claiming a scrape task: {e}")
+                task = None
+
+            if task is None:
+                with self._wake:
+                    if not self._submitted:
+                        self._wake.wait(self.poll_interval)
+                    self._submitted = False
+                continue
+            try:
+                self._run_task(task)
+            except Exception as e:
+                # Recording the outcome failed; the task is requeued once it goes stale
+                logger.error(f"Error finishing scrape task {task.get('id')}: {e}")
+
+    def _claim(self, name: str) -> Optional[Dict]:
+        """Move the oldest queued task to running for this worker; returns its parameters"""
+        db = self.session_factory()
+        try:
+            # Another worker may claim the same row first: then try the next one
+            for _ in range(5):
+                task = db.query(ScrapeTask).filter(ScrapeTask.state == QUEUED).order_by(ScrapeTask.id).first()
+                if task is None:
+                    return None
+
+                now = datetime.utcnow()
+                claimed = db.query(ScrapeTask).filter(
+                    ScrapeTask.id == task.id, ScrapeTask.state == QUEUED
+                ).update({
+                    'state': RUNNING, 'worker': name, 'attempts': ScrapeTask.attempts + 1,
+                    'started_at': now, 'updated_at': now, 'error': None
+                }, synchronize_session=False)
+                db.commit()
+                if claimed:
+                    return {
+                        'id': task.id,
+                        'query': task.query,
+                        'location': task.location,
+                        'num_pages': task.num_pages,
+                        'sources': json.loads(task.sources),
+                        'enrich_details': bool(task.enrich_details),
+                        'incremental': bool(task.incremental)
+                    }
+                db.expire_all()
+            return None
+        finally:
+            db.close()
+
+    def _run_task(self, task: Dict):
+        """Run a claimed task and record its outcome"""
+        task_id = task['id']
+        params = {name: value for name, value in task.items() if name != 'id'}
+        logger.info(f"Running scrape task {task_id}: {params}")
+        try:
+            result = self.run(params, _ProgressReporter(self, task_id))
+        except Exception as e:
+            logger.error(f"Scrape task {task_id} failed: {e}")
+            self._update(task_id, {'state': FAILED, 'error': str(e), 'finished_at': datetime.utcnow()})
+            return
+
+        values = self.progress_values(result)
+        errors = result.get('errors', 0)
+        failed_items = result.get('failed_items', 0)
+        state = SUCCEEDED
+        if errors:
+            # Nothing written while items were dropped: the scrape as a whole failed
+            written = values['jobs_saved'] + values['jobs_updated']
+            state = FAILED if failed_items and not written else PARTIAL
+            values['error'] = f"{errors} pipeline errors, {failed_items} items dropped"
+        values.update({
+            'state': state,
+            'errors': errors,
+            'failed_items': failed_items,
+            'stages': json.dumps(result.get('stages', {})),
+            'coalesced': result.get('coalesced'),
+            'finished_at': datetime.utcnow()
+        })
+        self._update(task_id, values)
+        logger.info(f"Scrape task {task_id} {state}: {values['jobs_saved']} jobs saved, {errors} errors")
+
+    def _update(self, task_id: int, values: Dict):
+        """Write task columns with a short-lived session"""
+        db = self.session_factory()
+        try:
+            db.query(ScrapeTask).filter(ScrapeTask.id == task_id).update(values, synchronize_session=False)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
@@ -0,0 +1,169 @@
+import re
+from typing import List, Tuple
+import logging
+
+from sqlalchemy import Column, Integer, MetaData, Table, false, func, literal, literal_column, or_, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Query
+
+from app.models.models import Job
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_TERM_PATTERN = re.compile(r'\w+')
+
+SNIPPET_START = '<b>'
+SNIPPET_END = '</b>'
+
+# External-content FTS5 table over jobs, kept in sync by triggers so every
+# write path (ingest, manual create, soft delete, updates) is covered
+SQLITE_SETUP = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+        title, company, description,
+        content='jobs', content_rowid='id', tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS jobs_fts_insert AFTER INSERT ON jobs BEGIN
+        INSERT INTO jobs_fts(rowid, title, company, description)
+        VALUES (new.id, new.title, new.company, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS jobs_fts_delete AFTER DELETE ON jobs BEGIN
+        INSERT INTO jobs_fts(jobs_fts, rowid, title, company, description)
+        VALUES ('delete', old.id, old.title, old.company, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS jobs_fts_update AFTER UPDATE OF title, company, description ON jobs BEGIN
+        INSERT INTO jobs_fts(jobs_fts, rowid, title, company, description)
+        VALUES ('delete', old.id, old.title, old.company, old.description);
+        INSERT INTO jobs_fts(rowid, title, company, description)
+        VALUES (new.id, new.title, new.company, new.description);
+    END
+    """
+]
+
+# Lightweight handle for joins; kept out of Base.metadata so create_all skips it
+jobs_fts = Table('jobs_fts', MetaData(), Column('rowid', Integer, primary_key=True))
+
+# Weighted document; the expression index must use exactly this expression
+PG_DOCUMENT = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(company, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'C')"
+)
+PG_SETUP = [f"CREATE INDEX IF NOT EXISTS ix_jobs_search ON jobs USING GIN (({PG_DOCUMENT}))"]
+
+
+def search_terms(q: str) -> List[str]:
+    """Split a free-text query into lowercased word terms"""
+    return _TERM_PATTERN.findall((q or '').lower())
+
+
+class JobSearchIndex:
+    """
+    Keyword search over job title, company and description
+
+    On SQLite this is an FTS5 table ranked with BM25; on PostgreSQL a GIN
+    expression index over a weighted tsvector ranked with ts_rank_cd. Other
+    databases (or SQLite builds without FTS5) fall back to a LIKE scan.
+    All terms must match; title hits weigh more than company hits, which
+    weigh more than description hits.
+    """
+
+    def __init__(self):
+        self.backend = 'like'
+
+    def setup(self, engine: Engine):
+        """Create the search table/index and triggers for the engine's database"""
+        dialect = engine.dialect.name
+        try:
+            if dialect == 'sqlite':
+                self._setup_sqlite(engine)
+                self.backend = 'fts5'
+            elif dialect == 'postgresql':
+                with engine.begin() as conn:
+                    for statement in PG_SETUP:
+                        conn.execute(text(statement))
+                self.backend = 'tsvector'
+        except OperationalError as e:
+            logger.warning(f"Full-text search unavailable, using LIKE fallback: {e}")
+            self.backend = 'like'
+
+        logger.info(f"Job search backend: {self.backend}")
+
+    def _setup_sqlite(self, engine: Engine):
+        """Create the FTS5 table and triggers, indexing existing jobs on first run"""
+        with engine.begin() as conn:
+            exists = conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'jobs_fts'")
+            ).first()
+            for statement in SQLITE_SETUP:
+                conn.execute(text(statement))
+            if not exists:
+                conn.execute(text("INSERT INTO jobs_fts(jobs_fts) VALUES ('rebuild')"))
+                logger.info("Built full-text index for existing jobs")
+
+    def search(self, query: Query, q: str) -> Tuple[Query, object, object]:
+        """
+        Restrict a Job query to postings matching q
+
+        Args:
+            query: Query selecting Job (optionally with extra columns)
+            q: Free-text search, all terms must match
+
+        Returns:
+            (filtered query, relevance column where higher is better,
+            snippet column highlighting the matches in the description)
+        """
+        terms = search_terms(q)
+        if not terms:
+            return query.filter(false()), literal(0.0), literal(None)
+
+        if self.backend == 'fts5':
+            return self._search_fts5(query, terms)
+        if self.backend == 'tsvector':
+            return self._search_tsvector(query, terms)
+        return self._search_like(query, terms)
+
+    def _search_fts5(self, query: Query, terms: List[str]):
+        """FTS5 MATCH with BM25 ranking and snippet()"""
+        fts = literal_column('jobs_fts')
+        # Quote every term so user input never hits FTS5 query syntax
+        match = ' '.join(f'"{term}"' for term in terms)
+
+        query = query.join(jobs_fts, jobs_fts.c.rowid == Job.id).filter(fts.op('MATCH')(match))
+
+        # bm25() is lower-is-better; column weights: title, company, description
+        rank = -func.bm25(fts, 10.0, 5.0, 1.0)
+        snippet = func.snippet(fts, 2, SNIPPET_START, SNIPPET_END, '...', 24)
+        return query, rank, snippet
+
+    def _search_tsvector(self, query: Query, terms: List[str]):
+        """tsvector @@ tsquery against the GIN expression index"""
+        tsquery = func.plainto_tsquery(literal_column("'english'"), ' '.join(terms))
+        query = query.filter(literal_column(PG_DOCUMENT).op('@@')(tsquery))
+
+        rank = func.ts_rank_cd(literal_column(PG_DOCUMENT), tsquery)
+        snippet = func.ts_headline(
+            literal_column("'english'"), func.coalesce(Job.description, ''), tsquery,
+            f'StartSel={SNIPPET_START}, StopSel={SNIPPET_END}, MaxWords=24, MinWords=8'
+        )
+        return query, rank, snippet
+
+    def _search_like(self, query: Query, terms: List[str]):
+        """Unindexed fallback: every term must appear in one of the fields"""
+        for term in terms:
+            pattern = f"%{term}%"
+            query = query.filter(or_(
+                Job.title.ilike(pattern), Job.company.ilike(pattern), Job.description.ilike(pattern)
+            ))
+        return query, literal(0.0), literal(None)
+
+
+job_search = JobSearchIndex()
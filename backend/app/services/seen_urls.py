@@ -0,0 +1,113 @@
+import hashlib
+import math
+import threading
+import time
+from typing import Iterable, Optional
+import logging
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.models import Job, JobDuplicate
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """
+    Fixed-size set membership filter with no false negatives
+
+    Sized for an expected number of items and false positive rate; the k
+    bit positions of an item come from two 64-bit halves of one blake2b
+    digest (double hashing).
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        self.capacity = max(capacity, 1)
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / self.capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, item: str):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class SeenUrlFilter:
+    """
+    In-memory filter of job URLs already stored (as jobs or duplicates)
+
+    Incremental scrapes use it to stop paginating once a results page holds
+    nothing new. A "seen" answer may be a false positive and a URL stored by
+    another process since the last rebuild reads as new, so the exact check
+    before saving stays authoritative; the filter only decides how far to
+    crawl. It is rebuilt from the database once older than max_age, or when
+    it has outgrown its capacity.
+    """
+
+    def __init__(self, capacity: int = 1_000_000, error_rate: float = 0.001, max_age: float = 600):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.max_age = max_age
+
+        self._filter: Optional[BloomFilter] = None
+        self._built_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def ensure_fresh(self, db: Session):
+        """Rebuild the filter from stored URLs if missing, stale or over capacity"""
+        with self._lock:
+            current = self._filter
+            if (current is not None and time.monotonic() - self._built_at < self.max_age
+                    and current.count <= current.capacity):
+                return
+
+            stored = db.query(Job.job_url).count() + db.query(JobDuplicate.job_url).count()
+            # Leave room to grow before the next rebuild
+            bloom = BloomFilter(max(self.capacity, stored * 2), self.error_rate)
+            for model in (Job, JobDuplicate):
+                for (url,) in db.query(model.job_url).filter(model.job_url != None).yield_per(5000):
+                    bloom.add(url)
+
+            self._filter = bloom
+            self._built_at = time.monotonic()
+            logger.info(f"Seen-URL filter built: {bloom.count} URLs, {len(bloom.bits) // 1024} KiB")
+
+    def add_many(self, urls: Iterable[str]):
+        """Record newly stored URLs (ignored until the filter has been built)"""
+        bloom = self._filter
+        if bloom is None:
+            return
+        for url in urls:
+            if url:
+                bloom.add(url)
+
+    def might_contain(self, url: str) -> bool:
+        """True if the URL was probably stored already, False if it certainly was not"""
+        bloom = self._filter
+        return bloom is not None and url in bloom
+
+    def invalidate(self):
+        """Force a rebuild on the next ensure_fresh call"""
+        self._built_at = None
+        self._filter = None
+
+
+seen_urls = SeenUrlFilter(
+    capacity=settings.SEEN_FILTER_CAPACITY,
+    error_rate=settings.SEEN_FILTER_ERROR_RATE,
+    max_age=settings.SEEN_FILTER_MAX_AGE
+)
@@ -0,0 +1,448 @@
+import json
+import os
+import threading
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+import logging
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import normalize
+
+from app.core.config import settings
+from app.models.models import Job
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+INDEX_FORMAT_VERSION = 1
+
+
+def job_text(title: Optional[str], description: Optional[str]) -> str:
+    """Text that represents a job in the similarity index"""
+    return f"{title or ''} {description or ''}"
+
+
+def top_k_similarity(matrix: sparse.spmatrix, k: int, threshold: float = 0.0,
+                     block_size: int = 512) -> sparse.csr_matrix:
+    """
+    All-pairs cosine similarity that keeps only the top-k neighbours per row
+
+    The similarity matrix is computed tile by tile on the sparse rows, and
+    each tile is merged into a running (rows x k) best list, so peak memory
+    is bounded by block_size^2 plus the k entries kept per row instead of a
+    dense N x N matrix.
+
+    Args:
+        matrix: Sparse matrix with one L2-normalized row per document
+        k: Neighbours to keep per row
+        threshold: Minimum similarity for a pair to be kept
+        block_size: Rows and columns per tile
+
+    Returns:
+        N x N CSR matrix with at most k entries per row; the diagonal is excluded
+    """
+    matrix = sparse.csr_matrix(matrix, dtype=np.float32)
+    num_rows = matrix.shape[0]
+    k = max(0, min(k, num_rows - 1))
+    if k == 0:
+        return sparse.csr_matrix((num_rows, num_rows), dtype=np.float32)
+
+    indptr = [0]
+    indices = []
+    data = []
+
+    for row_start in range(0, num_rows, block_size):
+        row_end = min(row_start + block_size, num_rows)
+        rows = matrix[row_start:row_end]
+
+        best_scores = np.full((row_end - row_start, k), -np.inf, dtype=np.float32)
+        best_columns = np.full((row_end - row_start, k), -1, dtype=np.int64)
+
+        for col_start in range(0, num_rows, block_size):
+            col_end = min(col_start + block_size, num_rows)
+            tile = (rows @ matrix[col_start:col_end].T).toarray()
+
+            # Never pair a document with itself
+            overlap_start, overlap_end = max(row_start, col_start), min(row_end, col_end)
+            if overlap_start < overlap_end:
+                diagonal = np.arange(overlap_start, overlap_end)
+                tile[diagonal - row_start, diagonal - col_start] = -np.inf
+
+            tile_columns = np.broadcast_to(np.arange(col_start, col_end), tile.shape)
+            scores = np.concatenate([best_scores, tile], axis=1)
+            columns = np.concatenate([best_columns, tile_columns], axis=1)
+
+            if scores.shape[1] > k:
+                keep = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+                best_scores = np.take_along_axis(scores, keep, axis=1)
+                best_columns = np.take_along_axis(columns, keep, axis=1)
+
+        order = np.argsort(-best_scores, axis=1)
+        best_scores = np.take_along_axis(best_scores, order, axis=1)
+        best_columns = np.take_along_axis(best_columns, order, axis=1)
+
+        for row_scores, row_columns in zip(best_scores, best_columns):
+            keep = (row_scores >= threshold) & (row_scores > 0)
+            indices.extend(row_columns[keep].tolist())
+            data.extend(row_scores[keep].tolist())
+            indptr.append(len(indices))
+
+    return sparse.csr_matrix(
+        (np.asarray(data, dtype=np.float32), np.asarray(indices, dtype=np.int64), np.asarray(indptr)),
+        shape=(num_rows, num_rows)
+    )
+
+
+class JobSimilarityIndex:
+    """
+    Persistent, incrementally updated TF-IDF index over active jobs
+
+    Raw term counts are kept as a sparse matrix with one row per job plus a
+    growing vocabulary and per-term document frequencies, so new jobs are
+    appended without refitting. The normalized TF-IDF matrix is kept up
+    to date incrementally: rows of new jobs are weighted on the next query
+    and removed jobs are zeroed in place. Only once more than
+    rebuild_ratio of the jobs changed is it rebuilt in one vectorized
+    pass, so every row is weighted with current document frequencies
+    again. Rows of removed jobs are dropped once they make up more than
+    compact_ratio of the matrix. On disk the index is a sparse .npz
+    matrix, the document frequency array and a JSON file with the
+    vocabulary and row mapping.
+
+    Only API processes keep an index: jobs saved by standalone scrape
+    workers reach it through ensure_fresh(), which syncs with the jobs
+    table every sync_interval seconds and whenever a job is missing.
+    Processes that call disable() neither maintain nor save one, so they
+    never overwrite the files of the API process.
+    """
+
+    def __init__(self, index_dir: str, save_every: int = 500, sync_interval: float = 60,
+                 rebuild_ratio: float = 0.1, compact_ratio: float = 0.25):
+        self.index_dir = index_dir
+        self.save_every = save_every
+        self.sync_interval = sync_interval
+        self.rebuild_ratio = rebuild_ratio
+        self.compact_ratio = compact_ratio
+        self.enabled = True
+        self._unsaved_changes = 0
+        self._synced_at: Optional[float] = None
+        self._analyzer = TfidfVectorizer(stop_words='english').build_analyzer()
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self):
+        """Start from an empty index"""
+        self.vocabulary: Dict[str, int] = {}
+        self.terms: List[str] = []
+        self.job_ids: List[int] = []
+        self.row_of: Dict[int, int] = {}
+        self.active = np.zeros(0, dtype=bool)
+        self.doc_freq = np.zeros(0, dtype=np.int64)
+        self._counts = sparse.csr_matrix((0, 0), dtype=np.float32)
+        self._pending: List[sparse.csr_matrix] = []
+        self._weights: Optional[sparse.csr_matrix] = None
+        self._changes_since_rebuild = 0
+
+    def __len__(self) -> int:
+        return int(self.active.sum())
+
+    def add_jobs(self, jobs: Iterable[Tuple[int, str]]):
+        """
+        Add or replace jobs in the index
+
+        Args:
+            jobs: (job_id, text) pairs, see job_text()
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            data, indices, indptr = [], [], [0]
+            new_ids = []
+
+            # Last text wins if a job id is repeated
+            for job_id, text in dict(jobs).items():
+                if job_id in self.row_of:
+                    self._remove(job_id)
+
+                term_counts = Counter(self._analyzer(text or ""))
+                for term, count in term_counts.items():
+                    column = self.vocabulary.get(term)
+                    if column is None:
+                        column = len(self.terms)
+                        self.vocabulary[term] = column
+                        self.terms.append(term)
+                    indices.append(column)
+                    data.append(count)
+                indptr.append(len(indices))
+                new_ids.append(job_id)
+
+            if not new_ids:
+                return
+
+            block = sparse.csr_matrix(
+                (np.asarray(data, dtype=np.float32), np.asarray(indices, dtype=np.int32), np.asarray(indptr)),
+                shape=(len(new_ids), len(self.terms))
+            )
+
+            start = len(self.job_ids)
+            for offset, job_id in enumerate(new_ids):
+                self.row_of[job_id] = start + offset
+            self.job_ids.extend(new_ids)
+            self.active = np.concatenate([self.active, np.ones(len(new_ids), dtype=bool)])
+
+            if len(self.doc_freq) < len(self.terms):
+                self.doc_freq = np.pad(self.doc_freq, (0, len(self.terms) - len(self.doc_freq)))
+            np.add.at(self.doc_freq, block.indices, 1)
+
+            self._pending.append(block)
+            self._changes_since_rebuild += len(new_ids)
+            self._unsaved_changes += len(new_ids)
+
+    def remove_job(self, job_id: int):
+        """Drop a job (e.g. after a soft delete) from search results"""
+        if not self.enabled:
+            return
+        with self._lock:
+            if job_id in self.row_of:
+                self._remove(job_id)
+
+    def _remove(self, job_id: int):
+        """Deactivate a job's row and take its terms out of the document frequencies"""
+        # Consolidating may compact the rows, so look the row up afterwards
+        self._consolidate()
+        row = self.row_of.pop(job_id)
+        self.active[row] = False
+        columns = self._counts.indices[self._counts.indptr[row]:self._counts.indptr[row + 1]]
+        self.doc_freq[columns] -= 1
+
+        weights = self._weights
+        if weights is not None and row < weights.shape[0]:
+            # Zeroed in place so the row never scores, without a rebuild
+            weights.data[weights.indptr[row]:weights.indptr[row + 1]] = 0
+        self._changes_since_rebuild += 1
+        self._unsaved_changes += 1
+
+    def _consolidate(self):
+        """Merge pending row blocks into the counts matrix and compact removed rows"""
+        if self._pending:
+            width = len(self.terms)
+            blocks = [self._counts] + self._pending
+            for block in blocks:
+                block.resize((block.shape[0], width))
+            self._counts = sparse.vstack(blocks, format='csr')
+            self._pending = []
+
+        inactive = len(self.job_ids) - len(self)
+        if inactive and inactive > self.compact_ratio * len(self.job_ids):
+            self._compact()
+
+    def _compact(self):
+        """Drop the rows of removed jobs (pending blocks must be merged first)"""
+        keep = np.flatnonzero(self.active)
+        self._counts = self._counts[keep]
+        if self._weights is not None:
+            # Rows not weighted yet come after the weighted ones, so the kept prefix still lines up
+            self._weights = self._weights[keep[keep < self._weights.shape[0]]]
+        logger.info(f"Compacted similarity index: dropped {len(self.job_ids) - len(keep)} removed jobs")
+
+        self.job_ids = [self.job_ids[row] for row in keep]
+        self.active = np.ones(len(keep), dtype=bool)
+        self.row_of = {job_id: row for row, job_id in enumerate(self.job_ids)}
+
+    def _weigh(self, counts: sparse.csr_matrix, active: np.ndarray) -> sparse.csr_matrix:
+        """L2-normalized TF-IDF rows for count rows, with the current document frequencies"""
+        num_docs = int(self.active.sum())
+        idf = np.log((1 + num_docs) / (1 + self.doc_freq)) + 1
+
+        weights = counts.copy()
+        weights.data = 1 + np.log(weights.data)  # sublinear tf
+        weights = weights.multiply(idf.astype(np.float32)).tocsr()
+        # Inactive rows become all-zero so they never score
+        weights = sparse.diags(active.astype(np.float32)) @ weights
+        return normalize(weights, norm='l2', copy=False).tocsr()
+
+    def _get_weights(self) -> sparse.csr_matrix:
+        """Return the L2-normalized TF-IDF matrix, weighting new rows or rebuilding it as needed"""
+        self._consolidate()
+        weights = self._weights
+        if weights is None or self._changes_since_rebuild > self.rebuild_ratio * len(self):
+            weights = self._weigh(self._counts, self.active)
+            self._changes_since_rebuild = 0
+        elif weights.shape[0] < self._counts.shape[0]:
+            start = weights.shape[0]
+            weights.resize((start, len(self.terms)))
+            weights = sparse.vstack(
+                [weights, self._weigh(self._counts[start:], self.active[start:])], format='csr'
+            )
+        self._weights = weights
+        return weights
+
+    def similar(self, job_id: int, k: int = 10) -> List[Tuple[int, float]]:
+        """
+        Find the k most similar active jobs
+
+        Args:
+            job_id: Job to find neighbours for
+            k: Number of neighbours to return
+
+        Returns:
+            List of (job_id, cosine similarity) pairs, best first
+        """
+        with self._lock:
+            if job_id not in self.row_of or k <= 0:
+                return []
+
+            weights = self._get_weights()
+            # Looked up after _get_weights, which may compact the rows
+            row = self.row_of[job_id]
+            scores = (weights @ weights[row].T).toarray().ravel()
+            scores[row] = 0.0
+
+            k = min(k, len(scores))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+
+            return [(self.job_ids[i], round(float(scores[i]), 4)) for i in top if scores[i] > 0]
+
+    def save(self):
+        """Write the index to index_dir, replacing any previous copy"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._consolidate()
+            os.makedirs(self.index_dir, exist_ok=True)
+
+            counts_path = os.path.join(self.index_dir, 'counts.npz')
+            doc_freq_path = os.path.join(self.index_dir, 'doc_freq.npy')
+            meta_path = os.path.join(self.index_dir, 'meta.json')
+
+            sparse.save_npz(counts_path + '.tmp.npz', self._counts, compressed=False)
+            np.save(doc_freq_path + '.tmp.npy', self.doc_freq)
+            with open(meta_path + '.tmp', 'w') as f:
+                json.dump({
+                    'version': INDEX_FORMAT_VERSION,
+                    'terms': self.terms,
+                    'job_ids': self.job_ids,
+                    'active': np.flatnonzero(self.active).tolist()
+                }, f)
+
+            os.replace(counts_path + '.tmp.npz', counts_path)
+            os.replace(doc_freq_path + '.tmp.npy', doc_freq_path)
+            os.replace(meta_path + '.tmp', meta_path)
+            self._unsaved_changes = 0
+
+    def maybe_save(self):
+        """Persist the index once enough changes have accumulated since the last save"""
+        if self._unsaved_changes >= self.save_every:
+            self.save()
+
+    def load(self) -> bool:
+        """
+        Load the index from index_dir
+
+        Returns:
+            True if an index was loaded, False if none was found or it was unreadable
+        """
+        meta_path = os.path.join(self.index_dir, 'meta.json')
+        if not os.path.exists(meta_path):
+            return False
+
+        with self._lock:
+            try:
+                with open(meta_path) as f:
+                    meta = json.load(f)
+                if meta.get('version') != INDEX_FORMAT_VERSION:
+                    logger.warning("Similarity index format changed, rebuilding")
+                    return False
+
+                counts = sparse.load_npz(os.path.join(self.index_dir, 'counts.npz')).tocsr()
+                doc_freq = np.load(os.path.join(self.index_dir, 'doc_freq.npy'))
+            except Exception as e:
+                logger.error(f"Error loading similarity index: {e}")
+                self._reset()
+                return False
+
+            self._reset()
+            self.terms = meta['terms']
+            self.vocabulary = {term: column for column, term in enumerate(self.terms)}
+            self.job_ids = meta['job_ids']
+            self.active = np.zeros(len(self.job_ids), dtype=bool)
+            self.active[meta['active']] = True
+            self.row_of = {self.job_ids[row]: row for row in meta['active']}
+            self.doc_freq = doc_freq
+            self._counts = counts
+
+        logger.info(f"Loaded similarity index with {len(self)} jobs")
+        return True
+
+    def disable(self):
+        """Stop maintaining and saving the index in this process (e.g. a standalone worker)"""
+        with self._lock:
+            self.enabled = False
+            self._reset()
+
+    def ensure_fresh(self, db, job_id: Optional[int] = None):
+        """
+        Sync with the jobs table if the last sync is older than sync_interval
+        or job_id is not indexed yet (e.g. saved by another process)
+
+        Args:
+            db: Database session
+            job_id: Job about to be queried
+        """
+        if not self.enabled:
+            return
+        missing = job_id is not None and job_id not in self.row_of
+        if (not missing and self._synced_at is not None
+                and time.monotonic() - self._synced_at < self.sync_interval):
+            return
+        self.sync(db)
+
+    def sync(self, db):
+        """
+        Bring the index in line with the active rows of the jobs table
+
+        Args:
+            db: Database session
+        """
+        if not self.enabled:
+            return
+        self._synced_at = time.monotonic()
+        active_ids = {job_id for (job_id,) in db.query(Job.id).filter(Job.is_active == True).all()}
+
+        with self._lock:
+            indexed_ids = set(self.row_of)
+            for job_id in indexed_ids - active_ids:
+                self.remove_job(job_id)
+
+            missing_ids = list(active_ids - indexed_ids)
+
+        # Fetch missing jobs in chunks to keep the IN lists small
+        for i in range(0, len(missing_ids), 500):
+            rows = db.query(Job.id, Job.title, Job.description).filter(
+                Job.id.in_(missing_ids[i:i + 500])
+            ).all()
+            self.add_jobs((job_id, job_text(title, description)) for job_id, title, description in rows)
+
+        if missing_ids or len(indexed_ids - active_ids):
+            logger.info(f"Similarity index synced: {len(missing_ids)} added, {len(indexed_ids - active_ids)} removed")
+            self.save()
+
+    def load_or_build(self, session_factory):
+        """Load the on-disk index and catch it up with the database"""
+        self.load()
+        db = session_factory()
+        try:
+            self.sync(db)
+        finally:
+            db.close()
+
+
+similarity_index = JobSimilarityIndex(
+    settings.SIMILARITY_INDEX_DIR,
+    save_every=settings.SIMILARITY_INDEX_SAVE_EVERY,
+    sync_interval=settings.SIMILARITY_INDEX_SYNC_INTERVAL
+)
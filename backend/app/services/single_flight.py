@@ -0,0 +1,136 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+import logging
+
+from app.core.config import settings
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# How a call was answered
+RAN = 'ran'  # this caller did the work
+IN_FLIGHT = 'in_flight'  # joined an identical call already running
+RECENT = 'recent'  # served the result of an identical call that just finished
+
+
+class _Flight:
+    """One running call and its outcome"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+        self.finished_at = 0.0
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesce identical calls made from many threads
+
+    The first caller for a key runs the function; callers arriving with
+    the same key while it runs wait for it and get the same result (or
+    exception). A successful result keeps answering the key for ttl
+    seconds after it finished. Failures are never reused, so the next call
+    after one runs again.
+    """
+
+    def __init__(self, ttl: float = 60, name: str = "single-flight"):
+        self.ttl = ttl
+        self.name = name
+
+        self._lock = threading.Lock()
+        self._running: Dict[Hashable, _Flight] = {}
+        self._recent: Dict[Hashable, _Flight] = {}
+
+        self.ran = 0
+        self.joined = 0
+        self.reused = 0
+
+    def _expire(self, now: float):
+        """Drop results older than ttl (call with the lock held)"""
+        for key in [key for key, flight in self._recent.items() if now - flight.finished_at >= self.ttl]:
+            del self._recent[key]
+
+    def peek(self, key: Hashable) -> Tuple[Optional[str], Any]:
+        """
+        Tell how a call for key would be answered, without making it
+
+        Returns:
+            (IN_FLIGHT, None), (RECENT, result) or (None, None) if it would run
+        """
+        with self._lock:
+            self._expire(time.monotonic())
+            if key in self._running:
+                return IN_FLIGHT, None
+            if key in self._recent:
+                return RECENT, self._recent[key].result
+        return None, None
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, str]:
+        """
+        Run fn once for all concurrent callers with the same key
+
+        Args:
+            key: Identifies calls that are interchangeable
+            fn: Does the work; called on the first caller's thread
+
+        Returns:
+            (result, how) where how is RAN, IN_FLIGHT or RECENT
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._expire(now)
+
+            recent = self._recent.get(key)
+            if recent is not None:
+                self.reused += 1
+                return recent.result, RECENT
+
+            flight = self._running.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._running[key] = _Flight()
+                self.ran += 1
+            else:
+                flight.waiters += 1
+                self.joined += 1
+
+        if not leader:
+            logger.info(f"{self.name}: joining the running call for {key}")
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result, IN_FLIGHT
+
+        try:
+            flight.result = fn()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            flight.finished_at = time.monotonic()
+            with self._lock:
+                del self._running[key]
+                if flight.error is None and self.ttl > 0:
+                    self._recent[key] = flight
+            flight.done.set()
+
+        return flight.result, RAN
+
+    def stats(self) -> Dict:
+        with self._lock:
+            self._expire(time.monotonic())
+            return {
+                'ttl': self.ttl,
+                'running': len(self._running),
+                'waiting': sum(flight.waiters for flight in self._running.values()),
+                'recent': len(self._recent),
+                'ran': self.ran,
+                'joined': self.joined,
+                'reused': self.reused
+            }
+
+
+scrape_flights = SingleFlight(ttl=settings.SCRAPE_COALESCE_TTL, name="scrape")
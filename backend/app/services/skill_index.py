@@ -0,0 +1,104 @@
+from typing import List, Tuple
+import logging
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.models import Job, JobSkill
+from app.services.match_engine import parse_skill_list
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def normalize_skills(skills: List[str]) -> List[str]:
+    """Distinct, lower-cased skill names as stored in the index"""
+    return sorted({s.strip().lower() for s in skills if s.strip()})
+
+
+def index_job_skills(job: Job, skills: List[str]):
+    """
+    Attach normalized skill rows to a job (new or existing)
+
+    Args:
+        job: Job row; works before it is flushed
+        skills: Skills extracted for the job
+    """
+    job.skills = [JobSkill(skill=skill) for skill in normalize_skills(skills)]
+
+
+def remove_job_skills(db: Session, job_id: int):
+    """Drop a job's postings, e.g. after a soft delete"""
+    db.query(JobSkill).filter(JobSkill.job_id == job_id).delete(synchronize_session=False)
+
+
+def search_jobs_by_skills(db: Session, skills: List[str], match_all: bool = False,
+                          skip: int = 0, limit: int = 20) -> List[Tuple[Job, int]]:
+    """
+    Find active jobs requiring any (or all) of the given skills
+
+    Answers from the job_skills index with one grouped query, ranking jobs
+    by how many of the requested skills they require.
+
+    Args:
+        db: Database session
+        skills: Skills to search for
+        match_all: Only return jobs that require every skill
+        skip: Number of results to skip
+        limit: Number of results to return
+
+    Returns:
+        List of (job, number of matched skills), best first
+    """
+    skills = sorted({s.strip().lower() for s in skills if s.strip()})
+    if not skills:
+        return []
+
+    matched = func.count(JobSkill.skill).label('matched')
+    query = db.query(JobSkill.job_id, matched).join(
+        Job, Job.id == JobSkill.job_id
+    ).filter(
+        JobSkill.skill.in_(skills),
+        Job.is_active == True
+    ).group_by(JobSkill.job_id)
+
+    if match_all:
+        query = query.having(matched == len(skills))
+
+    page = query.order_by(matched.desc(), JobSkill.job_id.desc()).offset(skip).limit(limit).all()
+    if not page:
+        return []
+
+    jobs_by_id = {job.id: job for job in db.query(Job).filter(Job.id.in_([job_id for job_id, _ in page])).all()}
+    return [(jobs_by_id[job_id], count) for job_id, count in page if job_id in jobs_by_id]
+
+
+def backfill_job_skills(db: Session, batch_size: int = 500) -> int:
+    """
+    Index skills of active jobs stored before the job_skills table existed
+
+    Returns:
+        Number of jobs indexed
+    """
+    indexed = 0
+    last_id = 0
+    while True:
+        jobs = db.query(Job).outerjoin(JobSkill, JobSkill.job_id == Job.id).filter(
+            Job.is_active == True,
+            Job.required_skills != None,
+            Job.required_skills != '[]',
+            JobSkill.id == None,
+            Job.id > last_id
+        ).order_by(Job.id).limit(batch_size).all()
+        if not jobs:
+            break
+
+        for job in jobs:
+            index_job_skills(job, parse_skill_list(job.required_skills))
+        db.commit()
+        indexed += len(jobs)
+        last_id = jobs[-1].id
+
+    if indexed:
+        logger.info(f"Indexed skills for {indexed} existing jobs")
+    return indexed
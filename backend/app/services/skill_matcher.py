@@ -0,0 +1,95 @@
+from collections import deque
+from typing import Dict, Iterable, List, Set, Tuple
+
+
+def _is_word_char(ch: str) -> bool:
+    """Mirror the definition of a word character used by re's \\b on str patterns"""
+    return ch.isalnum() or ch == '_'
+
+
+class SkillMatcher:
+    """
+    Aho-Corasick automaton that finds every dictionary skill in one pass
+
+    Matches are accepted with the same word-boundary rules as
+    ``re.search(r'\\b' + re.escape(skill) + r'\\b', text)``, so tokens such as
+    ``c++``, ``c#`` and ``ci/cd`` behave exactly like the per-skill regexes
+    they replace. Scanning cost depends on the text length and the number of
+    hits, not on the size of the dictionary.
+    """
+
+    def __init__(self, skills: Iterable[str]):
+        # Keep the caller's iteration order so results come back in the
+        # same order the per-skill loop produced them
+        self.skills: List[str] = list(dict.fromkeys(skills))
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[int, int]]] = [[]]
+        self._build()
+
+    def _build(self):
+        """Build the trie, failure links and merged output lists"""
+        for index, skill in enumerate(self.skills):
+            if not skill:
+                continue
+            state = 0
+            for ch in skill:
+                next_state = self._goto[state].get(ch)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][ch] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                state = next_state
+            self._output[state].append((index, len(skill)))
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(ch, 0) if state else 0
+                self._output[next_state].extend(self._output[self._fail[next_state]])
+
+    def find(self, text_lower: str) -> List[str]:
+        """
+        Find all skills that occur as whole words in already-lowercased text
+
+        Args:
+            text_lower: Lowercased text to scan
+
+        Returns:
+            List of matched skills in dictionary order
+        """
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        text_len = len(text_lower)
+
+        found: Set[int] = set()
+        state = 0
+
+        for pos, ch in enumerate(text_lower):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+
+            for index, length in output[state]:
+                if index in found:
+                    continue
+                start = pos - length + 1
+                # \b before the match
+                before = _is_word_char(text_lower[start - 1]) if start > 0 else False
+                if before == _is_word_char(text_lower[start]):
+                    continue
+                # \b after the match
+                after = _is_word_char(text_lower[pos + 1]) if pos + 1 < text_len else False
+                if after == _is_word_char(ch):
+                    continue
+                found.add(index)
+
+        return [self.skills[index] for index in sorted(found)]
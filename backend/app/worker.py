@@ -0,0 +1,61 @@
+"""
+Standalone scrape worker process
+
+Runs the tasks queued through POST /api/scraper/scrape outside the API
+processes, which can then be started with SCRAPE_WORKERS=0 so heavy
+crawls never compete with request handling:
+
+    python -m app.worker --workers 4
+
+Workers claim tasks from the shared scrape_tasks table, so any number of
+these processes can run next to each other and next to API processes.
+"""
+import argparse
+import signal
+import threading
+import logging
+
+from app.core.config import settings
+from app.core.database import engine
+from app.models.models import Base
+from app.api import scraper
+from app.services.match_scores import match_score_updater
+from app.services.similarity_index import similarity_index
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run queued scrape tasks")
+    parser.add_argument("--workers", type=int, default=settings.SCRAPE_WORKERS or 2, help="Worker threads")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    # The API processes own the similarity index and sync the jobs saved
+    # here from the database; a copy written from this process would
+    # overwrite theirs
+    similarity_index.disable()
+
+    stopping = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stopping.set())
+    signal.signal(signal.SIGINT, lambda *_: stopping.set())
+
+    worker = scraper.scrape_worker
+    worker.workers = args.workers
+    worker.start()
+    scraper.multi_scraper.start_background_refresh()
+    logger.info(f"Scrape worker running with {args.workers} threads, waiting for tasks")
+    while not stopping.wait(1):
+        pass
+
+    logger.info("Stopping scrape worker")
+    worker.stop()
+    scraper.multi_scraper.stop_background_refresh()
+    scraper.scrape_engine.close()
+    scraper.nlp_analyzer.shutdown()
+    match_score_updater.shutdown()
+
+
+if __name__ == "__main__":
+    main()
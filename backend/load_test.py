@@ -0,0 +1,181 @@
+"""
+Offline load test of the scrape -> analyze -> persist path
+
+Serves recorded fixtures (see app/scrapers/fixtures.py) from a local
+stand-in server, points the scrapers at it and fires scrape requests at
+the API with a fixed concurrency. Nothing touches the real job sites.
+
+Record fixtures once against the live sites with
+    SCRAPE_FIXTURE_MODE=record uvicorn app.main:app
+or generate synthetic ones, then run for example
+    python load_test.py --synthetic --queries "python developer,data engineer" --pages 4 --concurrency 4
+"""
+import argparse
+import math
+import os
+import random
+import socket
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+
+SKILLS = [
+    "python", "django", "fastapi", "postgresql", "aws", "docker", "kubernetes", "react", "typescript",
+    "java", "spring", "golang", "kafka", "redis", "terraform", "sql", "pandas", "machine learning"
+]
+
+
+def synthesize_fixtures(store, queries, pages: int, per_page: int = 25):
+    """Write LinkedIn and Indeed result and detail pages for the queries"""
+    html = {'content-type': 'text/html; charset=utf-8'}
+    rng = random.Random(42)
+    job_id = 0
+
+    def posting(job_id: int):
+        skills = rng.sample(SKILLS, 5)
+        years = rng.randint(1, 8)
+        return (
+            f"<p>About the role</p><p>Requirements:</p><ul>"
+            + "".join(f"<li>Experience with {skill}</li>" for skill in skills)
+            + f"<li>{years}+ years of experience</li></ul><p>Benefits</p><p>Posting {job_id}</p>"
+        )
+
+    for query in queries:
+        for page in range(pages):
+            linkedin_cards, indeed_cards = [], []
+            for _ in range(per_page):
+                job_id += 1
+                title = f"{query.title()} {job_id}"
+                linkedin_url = f"https://www.linkedin.com/jobs/view/{job_id}"
+                linkedin_cards.append(
+                    f'<div class="base-card"><h3 class="base-search-card__title">{title}</h3>'
+                    f'<h4 class="base-search-card__subtitle">Company {job_id}</h4>'
+                    f'<span class="job-search-card__location">Remote</span>'
+                    f'<a class="base-card__full-link" href="{linkedin_url}">view</a></div>'
+                )
+                store.save(linkedin_url, httpx.Response(200, headers=html, content=(
+                    f"<html><body><div class='show-more-less-html__markup'>{posting(job_id)}</div></body></html>"
+                )))
+
+                indeed_cards.append(
+                    f'<div class="job_seen_beacon"><h2 class="jobTitle">{title}</h2>'
+                    f'<span class="companyName">Indeed Company {job_id}</span>'
+                    f'<div class="companyLocation">Remote</div>'
+                    f'<a class="jcs-JobTitle" href="/viewjob?jk={job_id}">view</a>'
+                    f'<div class="job-snippet">{title} working with {", ".join(rng.sample(SKILLS, 3))}</div></div>'
+                )
+                store.save(f"https://www.indeed.com/viewjob?jk={job_id}", httpx.Response(200, headers=html, content=(
+                    f"<html><body><div id='jobDescriptionText'>{posting(job_id)}</div></body></html>"
+                )))
+
+            keywords = query.replace(' ', '%20')
+            store.save(
+                f"https://www.linkedin.com/jobs/search/?keywords={keywords}&location=&start={page * 25}",
+                httpx.Response(200, headers=html, content=f"<html><body>{''.join(linkedin_cards)}</body></html>")
+            )
+            store.save(
+                f"https://www.indeed.com/jobs?q={query.replace(' ', '+')}&l=&start={page * 10}",
+                httpx.Response(200, headers=html, content=f"<html><body>{''.join(indeed_cards)}</body></html>")
+            )
+
+    print(f"Wrote synthetic fixtures for {job_id} postings to {store.directory}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline scrape load test against recorded fixtures")
+    parser.add_argument("--fixtures", default="./data/scrape_fixtures", help="Fixture directory")
+    parser.add_argument("--synthetic", action="store_true", help="Generate synthetic fixtures first")
+    parser.add_argument("--queries", default="python developer", help="Comma separated search queries")
+    parser.add_argument("--pages", type=int, default=2, help="Pages per source")
+    parser.add_argument("--sources", default="linkedin,indeed", help="Comma separated sources")
+    parser.add_argument("--concurrency", type=int, default=2, help="Scrape requests in flight")
+    parser.add_argument("--repeat", type=int, default=1, help="Times each query is scraped")
+    parser.add_argument("--latency", type=float, default=0.1, help="Simulated seconds per upstream response")
+    parser.add_argument("--jitter", type=float, default=0.05, help="+/- seconds of latency variation")
+    parser.add_argument("--delay", type=float, default=0, help="Seconds between requests to one host")
+    parser.add_argument("--enrich", action="store_true", help="Fetch detail pages for full descriptions")
+    parser.add_argument("--database", help="Database URL (default: a fresh temporary SQLite file)")
+    parser.add_argument("--port", type=int, default=0, help="Fixture server port (default: any free port)")
+    args = parser.parse_args()
+
+    port = args.port
+    if not port:
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            port = probe.getsockname()[1]
+
+    # Settings are read when app modules are first imported, so configure first
+    workdir = tempfile.mkdtemp(prefix="load-test-")
+    os.environ["SCRAPE_UPSTREAM_OVERRIDE"] = f"http://127.0.0.1:{port}"
+    os.environ["SCRAPE_FIXTURE_MODE"] = "off"
+    os.environ["SCRAPING_DELAY"] = str(args.delay)
+    os.environ["HTTP_CACHE_ENABLED"] = "false"
+    os.environ["DATABASE_URL"] = args.database or f"sqlite:///{workdir}/load_test.db"
+    os.environ["SIMILARITY_INDEX_DIR"] = f"{workdir}/similarity_index"
+
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.scrapers.async_engine import scrape_engine
+    from app.scrapers.fixtures import FixtureStore
+    from app.scrapers.fixture_server import serve_fixtures
+
+    queries = [query.strip() for query in args.queries.split(",") if query.strip()]
+    store = FixtureStore(args.fixtures, latency=args.latency, jitter=args.jitter)
+    if args.synthetic:
+        synthesize_fixtures(store, queries, args.pages)
+    server = serve_fixtures(store, port=port)
+
+    sources = [source.strip() for source in args.sources.split(",") if source.strip()]
+    runs = [query for _ in range(args.repeat) for query in queries]
+
+    with TestClient(app) as client:
+        def scrape(query: str):
+            started = time.perf_counter()
+            response = client.post("/api/scraper/scrape-sync", json={
+                "query": query, "num_pages": args.pages, "sources": sources, "enrich_details": args.enrich
+            })
+            return time.perf_counter() - started, response
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+            results = list(executor.map(scrape, runs))
+        elapsed = time.perf_counter() - started
+
+        failed = [response for _, response in results if response.status_code != 200]
+        bodies = [response.json() for _, response in results if response.status_code == 200]
+        latencies = sorted(seconds for seconds, _ in results)
+
+        found = sum(body["jobs_found"] for body in bodies)
+        saved = sum(body["jobs_saved"] for body in bodies)
+        updated = sum(body["jobs_updated"] for body in bodies)
+        print(f"\n{len(runs)} scrapes, concurrency {args.concurrency}, {len(failed)} failed, {elapsed:.2f}s")
+        print(
+            f"Jobs found {found}, saved {saved}, updated {updated}: "
+            f"{found / elapsed:.1f} found/s, {saved / elapsed:.1f} saved/s"
+        )
+        print(
+            f"Request latency p50 {statistics.median(latencies):.2f}s, "
+            f"p95 {latencies[max(0, math.ceil(0.95 * len(latencies)) - 1)]:.2f}s, max {latencies[-1]:.2f}s"
+        )
+
+        print("\nStage            items_in  items_out  busy_s  items/s")
+        for name in bodies[0]["stages"] if bodies else []:
+            items_in = sum(body["stages"][name]["items_in"] for body in bodies)
+            items_out = sum(body["stages"][name]["items_out"] for body in bodies)
+            busy = sum(body["stages"][name]["busy_seconds"] for body in bodies)
+            rate = (items_in or items_out) / busy if busy else 0.0
+            print(f"{name:<16} {items_in:>8}  {items_out:>9}  {busy:>6.2f}  {rate:>7.1f}")
+
+        print(f"\nFixtures: {store.stats()}")
+        print(f"Engine: {scrape_engine.stats()['requests']} requests")
+
+    server.shutdown()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
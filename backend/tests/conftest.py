@@ -0,0 +1,12 @@
+import os
+import sys
+import tempfile
+
+# Settings are read at import time: point the app at a scratch database and
+# index directory before any test imports it
+_scratch = tempfile.mkdtemp(prefix="job-automation-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_scratch}/test.db")
+os.environ.setdefault("SIMILARITY_INDEX_DIR", os.path.join(_scratch, "similarity_index"))
+os.environ.setdefault("HTTP_CACHE_ENABLED", "false")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,38 @@
+import pytest
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import sessionmaker
+
+from app.models.models import AnalysisCacheEntry, Base
+from app.services.analysis_cache import AnalysisCache
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/cache.db")
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+def test_keys_stored_concurrently_do_not_drop_the_batch(engine):
+    session_factory = sessionmaker(bind=engine)
+    raced = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def concurrent_writer(conn, cursor, statement, parameters, context, executemany):
+        # Another process stores one of the keys right before our insert
+        if statement.startswith("INSERT INTO analysis_cache") and not raced:
+            raced.append(True)
+            cursor.execute("INSERT INTO analysis_cache (key, version, result) VALUES ('shared', 1, '{\"by\": \"theirs\"}')")
+
+    AnalysisCache(version=1, session_factory=session_factory).set_many(
+        {'shared': {'by': 'ours'}, 'new': {'by': 'ours'}}
+    )
+
+    db = session_factory()
+    try:
+        stored = dict(db.execute(select(AnalysisCacheEntry.key, AnalysisCacheEntry.result)).all())
+    finally:
+        db.close()
+    assert raced
+    assert stored == {'shared': '{"by": "theirs"}', 'new': '{"by": "ours"}'}
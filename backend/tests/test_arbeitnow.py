@@ -0,0 +1,63 @@
+import time
+
+import httpx
+import pytest
+
+from app.scrapers.arbeitnow_scraper import ArbeitnowScraper
+from app.scrapers.async_engine import ScrapeEngine
+from app.scrapers.fixtures import FixtureStore
+
+BOARD_URL = "https://www.arbeitnow.com/api/job-board-api"
+
+
+def board_page(titles, next_url=None):
+    return {
+        'data': [
+            {'slug': title.lower().replace(' ', '-'), 'company_name': "Acme", 'title': title, 'tags': ["Python"],
+             'description': "<p>Python and Django</p>", 'url': f"https://www.arbeitnow.com/jobs/{title}",
+             'location': "Berlin", 'created_at': 1700000000}
+            for title in titles
+        ],
+        'links': {'next': next_url}
+    }
+
+
+@pytest.fixture
+def engine(tmp_path):
+    recorder = FixtureStore(str(tmp_path), mode='record')
+    recorder.save(BOARD_URL, httpx.Response(200, json=board_page(["Python Developer"], f"{BOARD_URL}?page=2")))
+    recorder.save(f"{BOARD_URL}?page=2", httpx.Response(200, json=board_page(["Senior Python Engineer"])))
+
+    engine = ScrapeEngine(delay=0, fixtures=FixtureStore(str(tmp_path)))
+    yield engine
+    engine.close()
+
+
+def wait_for_snapshot(scraper: ArbeitnowScraper, timeout: float = 5):
+    deadline = time.monotonic() + timeout
+    while scraper.snapshot_stats()['jobs'] == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_board_is_crawled_in_the_background(engine):
+    scraper = ArbeitnowScraper(engine=engine)
+    scraper.start_refreshing()
+    try:
+        wait_for_snapshot(scraper)
+        stats = scraper.snapshot_stats()
+        assert stats['jobs'] == 2 and stats['pages'] == 2
+        assert stats['refreshing_periodically'] and not stats['truncated']
+
+        assert [job['title'] for job in scraper.search_jobs("python")] == [
+            "Python Developer", "Senior Python Engineer"
+        ]
+    finally:
+        scraper.stop_refreshing()
+    assert not scraper.snapshot_stats()['refreshing_periodically']
+
+
+def test_crawl_cut_short_by_max_pages_is_reported(engine):
+    scraper = ArbeitnowScraper(engine=engine, max_pages=1)
+
+    assert [job['title'] for job in scraper.search_jobs("python")] == ["Python Developer"]
+    assert scraper.snapshot_stats()['truncated']
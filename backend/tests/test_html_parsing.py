@@ -0,0 +1,116 @@
+"""
+The lxml parsers must extract exactly what the BeautifulSoup ones did
+
+The reference functions below are the BeautifulSoup (html.parser) code the
+scrapers used before they moved to lxml. Both run over every page in
+tests/fixtures/html, a FixtureStore directory; pages recorded with
+SCRAPE_FIXTURE_MODE=record can be copied in to widen the check.
+"""
+import os
+
+import pytest
+from bs4 import BeautifulSoup
+
+from app.scrapers.fixtures import FixtureStore
+from app.scrapers.indeed_scraper import IndeedScraper
+from app.scrapers.linkedin_scraper import LinkedInScraper
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), 'fixtures', 'html')
+
+indeed = IndeedScraper(delay=0)
+linkedin = LinkedInScraper(delay=0)
+
+
+def _contains(fragment: str):
+    return lambda x: x and fragment in x.lower() if x else False
+
+
+def bs4_indeed_results(content: bytes):
+    soup = BeautifulSoup(content, 'html.parser')
+    cards = soup.find_all('div', class_='job_seen_beacon')
+    if not cards:
+        cards = soup.find_all('div', class_=lambda x: x and 'cardOutline' in x)
+    if not cards:
+        cards = soup.find_all('a', class_=lambda x: x and 'jcs-JobTitle' in x)
+        cards = [card.find_parent('div') for card in cards if card.find_parent('div')]
+
+    jobs = []
+    for card in cards:
+        title_elem = card.find('h2', class_='jobTitle') or card.find('a', class_='jcs-JobTitle') \
+            or card.find('span', title=True)
+        title = title_elem.get_text(strip=True) if title_elem else "N/A"
+        company_elem = card.find('span', class_='companyName') or card.find('span', attrs={'data-testid': 'company-name'})
+        company = company_elem.get_text(strip=True) if company_elem else "N/A"
+        location_elem = card.find('div', class_='companyLocation') \
+            or card.find('div', attrs={'data-testid': 'text-location'})
+        location = location_elem.get_text(strip=True) if location_elem else "Remote"
+        link_elem = card.find('a', class_='jcs-JobTitle') or card.find('a', href=True)
+        job_url = f"{indeed.base_url}{link_elem['href']}" if link_elem and link_elem.get('href') else ""
+        snippet_elem = card.find('div', class_='job-snippet') or card.find('div', attrs={'class': _contains('snippet')})
+        description = snippet_elem.get_text(strip=True) if snippet_elem else f"Position for {title} at {company}"
+        salary_elem = card.find('span', class_='salary-snippet') or card.find('div', attrs={'class': _contains('salary')})
+        salary = salary_elem.get_text(strip=True) if salary_elem else None
+
+        if title == "N/A" or company == "N/A":
+            continue
+        jobs.append({
+            'title': title, 'company': company, 'location': location, 'description': description,
+            'salary': salary, 'job_url': job_url or f"{indeed.base_url}/jobs?q={title.replace(' ', '+')}",
+            'source': 'Indeed'
+        })
+    return jobs
+
+
+def bs4_linkedin_results(content: bytes):
+    jobs = []
+    for card in BeautifulSoup(content, 'html.parser').find_all('div', class_='base-card'):
+        title_elem = card.find('h3', class_='base-search-card__title')
+        title = title_elem.get_text(strip=True) if title_elem else "N/A"
+        company_elem = card.find('h4', class_='base-search-card__subtitle')
+        company = company_elem.get_text(strip=True) if company_elem else "N/A"
+        location_elem = card.find('span', class_='job-search-card__location')
+        location = location_elem.get_text(strip=True) if location_elem else "Remote"
+        link_elem = card.find('a', class_='base-card__full-link')
+        job_url = link_elem.get('href', '') if link_elem else ""
+
+        if title == "N/A" or company == "N/A":
+            continue
+        jobs.append({
+            'title': title, 'company': company, 'location': location,
+            'description': f"{title} position at {company} in {location}",
+            'salary': None, 'job_url': job_url, 'source': 'LinkedIn'
+        })
+    return jobs
+
+
+def bs4_description(content: bytes, site: str) -> str:
+    soup = BeautifulSoup(content, 'html.parser')
+    if site == 'indeed':
+        element = soup.find('div', id='jobDescriptionText')
+    else:
+        element = soup.find('div', class_='show-more-less-html__markup') or soup.find('div', class_='description__text')
+    return element.get_text('\n', strip=True) if element else ""
+
+
+def _without_dates(jobs):
+    return [{key: value for key, value in job.items() if key not in ('posted_date', 'scraped_at')} for job in jobs]
+
+
+def _pages():
+    return [pytest.param(fixture, id=fixture.url) for fixture in FixtureStore(FIXTURE_DIR).fixtures()]
+
+
+@pytest.mark.parametrize('fixture', _pages())
+def test_lxml_parsing_matches_beautifulsoup(fixture):
+    site = 'indeed' if 'indeed.com' in fixture.url else 'linkedin'
+    scraper = indeed if site == 'indeed' else linkedin
+
+    if '/viewjob' in fixture.url or '/jobs/view/' in fixture.url:
+        expected = bs4_description(fixture.body, site)
+        assert expected
+        assert scraper._parse_description(fixture.body) == expected
+        return
+
+    expected = bs4_indeed_results(fixture.body) if site == 'indeed' else bs4_linkedin_results(fixture.body)
+    assert expected
+    assert _without_dates(scraper._parse_results_page(fixture.body, 0)) == expected
@@ -0,0 +1,35 @@
+import httpx
+
+from app.scrapers.http_cache import HttpCache
+
+
+def _response(body: bytes) -> httpx.Response:
+    return httpx.Response(200, headers={'etag': '"v1"'}, content=body)
+
+
+def test_size_total_follows_puts_replacements_and_evictions(tmp_path):
+    cache = HttpCache(str(tmp_path / "cache.sqlite3"), max_bytes=250)
+
+    cache.put('a', _response(b'x' * 100))
+    cache.put('b', _response(b'y' * 100))
+    assert cache.stats()['size_bytes'] == 200
+
+    # Replacing an entry counts only its new body
+    cache.put('a', _response(b'x' * 50))
+    assert cache.stats()['size_bytes'] == 150
+
+    # Over budget: the least recently used entry goes
+    cache.get('a')
+    cache.put('c', _response(b'z' * 120))
+    stats = cache.stats()
+    assert cache.get('b') is None
+    assert cache.get('a').body == b'x' * 50
+    assert stats['size_bytes'] == 170
+    assert stats['evictions'] == 1
+    cache.close()
+
+    # The total is read back from the file when it is reopened
+    reopened = HttpCache(str(tmp_path / "cache.sqlite3"), max_bytes=250)
+    assert reopened.get('c') is not None
+    assert reopened.stats()['size_bytes'] == 170
+    reopened.close()
@@ -0,0 +1,47 @@
+import asyncio
+
+import pytest
+
+from app.scrapers.circuit_breaker import CircuitOpenError
+from app.scrapers.incremental import IncrementalCrawl
+
+STORED = {"http://jobs/old-1", "http://jobs/old-2"}
+
+
+def crawl_pages(pages, num_pages=None):
+    """Run a crawl over scripted pages: a list of URLs, or an exception to raise"""
+    crawl = IncrementalCrawl(lambda url: url in STORED)
+    fetched = []
+
+    async def fetch_page(page):
+        fetched.append(page)
+        if isinstance(pages[page], Exception):
+            raise pages[page]
+        return [{'job_url': url} for url in pages[page]]
+
+    async def collect():
+        return await crawl.paginate(fetch_page, num_pages or len(pages))
+
+    jobs = asyncio.run(collect())
+    return crawl, fetched, [job['job_url'] for job in jobs]
+
+
+def test_stops_at_the_first_page_with_nothing_new():
+    crawl, fetched, urls = crawl_pages([["http://jobs/new"], ["http://jobs/old-1"], ["http://jobs/other"]])
+
+    assert fetched == [0, 1]
+    assert urls == ["http://jobs/new", "http://jobs/old-1"]
+    assert crawl.stats() == {'pages_fetched': 2, 'pages_failed': 0, 'new_jobs': 1, 'stopped_early': True}
+
+
+def test_failed_page_does_not_end_the_crawl():
+    crawl, fetched, urls = crawl_pages([["http://jobs/new"], ValueError("HTTP 500"), ["http://jobs/newer"], []])
+
+    assert fetched == [0, 1, 2, 3]
+    assert urls == ["http://jobs/new", "http://jobs/newer"]
+    assert crawl.stats() == {'pages_fetched': 3, 'pages_failed': 1, 'new_jobs': 2, 'stopped_early': False}
+
+
+def test_open_circuit_ends_the_crawl():
+    with pytest.raises(CircuitOpenError):
+        crawl_pages([["http://jobs/new"], CircuitOpenError("www.example.com", 60), ["http://jobs/newer"]])
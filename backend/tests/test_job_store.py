@@ -0,0 +1,127 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import sessionmaker
+
+from app.models.models import Base, Job, JobDuplicate, JobLSHBucket, JobSignature, JobSkill
+from app.services import job_store
+from app.services.dedup_service import EMPTY_SIGNATURE, duplicate_detector
+from app.services.job_store import insert_duplicates, upsert_jobs
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/jobs.db")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def job_row(url: str, title: str = "Python Developer", description: str = "Build APIs with Python and Django") -> dict:
+    now = datetime.utcnow()
+    return {
+        'title': title, 'company': "Acme", 'location': "Remote", 'description': description,
+        'requirements': None, 'salary_min': None, 'salary_max': None, 'job_url': url, 'source': "Test",
+        'posted_date': now, 'scraped_at': now, 'required_skills': "[]", 'experience_required': 0, 'is_active': True
+    }
+
+
+def index_rows(db, model, job_id: int):
+    return db.execute(select(model.__table__).where(model.__table__.c.job_id == job_id)).all()
+
+
+def test_inserts_new_jobs_with_their_index_rows(db):
+    rows = [job_row(f"http://jobs/{i}", description=f"posting number {i} for python django work") for i in range(3)]
+    signatures = [duplicate_detector.signature(row['description']) for row in rows]
+
+    written = upsert_jobs(db, rows, [['Python', 'django'], ['python'], []], signatures)
+    db.commit()
+
+    assert set(written['inserted']) == {row['job_url'] for row in rows}
+    assert written['updated'] == {}
+    first = written['inserted']["http://jobs/0"]
+    assert sorted(row.skill for row in index_rows(db, JobSkill, first)) == ['django', 'python']
+    assert index_rows(db, JobSignature, first)[0].signature == signatures[0].tobytes()
+    assert len(index_rows(db, JobLSHBucket, first)) == duplicate_detector.bands
+
+
+def test_updates_stored_jobs_and_replaces_their_index_rows(db):
+    old = job_row("http://jobs/1", description="senior java engineer spring microservices")
+    job_id = upsert_jobs(db, [old], [['java']], [duplicate_detector.signature(old['description'])])['inserted'][old['job_url']]
+    db.commit()
+
+    new = job_row("http://jobs/1", title="Python Developer (updated)", description="python django rest apis on aws")
+    new_signature = duplicate_detector.signature(new['description'])
+    written = upsert_jobs(db, [new, job_row("http://jobs/2")], [['python', 'aws'], []], [new_signature, None])
+    db.commit()
+
+    assert written['updated'] == {"http://jobs/1": job_id}
+    assert list(written['inserted']) == ["http://jobs/2"]
+    assert db.get(Job, job_id).title == "Python Developer (updated)"
+    assert sorted(row.skill for row in index_rows(db, JobSkill, job_id)) == ['aws', 'python']
+    signatures = index_rows(db, JobSignature, job_id)
+    assert [row.signature for row in signatures] == [new_signature.tobytes()]
+    assert sorted((row.band, row.bucket) for row in index_rows(db, JobLSHBucket, job_id)) == sorted(
+        duplicate_detector.band_buckets(new_signature)
+    )
+
+
+def test_marks_jobs_without_a_signature_as_indexed(db):
+    job_id = upsert_jobs(db, [job_row("http://jobs/1", description="")], [[]], [None])['inserted']["http://jobs/1"]
+    db.commit()
+
+    assert [row.signature for row in index_rows(db, JobSignature, job_id)] == [EMPTY_SIGNATURE]
+    assert index_rows(db, JobLSHBucket, job_id) == []
+    assert duplicate_detector.backfill(db) == 0
+
+
+def test_leaves_stored_jobs_alone_without_update_existing(db):
+    upsert_jobs(db, [job_row("http://jobs/1")], [['python']], [None])
+    db.commit()
+
+    written = upsert_jobs(db, [job_row("http://jobs/1", title="Changed")], [['java']], [None], update_existing=False)
+
+    assert written == {'inserted': {}, 'updated': {}}
+    assert db.execute(select(Job.title)).scalar() == "Python Developer"
+
+
+def test_skips_rows_stored_by_another_writer_meanwhile(db, monkeypatch):
+    original = job_store._insert_new
+
+    def insert_after_concurrent_writer(session, rows):
+        # Another writer stores one of the URLs between the lookup and the insert
+        session.execute(insert(Job.__table__), [job_row("http://jobs/raced", title="Theirs")])
+        return original(session, rows)
+
+    monkeypatch.setattr(job_store, "_insert_new", insert_after_concurrent_writer)
+    written = upsert_jobs(
+        db, [job_row("http://jobs/raced", title="Ours"), job_row("http://jobs/new")], [['python'], []], [None, None]
+    )
+    db.commit()
+
+    assert list(written['inserted']) == ["http://jobs/new"]
+    assert written['updated'] == {}
+    assert db.execute(select(Job.title).where(Job.job_url == "http://jobs/raced")).scalar() == "Theirs"
+    raced_id = db.execute(select(Job.id).where(Job.job_url == "http://jobs/raced")).scalar()
+    assert index_rows(db, JobSkill, raced_id) == []
+
+
+def test_insert_duplicates_skips_links_stored_meanwhile(db):
+    job_id = upsert_jobs(db, [job_row("http://jobs/1")], [[]], [None])['inserted']["http://jobs/1"]
+    db.commit()
+    link = {'job_data': {'job_url': "http://jobs/repost", 'title': "Python Developer"}, 'similarity': 0.9}
+    # A concurrent scrape linked the same URL first
+    assert insert_duplicates(db, [duplicate_detector.make_duplicate(**link, canonical_job_id=job_id)]) == 1
+    db.commit()
+
+    linked = insert_duplicates(db, [
+        duplicate_detector.make_duplicate(**link, canonical_job_id=job_id),
+        duplicate_detector.make_duplicate({'job_url': "http://jobs/other"}, 0.85, canonical_job_id=job_id)
+    ])
+    db.commit()
+
+    assert linked == 1
+    assert sorted(db.execute(select(JobDuplicate.job_url)).scalars()) == ["http://jobs/other", "http://jobs/repost"]
@@ -0,0 +1,61 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.api.jobs import get_jobs
+from app.models.models import Base, Job, JobMatchScore
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/jobs.db")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+@pytest.fixture
+def jobs(db):
+    now = datetime.utcnow()
+    rows = [
+        Job(title=f"Job {i}", company="Acme", location="Remote", description="Python", job_url=f"http://jobs/{i}",
+            source="Test", scraped_at=now, is_active=True, match_score=match_score)
+        for i, match_score in enumerate((90.0, 40.0, None))
+    ]
+    db.add_all(rows)
+    db.commit()
+    # The stored per-user scores rank the jobs the other way round
+    db.add_all([
+        JobMatchScore(user_id=7, job_id=rows[0].id, score=20.0, computed_at=now),
+        JobMatchScore(user_id=7, job_id=rows[1].id, score=75.0, computed_at=now)
+    ])
+    db.commit()
+    return rows
+
+
+def list_jobs(db, **filters):
+    """Call the endpoint function directly (FastAPI fills q's default only on requests)"""
+    return get_jobs(**dict(dict(skip=0, limit=20, q=None, source=None, company=None,
+                                min_match_score=None, user_id=None), **filters), db=db)
+
+
+def _urls(results):
+    return sorted(result['job_url'] for result in results)
+
+
+def test_min_match_score_without_user_filters_on_the_job_column(db, jobs):
+    results = list_jobs(db, min_match_score=50)
+
+    assert _urls(results) == ["http://jobs/0"]
+    assert results[0]['match_score'] == 90.0
+
+
+def test_min_match_score_with_user_filters_on_their_stored_scores(db, jobs):
+    results = list_jobs(db, min_match_score=50, user_id=7)
+
+    assert _urls(results) == ["http://jobs/1"]
+    assert results[0]['match_score'] == 75.0
@@ -0,0 +1,120 @@
+import threading
+import time
+
+from app.services.pipeline import PipelineStage, StreamingPipeline
+
+
+def test_single_worker_stages_keep_batch_order():
+    seen = []
+    stages = [
+        PipelineStage('double', lambda batch: [item * 2 for item in batch]),
+        PipelineStage('collect', lambda batch: seen.extend(batch))
+    ]
+
+    result = StreamingPipeline(stages, queue_size=2).run([[i, i + 1] for i in range(0, 100, 2)])
+
+    assert seen == [i * 2 for i in range(100)]
+    assert result['stages']['source']['items_out'] == 100
+    assert result['stages']['double']['items_out'] == 100
+    assert result['stages']['collect']['batches'] == 50
+    assert result['errors'] == 0
+    assert result['failed_items'] == 0
+
+
+def test_slow_stage_blocks_the_source():
+    release = threading.Event()
+    produced = []
+
+    def source():
+        for i in range(50):
+            produced.append(i)
+            yield [i]
+
+    def slow(batch):
+        release.wait()
+        return batch
+
+    stages = [PipelineStage('pass', lambda batch: batch), PipelineStage('slow', slow)]
+    pipeline = StreamingPipeline(stages, queue_size=1)
+    runner = threading.Thread(target=pipeline.run, args=(source(),))
+    runner.start()
+    try:
+        time.sleep(0.3)
+        # One batch held by each of the two stages, one waiting in each of
+        # their inboxes and one blocked in the source's put
+        assert len(produced) <= 5
+    finally:
+        release.set()
+        runner.join(5)
+
+    assert not runner.is_alive()
+    assert len(produced) == 50
+
+
+def test_finish_runs_once_after_all_workers_and_is_forwarded():
+    lock = threading.Lock()
+    handled = []
+    finished = []
+    collected = []
+
+    def handle(batch):
+        with lock:
+            handled.extend(batch)
+        return None
+
+    def finish():
+        with lock:
+            finished.append(len(handled))
+        return ['final']
+
+    stages = [
+        PipelineStage('accumulate', handle, workers=4, finish=finish),
+        PipelineStage('collect', lambda batch: collected.extend(batch))
+    ]
+    result = StreamingPipeline(stages, queue_size=2).run([[i] for i in range(40)])
+
+    assert finished == [40]
+    assert collected == ['final']
+    assert result['stages']['accumulate']['items_out'] == 1
+
+
+def test_failed_batches_are_counted_and_the_stream_continues():
+    collected = []
+
+    def picky(batch):
+        if 13 in batch:
+            raise ValueError("bad batch")
+        return batch
+
+    stages = [
+        PipelineStage('picky', picky, workers=2),
+        PipelineStage('collect', lambda batch: collected.extend(batch))
+    ]
+    result = StreamingPipeline(stages).run([[i, i + 1, i + 2] for i in range(0, 30, 3)])
+
+    assert sorted(collected) == [i for i in range(30) if i not in (12, 13, 14)]
+    assert result['stages']['picky']['errors'] == 1
+    assert result['stages']['picky']['failed_items'] == 3
+    assert result['errors'] == 1
+    assert result['failed_items'] == 3
+
+
+def test_failing_source_and_finish_are_counted():
+    def source():
+        yield [1, 2]
+        raise RuntimeError("source broke")
+
+    def finish():
+        raise RuntimeError("finish broke")
+
+    collected = []
+    stages = [
+        PipelineStage('pass', lambda batch: batch, finish=finish),
+        PipelineStage('collect', lambda batch: collected.extend(batch))
+    ]
+    result = StreamingPipeline(stages).run(source())
+
+    assert collected == [1, 2]
+    assert result['stages']['source']['errors'] == 1
+    assert result['stages']['pass']['errors'] == 1
+    assert result['errors'] == 2
@@ -0,0 +1,84 @@
+import pytest
+
+from app.services.similarity_index import JobSimilarityIndex
+
+TEXTS = {
+    1: "senior python developer django rest apis postgres",
+    2: "python developer flask apis postgres docker",
+    3: "frontend engineer react typescript css",
+    4: "react developer typescript redux frontend",
+    5: "data engineer python spark airflow sql",
+    6: "machine learning engineer python pytorch",
+    7: "devops engineer kubernetes docker terraform",
+    8: "java backend developer spring postgres",
+}
+
+
+def make_index(tmp_path, **options) -> JobSimilarityIndex:
+    index = JobSimilarityIndex(str(tmp_path / "index"), save_every=10 ** 6, **options)
+    index.add_jobs(TEXTS.items())
+    return index
+
+
+def rebuilt(tmp_path, index: JobSimilarityIndex, added: dict = None) -> JobSimilarityIndex:
+    """A fresh index over the jobs the given one holds"""
+    texts = {**TEXTS, **(added or {})}
+    fresh = JobSimilarityIndex(str(tmp_path / "fresh"), save_every=10 ** 6)
+    fresh.add_jobs((job_id, texts[job_id]) for job_id in index.job_ids if job_id in index.row_of)
+    return fresh
+
+
+def neighbour_ids(index: JobSimilarityIndex, job_id: int):
+    return [neighbour for neighbour, _ in index.similar(job_id, k=10)]
+
+
+def test_removed_jobs_never_score_without_a_rebuild(tmp_path):
+    index = make_index(tmp_path, rebuild_ratio=1.0)
+    weights = index._get_weights()
+
+    index.remove_job(2)
+
+    assert index._get_weights() is weights
+    assert 2 not in neighbour_ids(index, 1)
+    assert index.similar(2) == []
+
+
+def test_appended_jobs_are_weighted_without_a_rebuild(tmp_path):
+    index = make_index(tmp_path, rebuild_ratio=1.0)
+    weighted = index._get_weights()[:len(TEXTS)].toarray()
+
+    index.add_jobs([(9, "python developer django postgres apis")])
+    weights = index._get_weights()
+
+    assert weights.shape[0] == len(TEXTS) + 1
+    assert (weights[:len(TEXTS)].toarray() == weighted).all()
+    assert set(neighbour_ids(index, 9)[:2]) == {1, 2}
+
+
+def test_many_changes_rebuild_to_the_same_results_as_a_fresh_index(tmp_path):
+    index = make_index(tmp_path, rebuild_ratio=0.1)
+    index.similar(1)
+    index.remove_job(7)
+    index.add_jobs([(9, "python developer django postgres apis")])
+
+    fresh = rebuilt(tmp_path, index, {9: "python developer django postgres apis"})
+    for job_id in (1, 3, 5, 9):
+        assert dict(index.similar(job_id)) == pytest.approx(dict(fresh.similar(job_id)))
+
+
+def test_compaction_drops_removed_rows_and_keeps_results(tmp_path):
+    index = make_index(tmp_path, compact_ratio=0.25)
+    index.similar(1)
+    for job_id in (3, 6, 8):
+        index.remove_job(job_id)
+
+    # 3 of 8 rows removed is over the ratio: the next consolidation drops them
+    results = index.similar(1)
+    assert len(index.job_ids) == len(TEXTS) - 3
+    assert index._get_weights().shape[0] == len(index.job_ids)
+    assert dict(results) == pytest.approx(dict(rebuilt(tmp_path, index).similar(1)))
+
+    index.save()
+    loaded = JobSimilarityIndex(str(tmp_path / "index"))
+    assert loaded.load()
+    assert dict(loaded.similar(1)) == pytest.approx(dict(results))